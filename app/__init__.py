@@ -9,7 +9,7 @@ from . import db
 # Initialize Socket.IO at module level
 socketio = SocketIO()
 
-def create_app():
+def create_app(config_overrides=None):
     """Flask application factory"""
     # Create Flask app with instance config
     app = Flask(
@@ -22,6 +22,12 @@ def create_app():
     # Load configuration
     config = load_config()
     app.config.from_object(config)
+    if config_overrides:
+        app.config.update(config_overrides)
+    
+    # Validate the async runtime and set up SQLite offloading before any connection opens
+    from .runtime import offloader
+    offloader.init_app(app)
     
     # Ensure instance directory exists
     instance_path = Path(app.instance_path)
@@ -30,13 +36,55 @@ def create_app():
     # Initialize database
     db.init_app(app)
     
-    # Initialize Socket.IO with app
+    # Initialize Socket.IO with app; cached state snapshots are spliced in pre-encoded
+    from .snapshot import SnapshotJSON, msgpack_packet_class
+    serializer = app.config['SOCKETIO_SERIALIZER']
+    if serializer == 'msgpack':
+        wire_format = {'serializer': msgpack_packet_class()}
+    elif serializer == 'json':
+        wire_format = {'json': SnapshotJSON}
+    else:
+        raise ValueError(f'Invalid SOCKETIO_SERIALIZER: {serializer}')
     socketio.init_app(
         app,
         cors_allowed_origins=app.config['SOCKETIO_CORS_ALLOWED_ORIGINS'],
-        async_mode=app.config['SOCKETIO_ASYNC_MODE']
+        async_mode=app.config['SOCKETIO_ASYNC_MODE'],
+        message_queue=app.config['SOCKETIO_MESSAGE_QUEUE'],
+        **wire_format
     )
     
+    # Handler/query/emit metrics on /metrics (no-ops unless METRICS_ENABLED)
+    from .metrics import metrics
+    metrics.init_app(app, socketio)
+    
+    # Per-event cProfile dumps and the slow-event log (no-ops unless PROFILE_MODE/SLOW_EVENT_MS)
+    from .profiling import profiler
+    profiler.init_app(app)
+    
+    # Per-socket and per-team token buckets for buzz/50-50/answer spam
+    from .ratelimit import limiter
+    limiter.init_app(app)
+    
+    # Start the write-behind journal for buzz/lifeline audit rows
+    from .journal import journal
+    journal.init_app(app, socketio)
+    
+    # Keep in-memory game state coherent with other worker processes
+    from .cluster import cluster
+    cluster.init_app(app, socketio)
+    
+    # One scheduler task enforces question deadlines for every game
+    from .timers import timers
+    timers.init_app(app, socketio)
+    
+    # All-play answer tallies reach host screens at a fixed rate, not per answer
+    from .answers import tally_stream
+    tally_stream.init_app(app, socketio)
+    
+    # Spectators get coalesced, rate-capped state pushes in their own room
+    from .spectators import spectator_feed
+    spectator_feed.init_app(app, socketio)
+    
     # Store socketio in app extensions for access
     app.extensions['socketio'] = socketio
     
@@ -56,5 +104,10 @@ def create_app():
     
     # Import socket handlers after app setup to register events
     from . import sockets
+    from .admin import sockets as admin_sockets  # /admin namespace for admin ops
+    
+    # Create/seed the database and warm caches once, before the first request
+    from .bootstrap import bootstrap
+    bootstrap(app)
     
     return app
\ No newline at end of file
@@ -0,0 +1,231 @@
+"""Admin operations shared by the form POST route and the ``/admin`` Socket.IO namespace.
+
+``apply_op`` validates and applies one operation to a game and returns an
+error message or None. Room broadcasts are queued with ``broadcast_later``
+and sent by a background task, so the caller can acknowledge right away;
+several ops on the same game that queue up are sent as one state push.
+"""
+import threading
+import time
+
+from flask import current_app
+
+from .. import eventlog, socketio, staging
+from ..metrics import metrics
+from ..profiling import profiler
+from ..rooms import game_room
+from ..snapshot import broadcast_state
+from ..spectators import spectator_feed
+from ..state import ANSWER_MODES, STATES
+
+OPS = (
+    "set_round", "set_question", "queue_questions", "next_question", "set_state", "start_timer",
+    "add_time", "unlock_buzz", "clear_masks", "set_active_team", "set_answer_mode", "add_team",
+    "add_question", "judge", "broadcast",
+)
+
+
+def _text(fields, key, default="") -> str:
+    value = fields.get(key, default)
+    return "" if value is None else str(value).strip()
+
+
+def _int(fields, key, default=None):
+    raw = _text(fields, key, default)
+    if raw == "":
+        return None
+    try:
+        return int(raw)
+    except ValueError:
+        return None
+
+
+def apply_op(game, db, op: str, fields) -> str:
+    """Apply an admin op with its form/event fields; return an error message or None"""
+    name = f"admin_{op}" if op in OPS else "admin_unknown"
+    with metrics.timer(name):
+        error = profiler.call(name, game.game_id, _apply_op, game, db, op, fields)
+    if not error:
+        audit = {k: _text(fields, k) for k in fields.keys() if k not in ("op", "gameId")}
+        eventlog.record(game.game_id, "admin", op=op, fields=audit)
+    return error
+
+
+def _apply_op(game, db, op: str, fields) -> str:
+    now_ms = int(time.time() * 1000)
+
+    if op == "set_round":
+        rid = _int(fields, "round_id")
+        if not rid:
+            return "round_id required"
+        if rid not in game.round_ids:
+            return "Unknown round"
+        game.set_round(db, rid)
+        staging.stage_upcoming(game)
+
+    elif op == "set_question":
+        qid = _int(fields, "question_id")
+        seconds = _int(fields, "seconds", "30")
+        if not qid or qid not in game.questions:
+            return "Unknown question"
+        if seconds is None:
+            return "seconds must be a number"
+        _show_question(game, db, qid, seconds, now_ms)
+
+    elif op == "queue_questions":
+        try:
+            qids = [int(x) for x in _text(fields, "question_ids").replace(",", " ").split()]
+        except ValueError:
+            return "question_ids must be numbers"
+        unknown = [str(qid) for qid in qids if qid not in game.questions]
+        if unknown:
+            return f"Unknown question(s): {', '.join(unknown)}"
+        round_id = _int(fields, "round_id") or game.current_round_id
+        if not round_id:
+            return "Select a round first"
+        if round_id not in game.round_ids:
+            return "Unknown round"
+        game.set_queue(db, round_id, qids)
+        if round_id == game.current_round_id:
+            staging.stage_upcoming(game)
+
+    elif op == "next_question":
+        seconds = _int(fields, "seconds", "30")
+        if seconds is None:
+            return "seconds must be a number"
+        qid = game.pop_queue(db)
+        if not qid:
+            return "Question queue for this round is empty"
+        _show_question(game, db, qid, seconds, now_ms)
+
+    elif op == "set_state":
+        new_state = _text(fields, "state")
+        if new_state not in STATES:
+            return f"state must be one of {', '.join(STATES)}"
+        game.set_state(db, new_state)
+
+    elif op == "start_timer":
+        seconds = _int(fields, "seconds", "30")
+        if seconds is None:
+            return "seconds must be a number"
+        game.set_deadline(db, now_ms + max(1, seconds) * 1000)
+
+    elif op == "add_time":
+        seconds = _int(fields, "seconds", "10")
+        if seconds is None:
+            return "seconds must be a number"
+        game.add_time(db, max(1, seconds))
+
+    elif op == "unlock_buzz":
+        game.unlock_buzz(db)
+
+    elif op == "clear_masks":
+        game.clear_masks(db)
+
+    elif op == "set_active_team":
+        raw = _text(fields, "team_id")
+        team_id = None if raw in ("", "0") else _int(fields, "team_id")
+        if raw not in ("", "0") and team_id not in game.teams:
+            return "Unknown team"
+        game.set_active_team(db, team_id)
+
+    elif op == "set_answer_mode":
+        mode = _text(fields, "mode").upper()
+        if mode not in ANSWER_MODES:
+            return f"mode must be one of {', '.join(ANSWER_MODES)}"
+        game.set_answer_mode(db, mode)
+
+    elif op == "add_team":
+        name = _text(fields, "name")
+        code = _text(fields, "code").upper()
+        if not name or not code:
+            return "name and code required"
+        if game.team_by_code(code):
+            return f"Team code {code} already exists"
+        game.add_team(db, name, code)
+
+    elif op == "add_question":
+        text = _text(fields, "text")
+        options = [_text(fields, key) for key in ("opt_a", "opt_b", "opt_c", "opt_d")]
+        correct = _int(fields, "correct_index")
+        qtype = _text(fields, "type", "MCQ") or "MCQ"
+        if not text or not all(options) or correct not in (0, 1, 2, 3):
+            return "text, four options and correct_index 0-3 required"
+        game.add_question(db, text, options, correct, qtype)
+
+    elif op == "judge":
+        result = _text(fields, "result")
+        if result not in ("correct", "wrong"):
+            return "result must be correct or wrong"
+        team_id = _int(fields, "team_id") or game.active_team_id
+        if team_id not in game.teams:
+            return "No team to judge"
+        default = current_app.config["SCORE_CORRECT" if result == "correct" else "SCORE_WRONG"]
+        points = _int(fields, "points") if _text(fields, "points") else default
+        if points is None:
+            return "points must be a number"
+        if game.judge(db, team_id, result == "correct", points) is None:
+            return "No current question"
+
+    elif op != "broadcast":
+        return f"Unknown op: {op}"
+
+    return None
+
+
+def _show_question(game, db, qid: int, seconds: int, now_ms: int) -> None:
+    """Start a question; staged ones are revealed to the whole room at one scheduled moment"""
+    staged = qid in game.stage_pushed
+    show_at = now_ms + current_app.config["REVEAL_LEAD_MS"] if staged else now_ms
+    deadline = show_at + max(1, seconds) * 1000
+    game.set_question(db, qid, deadline, show_at if staged else 0)
+    if staged:
+        staging.reveal(game, qid, show_at, deadline)
+    staging.stage_upcoming(game)
+
+
+# ----------------------------
+# Deferred fan-out
+# ----------------------------
+_pending = {}        # game id -> toast messages, in arrival order
+_forced = set()      # game ids whose next push is sent even if the state is unchanged
+_lock = threading.Lock()
+_running = False
+
+
+def broadcast_later(game_id: int, msg: str, force: bool = False) -> None:
+    """Queue a state push and toast for a game's room and return immediately.
+
+    The push is skipped when the state did not change, unless ``force`` is set.
+    """
+    global _running
+    app = current_app._get_current_object()
+    with _lock:
+        _pending.setdefault(game_id, []).append(msg)
+        if force:
+            _forced.add(game_id)
+        if _running:
+            return
+        _running = True
+    socketio.start_background_task(_fan_out, app)
+
+
+def _fan_out(app) -> None:
+    global _running
+    while True:
+        with _lock:
+            if not _pending:
+                _running = False
+                return
+            game_id = next(iter(_pending))
+            messages = _pending.pop(game_id)
+            force = game_id in _forced
+            _forced.discard(game_id)
+        try:
+            with app.app_context():
+                broadcast_state(game_id, force=force)
+                for msg in messages:
+                    socketio.emit("toast", {"msg": msg}, to=game_room(game_id))
+                    spectator_feed.toast(game_id, msg)
+        except Exception:
+            app.logger.exception("admin: broadcast for game %s failed", game_id)
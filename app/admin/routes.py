@@ -1,183 +1,154 @@
-from flask import Blueprint, render_template, request, redirect, url_for
-from ..db import get_db, seed_if_empty
-from .. import socketio
-import time
-
+from flask import (Blueprint, Response, abort, current_app, jsonify, render_template, request, redirect,
+                   stream_with_context, url_for)
+import io
+from .. import bank, eventlog
+from ..db import create_game, get_db
+from ..registry import default_game_id
+from ..state import get_game
+from .ops import apply_op, broadcast_later
+from .search import page_args, question_types, search_questions, search_teams
 bp = Blueprint("admin", __name__)
 
-def game_room(game_id: int) -> str:
-    return f"game:{game_id}"
-
-def _broadcast_state(game_id: int) -> None:
-    db = get_db()
-    s = db.execute("SELECT * FROM settings WHERE game_id = ?", (game_id,)).fetchone()
-    if not s:
-        return
-
-    # Build payload once and keep merging fields; do not overwrite
-    payload = {
-        "gameId": game_id,
-        "state": s["state"],
-        "deadlineEpochMs": s["deadline_epoch_ms"],
-        "activeTeamId": s["active_team_id"],
-        "currentRoundId": s["current_round_id"],
-    }
-
-    if s["current_question_id"]:
-        q = db.execute("SELECT * FROM questions WHERE id = ?", (s["current_question_id"],)).fetchone()
-        if q:
-            payload["question"] = {
-                "id": q["id"],
-                "text": q["text"],
-                "options": [q["opt_a"], q["opt_b"], q["opt_c"], q["opt_d"]],
-                "type": q["type"],
-            }
-
-    active = None
-    if s["active_team_id"]:
-        t = db.execute("SELECT id, name, code FROM teams WHERE id = ?", (s["active_team_id"],)).fetchone()
-        if t:
-            active = {"id": t["id"], "name": t["name"], "code": t["code"]}
-    payload["activeTeam"] = active
-
-    socketio.emit("state_update", payload, to=game_room(game_id))
+def _resolve_game_id(game_id):
+    return game_id if game_id is not None else default_game_id()
 
 @bp.route("/")
-def index():
-    seed_if_empty()
+@bp.route("/<int:game_id>/")
+def index(game_id=None):
     db = get_db()
 
-    game = db.execute("SELECT * FROM games ORDER BY id ASC LIMIT 1").fetchone()
+    gid = _resolve_game_id(game_id)
+    game = db.execute("SELECT * FROM games WHERE id = ?", (gid,)).fetchone() if gid else None
     if not game:
         return render_template("admin.html", error="No game found")
 
-    gid = game["id"]
+    games = db.execute("SELECT id, name FROM games ORDER BY id").fetchall()
     settings = db.execute("SELECT * FROM settings WHERE game_id = ?", (gid,)).fetchone()
     rounds = db.execute("SELECT * FROM rounds WHERE game_id = ? ORDER BY order_index", (gid,)).fetchall()
-    questions = db.execute("SELECT * FROM questions WHERE game_id = ?", (gid,)).fetchall()
-    teams = db.execute("SELECT * FROM teams WHERE game_id = ?", (gid,)).fetchall()
 
+    # Only one page of questions and teams; admin.js pages and searches through the JSON API
+    per_page = current_app.config["ADMIN_PAGE_SIZE"]
+    filters = _question_filters(request.args)
+    questions = search_questions(db, gid, *filters, *page_args(request.args, per_page))
+    teams = search_teams(db, gid, request.args.get("team_q"), *page_args(request.args, per_page, "team_"))
+
+    state = get_game(gid)
     return render_template(
         "admin.html",
         game=game,
+        games=games,
         settings=settings,
         rounds=rounds,
         questions=questions,
+        question_filters=dict(zip(("q", "prefix", "type"), filters)),
+        question_types=question_types(db, gid),
         teams=teams,
+        current_question=state.current_question() if state else None,
+        active_team=state.active_team() if state else None,
+        leaderboard=state.standings() if state else [],
+        queue=state.upcoming() if state else [],
+        op_error=request.args.get("op_error"),
+    )
+
+def _question_filters(args):
+    """``(text, prefix, type)`` search filters from request args"""
+    return (
+        args.get("q", "").strip() or None,
+        args.get("prefix", "").strip() or None,
+        args.get("type", "").strip() or None,
+    )
+
+@bp.route("/<int:game_id>/api/questions")
+def api_questions(game_id):
+    """JSON page of questions: ?q=words&prefix=text&type=MCQ&page=1&per_page=50"""
+    page, per_page = page_args(request.args, current_app.config["ADMIN_PAGE_SIZE"])
+    return jsonify(search_questions(get_db(), game_id, *_question_filters(request.args), page, per_page))
+
+@bp.route("/<int:game_id>/api/teams")
+def api_teams(game_id):
+    """JSON page of teams: ?q=name-or-code-prefix&page=1&per_page=50"""
+    page, per_page = page_args(request.args, current_app.config["ADMIN_PAGE_SIZE"])
+    return jsonify(search_teams(get_db(), game_id, request.args.get("q"), page, per_page))
+
+@bp.route("/<int:game_id>/api/leaderboard")
+def api_leaderboard(game_id):
+    """JSON standings, served from the incrementally maintained totals"""
+    game = get_game(game_id)
+    if not game:
+        abort(404)
+    return jsonify({"gameId": game_id, "standings": game.standings()})
+
+@bp.route("/<int:game_id>/api/events")
+def api_events(game_id):
+    """JSON page of the event log: ?after=EVENT_ID&limit=500"""
+    after = request.args.get("after", 0, type=int)
+    limit = min(max(request.args.get("limit", 500, type=int), 1), 5000)
+    return jsonify(eventlog.events(get_db(), game_id, after, limit))
+
+@bp.route("/<int:game_id>/api/replay")
+def api_replay(game_id):
+    """Game state rebuilt from the event log: ?until=EVENT_ID and/or ?at=EPOCH_MS"""
+    db = get_db()
+    view = eventlog.replay(db, game_id, request.args.get("until", type=int), request.args.get("at", type=int))
+    return jsonify(view.to_dict(eventlog.team_map(db, game_id)))
+
+@bp.route("/games", methods=["POST"])
+def create_game_action():
+    name = request.form.get("name", "").strip()
+    if not name:
+        return redirect(url_for("admin.index"))
+    db = get_db()
+    gid = create_game(db, name)
+    db.commit()
+    return redirect(url_for("admin.index", game_id=gid))
+
+@bp.route("/<int:game_id>/import", methods=["POST"])
+def import_bank(game_id):
+    """Bulk-import an uploaded CSV/JSONL file of questions or teams"""
+    upload = request.files.get("file")
+    kind = request.form.get("kind", "questions")
+    if not upload or not upload.filename or kind not in bank.KINDS:
+        return redirect(url_for("admin.index", game_id=game_id))
+
+    stream = io.TextIOWrapper(upload.stream, encoding="utf-8-sig", newline="")
+    try:
+        report = bank.import_file(game_id, kind, stream, bank.format_for(upload.filename))
+        msg = f"Admin: imported {report['inserted']} {kind} ({report['skipped']} skipped, {report['invalid']} invalid)"
+    except ValueError as e:
+        msg = f"Admin: import failed: {e}"
+
+    # One state push for the whole file, never per row
+    broadcast_later(game_id, msg)
+    return redirect(url_for("admin.index", game_id=game_id))
+
+@bp.route("/<int:game_id>/export.<fmt>")
+def export_bank(game_id, fmt):
+    """Stream a game's questions or teams as CSV/JSONL"""
+    kind = request.args.get("kind", "questions")
+    if kind not in bank.KINDS or fmt not in bank.FORMATS:
+        abort(404)
+    mimetype = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    body = bank.export_rows(get_db(), game_id, kind, fmt)
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename=game-{game_id}-{kind}.{fmt}"},
     )
 
 @bp.route("/action", methods=["POST"])
-def admin_action():
+@bp.route("/<int:game_id>/action", methods=["POST"])
+def admin_action(game_id=None):
     db = get_db()
 
-    game = db.execute("SELECT * FROM games ORDER BY id ASC LIMIT 1").fetchone()
+    gid = _resolve_game_id(game_id)
+    game = get_game(gid) if gid else None
     if not game:
         return redirect(url_for("admin.index"))
 
-    gid = game["id"]
     op = request.form.get("op", "").strip()
-    now_ms = int(time.time() * 1000)
-
-    if op == "set_round":
-        rid = request.form.get("round_id")
-        if rid:
-            db.execute("UPDATE settings SET current_round_id = ? WHERE game_id = ?", (rid, gid))
-            db.commit()
-
-    elif op == "set_question":
-        qid = request.form.get("question_id")
-        seconds_raw = request.form.get("seconds", "30")
-        if qid:
-            try:
-                seconds = max(1, int(seconds_raw))
-                deadline = now_ms + seconds * 1000
-                db.execute(
-                    "DELETE FROM buzzer_events WHERE game_id = ? AND question_id = ? AND accepted = 1",
-                    (gid, qid),
-                )
-                db.execute(
-                    "UPDATE settings SET current_question_id = ?, state = ?, deadline_epoch_ms = ?, active_team_id = NULL WHERE game_id = ?",
-                    (qid, "SHOW", deadline, gid),
-                )
-                db.commit()
-            except ValueError:
-                pass
-
-    elif op == "set_state":
-        new_state = request.form.get("state", "").strip()
-        if new_state in ("IDLE", "SHOW", "LOCK", "REVEAL"):
-            db.execute("UPDATE settings SET state = ? WHERE game_id = ?", (new_state, gid))
-            db.commit()
-
-    elif op == "start_timer":
-        seconds_raw = request.form.get("seconds", "30")
-        try:
-            seconds = max(1, int(seconds_raw))
-            deadline = now_ms + seconds * 1000
-            db.execute("UPDATE settings SET deadline_epoch_ms = ? WHERE game_id = ?", (deadline, gid))
-            db.commit()
-        except ValueError:
-            pass
-
-    elif op == "add_time":
-        seconds_raw = request.form.get("seconds", "10")
-        try:
-            seconds = max(1, int(seconds_raw))
-            row = db.execute("SELECT deadline_epoch_ms FROM settings WHERE game_id = ?", (gid,)).fetchone()
-            if row and row["deadline_epoch_ms"]:
-                new_deadline = row["deadline_epoch_ms"] + seconds * 1000
-                db.execute("UPDATE settings SET deadline_epoch_ms = ? WHERE game_id = ?", (new_deadline, gid))
-                db.commit()
-        except ValueError:
-            pass
-
-    elif op == "unlock_buzz":
-        s = db.execute("SELECT current_question_id FROM settings WHERE game_id = ?", (gid,)).fetchone()
-        if s and s["current_question_id"]:
-            db.execute(
-                "DELETE FROM buzzer_events WHERE game_id = ? AND question_id = ? AND accepted = 1",
-                (gid, s["current_question_id"]),
-            )
-            db.execute("UPDATE settings SET active_team_id = NULL WHERE game_id = ?", (gid,))
-            db.commit()
-
-    elif op == "clear_masks":
-        s = db.execute("SELECT current_question_id FROM settings WHERE game_id = ?", (gid,)).fetchone()
-        if s and s["current_question_id"]:
-            db.execute("DELETE FROM team_masks WHERE game_id = ? AND question_id = ?", (gid, s["current_question_id"]))
-            db.commit()
-
-    elif op == "set_active_team":
-        team_id_raw = request.form.get("team_id", "").strip()
-        team_id = None if team_id_raw in ("", "0") else team_id_raw
-        db.execute("UPDATE settings SET active_team_id = ? WHERE game_id = ?", (team_id, gid))
-        db.commit()
-
-    elif op == "add_team":
-        name = request.form.get("name", "").strip()
-        code = request.form.get("code", "").strip().upper()
-        if name and code:
-            db.execute("INSERT INTO teams (game_id, name, code) VALUES (?, ?, ?)", (gid, name, code))
-            db.commit()
-
-    elif op == "add_question":
-        text = request.form.get("text", "").strip()
-        opt_a = request.form.get("opt_a", "").strip()
-        opt_b = request.form.get("opt_b", "").strip()
-        opt_c = request.form.get("opt_c", "").strip()
-        opt_d = request.form.get("opt_d", "").strip()
-        correct = request.form.get("correct_index", type=int)
-        qtype = request.form.get("type", "MCQ").strip() or "MCQ"
-        if text and all([opt_a, opt_b, opt_c, opt_d]) and correct in (0, 1, 2, 3):
-            db.execute(
-                "INSERT INTO questions (game_id, text, opt_a, opt_b, opt_c, opt_d, correct_index, type) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-                (gid, text, opt_a, opt_b, opt_c, opt_d, correct, qtype),
-            )
-            db.commit()
-
-    elif op == "broadcast":
-        pass
-
-    _broadcast_state(gid)
-    socketio.emit("toast", {"msg": f"Admin: {op} applied"}, to=game_room(gid))
-    return redirect(url_for("admin.index"))
+    error = apply_op(game, db, op, request.form)
+    if error:
+        # Only the admin hears about a failed op; the room gets no push or toast
+        return redirect(url_for("admin.index", game_id=gid, op_error=f"{op} failed: {error}"))
+    broadcast_later(gid, f"Admin: {op} applied", force=op == "broadcast")
+    return redirect(url_for("admin.index", game_id=gid))
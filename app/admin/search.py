@@ -0,0 +1,82 @@
+"""Paginated question and team lookups for the admin console and its JSON API.
+
+Question text search uses the ``questions_fts`` index when the database has
+one and falls back to ``LIKE`` otherwise. Prefix filters are index range
+scans on ``(game_id, text)``.
+"""
+from ..db import has_question_search
+
+MAX_PER_PAGE = 200
+
+_fts = {}    # database file -> has questions_fts
+
+
+def _use_fts(db) -> bool:
+    path = db.execute("PRAGMA database_list").fetchone()["file"]
+    if path not in _fts:
+        _fts[path] = has_question_search(db)
+    return _fts[path]
+
+
+def _fts_query(text: str) -> str:
+    """Match every word of ``text`` as a prefix"""
+    words = text.split()
+    return " ".join('"' + w.replace('"', '""') + '"*' for w in words)
+
+
+def page_args(args, default_per_page: int, prefix: str = ""):
+    """``(page, per_page)`` from request args, clamped to sane values"""
+    page = max(1, args.get(prefix + "page", 1, type=int) or 1)
+    per_page = args.get(prefix + "per_page", default_per_page, type=int) or default_per_page
+    return page, max(1, min(per_page, MAX_PER_PAGE))
+
+
+def _page(db, table, columns, where, params, page, per_page) -> dict:
+    where = " AND ".join(where)
+    total = db.execute(f"SELECT COUNT(*) FROM {table} WHERE {where}", params).fetchone()[0]
+    rows = db.execute(
+        f"SELECT {columns} FROM {table} WHERE {where} ORDER BY id LIMIT ? OFFSET ?",
+        (*params, per_page, (page - 1) * per_page),
+    ).fetchall()
+    return {
+        "items": [dict(r) for r in rows],
+        "page": page,
+        "perPage": per_page,
+        "total": total,
+        "pages": max(1, -(-total // per_page)),
+    }
+
+
+def search_questions(db, game_id: int, text=None, prefix=None, qtype=None, page: int = 1, per_page: int = 50) -> dict:
+    """One page of a game's questions filtered by words in the text, text prefix and type"""
+    where, params = ["game_id = ?"], [game_id]
+    if qtype:
+        where.append("type = ?")
+        params.append(qtype)
+    if prefix:
+        where.append("text >= ? AND text < ?")
+        params += [prefix, prefix + "\U0010ffff"]
+    if text and text.split():
+        if _use_fts(db):
+            where.append("id IN (SELECT rowid FROM questions_fts WHERE questions_fts MATCH ?)")
+            params.append(_fts_query(text))
+        else:
+            where.append("text LIKE ?")
+            params.append(f"%{text}%")
+    return _page(
+        db, "questions", "id, text, opt_a, opt_b, opt_c, opt_d, correct_index, type",
+        where, params, page, per_page,
+    )
+
+
+def search_teams(db, game_id: int, text=None, page: int = 1, per_page: int = 50) -> dict:
+    """One page of a game's teams whose name or code starts with ``text``"""
+    where, params = ["game_id = ?"], [game_id]
+    if text and text.strip():
+        where.append("(name LIKE ? OR code LIKE ?)")
+        params += [text.strip() + "%", text.strip() + "%"]
+    return _page(db, "teams", "id, name, code", where, params, page, per_page)
+
+
+def question_types(db, game_id: int) -> list:
+    return [r["type"] for r in db.execute("SELECT DISTINCT type FROM questions WHERE game_id = ? ORDER BY type", (game_id,))]
@@ -0,0 +1,32 @@
+"""``/admin`` Socket.IO namespace: admin ops applied and acknowledged in one round-trip.
+
+    socket.emit("op", {gameId, op, ...fields}, (ack) => ...)
+
+The ack is ``{ok: true, op, state, queue}`` with the game's new ``state_update``
+payload and the current round's question queue, or ``{ok: false, error}``. Room broadcasts are queued and sent after
+the ack by ``ops.broadcast_later``.
+"""
+from .. import socketio
+from ..db import get_db
+from ..metrics import metrics
+from ..snapshot import state_snapshot
+from ..state import get_game
+from .ops import apply_op, broadcast_later
+
+NAMESPACE = "/admin"
+
+
+@socketio.on("op", namespace=NAMESPACE)
+@metrics.timed("admin_socket_op")
+def handle_op(data):
+    data = data or {}
+    game = get_game(data.get("gameId"))
+    if not game:
+        return {"ok": False, "error": "Invalid game"}
+    op = str(data.get("op", "")).strip()
+    error = apply_op(game, get_db(), op, data)
+    if error:
+        return {"ok": False, "op": op, "error": error}
+    broadcast_later(game.game_id, f"Admin: {op} applied", force=op == "broadcast")
+    return {"ok": True, "op": op, "state": dict(state_snapshot(game)),
+            "queue": game.upcoming()}
@@ -0,0 +1,114 @@
+"""All-play answers: every team submits one option per question.
+
+Submissions are validated and tallied in memory under a per-game lock held
+for a few dict operations, then handed to the write-behind journal, so a burst
+of answers just before the deadline costs no SQLite round-trips in the
+handlers. Per-option tallies reach the host room at most every
+``TALLY_INTERVAL_MS`` through ``tally_stream``, never once per answer.
+"""
+import threading
+
+from . import eventlog
+from .journal import journal
+from .rooms import host_room
+
+INSERT_ANSWER = (
+    "INSERT OR IGNORE INTO answers (game_id, team_id, question_id, choice, correct, ts_us) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+
+
+class AnswerBook:
+    """Per-game answers and option tallies, keyed by question"""
+
+    def __init__(self, game_id: int):
+        self.game_id = game_id
+        self.lock = threading.Lock()
+        self.answers = {}    # question id -> {team id: choice}
+        self.tallies = {}    # question id -> [count for options A-D]
+
+    def _add(self, team_id: int, question_id: int, choice: int) -> bool:
+        with self.lock:
+            answered = self.answers.setdefault(question_id, {})
+            if team_id in answered:
+                return False
+            answered[team_id] = choice
+            self.tallies.setdefault(question_id, [0, 0, 0, 0])[choice] += 1
+            return True
+
+    def load(self, team_id: int, question_id: int, choice: int) -> None:
+        """Restore a persisted answer (also used for answers taken by other workers)"""
+        self._add(team_id, question_id, choice)
+
+    def submit(self, team_id: int, question_id: int, choice: int, correct: bool, received_us: int) -> bool:
+        """Record a team's answer; False if it already answered this question"""
+        if not self._add(team_id, question_id, choice):
+            return False
+        journal.append(INSERT_ANSWER, (self.game_id, team_id, question_id, choice, int(correct), received_us))
+        eventlog.record(self.game_id, "answer", team_id, question_id, ts_us=received_us,
+                        choice=choice, correct=bool(correct))
+        return True
+
+    def reset(self, question_id: int) -> None:
+        """Forget a question's answers and tally, for when it is shown again"""
+        with self.lock:
+            self.answers.pop(question_id, None)
+            self.tallies.pop(question_id, None)
+
+    def tally(self, question_id: int) -> tuple:
+        """``(counts, total)`` for a question"""
+        with self.lock:
+            counts = list(self.tallies.get(question_id, (0, 0, 0, 0)))
+        return counts, sum(counts)
+
+
+class TallyStream:
+    """One background task pushing changed tallies to host rooms at a fixed rate"""
+
+    def __init__(self):
+        self.app = None
+        self.interval_s = 0.25
+        self._dirty = {}           # game id -> question id with new answers
+        self._lock = threading.Lock()
+        self._running = False
+        self.pushes = 0
+
+    def init_app(self, app, socketio) -> None:
+        self.app = app
+        self.interval_s = app.config["TALLY_INTERVAL_MS"] / 1000.0
+        if not self._running:
+            self._running = True
+            socketio.start_background_task(self._run, socketio)
+
+    def mark(self, game_id: int, question_id: int) -> None:
+        with self._lock:
+            self._dirty[game_id] = question_id
+
+    def _run(self, socketio) -> None:
+        from .state import peek_game
+
+        while self._running:
+            socketio.sleep(self.interval_s)
+            with self._lock:
+                dirty, self._dirty = self._dirty, {}
+            for game_id, question_id in dirty.items():
+                game = peek_game(game_id)
+                if game is None:
+                    continue
+                counts, total = game.answers.tally(question_id)
+                try:
+                    socketio.emit(
+                        "answer_tally",
+                        {"gameId": game_id, "questionId": question_id, "counts": counts,
+                         "total": total, "teams": len(game.teams)},
+                        to=host_room(game_id),
+                    )
+                    self.pushes += 1
+                except Exception:
+                    self.app.logger.exception("answers: tally push for game %s failed", game_id)
+
+    def stop(self) -> None:
+        self._running = False
+
+
+tally_stream = TallyStream()
@@ -0,0 +1,249 @@
+"""Bulk import and export of questions and teams.
+
+Files are CSV (header row) or JSONL (one object per line) and are streamed,
+so banks of any size use constant memory. Rows are validated against the
+``questions``/``teams`` constraints in Python and inserted with one
+``executemany`` transaction per chunk; invalid rows are reported by line and
+skipped. Nothing is broadcast while importing: the game's in-memory state is
+reloaded once at the end.
+
+    flask --app app import-bank GAME_ID FILE [--kind questions|teams]
+    flask --app app export-bank GAME_ID FILE [--kind questions|teams]
+"""
+import csv
+import io
+import json
+from pathlib import Path
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from . import eventlog
+from .db import get_db
+
+KINDS = ("questions", "teams")
+FORMATS = ("csv", "jsonl")
+
+COLUMNS = {
+    "questions": ("id", "text", "opt_a", "opt_b", "opt_c", "opt_d", "correct_index", "type"),
+    "teams": ("id", "name", "code"),
+}
+
+INSERT_SQL = {
+    "questions": (
+        "INSERT INTO questions (game_id, text, opt_a, opt_b, opt_c, opt_d, correct_index, type) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+    ),
+    # Codes are unique per game; re-importing a team list skips existing codes
+    "teams": "INSERT OR IGNORE INTO teams (game_id, name, code) VALUES (?, ?, ?)",
+}
+
+MAX_REPORTED_ERRORS = 100
+
+
+def format_for(filename: str, default: str = "csv") -> str:
+    """Pick the file format from its extension"""
+    suffix = Path(filename or "").suffix.lower().lstrip(".")
+    if suffix in ("jsonl", "ndjson"):
+        return "jsonl"
+    if suffix == "csv":
+        return "csv"
+    return default
+
+
+# ----------------------------
+# Validation
+# ----------------------------
+def _text(row, key) -> str:
+    value = row.get(key)
+    value = "" if value is None else str(value).strip()
+    if not value:
+        raise ValueError(f"'{key}' is required")
+    return value
+
+
+def question_params(game_id: int, row: dict) -> tuple:
+    """Insert parameters for a question row, or ValueError"""
+    text = _text(row, "text")
+    if isinstance(row.get("options"), list):
+        options = [str(o).strip() for o in row["options"]]
+        if len(options) != 4 or not all(options):
+            raise ValueError("'options' must hold four non-empty options")
+    else:
+        options = [_text(row, key) for key in ("opt_a", "opt_b", "opt_c", "opt_d")]
+    try:
+        correct = int(row.get("correct_index"))
+    except (TypeError, ValueError):
+        raise ValueError("'correct_index' must be an integer") from None
+    if correct not in (0, 1, 2, 3):
+        raise ValueError("'correct_index' must be between 0 and 3")
+    qtype = str(row.get("type") or "MCQ").strip().upper() or "MCQ"
+    return (game_id, text, *options, correct, qtype)
+
+
+def team_params(game_id: int, row: dict) -> tuple:
+    """Insert parameters for a team row, or ValueError"""
+    return (game_id, _text(row, "name"), _text(row, "code").upper())
+
+
+PARAMS = {"questions": question_params, "teams": team_params}
+
+
+# ----------------------------
+# Import
+# ----------------------------
+def read_rows(stream, fmt: str):
+    """Yield ``(line number, row dict or ValueError)`` from a text stream"""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+    elif fmt == "jsonl":
+        for line_no, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                yield line_no, ValueError(f"invalid JSON: {e}")
+                continue
+            yield line_no, row if isinstance(row, dict) else ValueError("expected a JSON object")
+    else:
+        raise ValueError(f"Unsupported format: {fmt}")
+
+
+def import_rows(db, game_id: int, kind: str, rows, chunk_size: int = 1000, progress=None) -> dict:
+    """Validate and insert rows in chunked transactions.
+
+    ``rows`` yields ``(line number, row)`` pairs as from ``read_rows``;
+    ``progress(report)`` is called after every committed chunk. Returns a
+    report with ``inserted``, ``skipped`` (duplicates), ``invalid`` and the
+    first ``errors`` as ``[line, message]``.
+    """
+    if kind not in KINDS:
+        raise ValueError(f"Unsupported kind: {kind}")
+    sql, to_params = INSERT_SQL[kind], PARAMS[kind]
+    report = {"kind": kind, "gameId": game_id, "inserted": 0, "skipped": 0, "invalid": 0, "errors": []}
+
+    def commit(chunk):
+        # rowcount, unlike total_changes, leaves out rows written by triggers (questions_fts)
+        inserted = db.executemany(sql, chunk).rowcount
+        db.commit()
+        report["inserted"] += inserted
+        report["skipped"] += len(chunk) - inserted
+        if progress:
+            progress(report)
+
+    chunk = []
+    for line_no, row in rows:
+        try:
+            if isinstance(row, Exception):
+                raise row
+            chunk.append(to_params(game_id, row))
+        except ValueError as e:
+            report["invalid"] += 1
+            if len(report["errors"]) < MAX_REPORTED_ERRORS:
+                report["errors"].append([line_no, str(e)])
+            continue
+        if len(chunk) >= chunk_size:
+            commit(chunk)
+            chunk = []
+    if chunk:
+        commit(chunk)
+    return report
+
+
+def import_file(game_id: int, kind: str, stream, fmt: str, progress=None) -> dict:
+    """Import a text stream into a game and reload its in-memory state once"""
+    from .state import get_game, reload_game
+
+    db = get_db()
+    if get_game(game_id) is None:
+        raise ValueError(f"Game {game_id} not found")
+    try:
+        report = import_rows(
+            db, game_id, kind, read_rows(stream, fmt),
+            chunk_size=current_app.config["IMPORT_CHUNK_SIZE"], progress=progress,
+        )
+        eventlog.record(game_id, "bulk_import", db=db, rows_kind=kind, inserted=report["inserted"],
+                        skipped=report["skipped"], invalid=report["invalid"])
+        db.commit()
+    finally:
+        # Chunks already committed must show up even if a later one failed
+        reload_game(game_id)
+    return report
+
+
+# ----------------------------
+# Export
+# ----------------------------
+def export_rows(db, game_id: int, kind: str, fmt: str, chunk_size: int = 1000):
+    """Yield the game's questions or teams as CSV or JSONL text chunks"""
+    if kind not in KINDS:
+        raise ValueError(f"Unsupported kind: {kind}")
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported format: {fmt}")
+    columns = COLUMNS[kind]
+    cursor = db.execute(f"SELECT {', '.join(columns)} FROM {kind} WHERE game_id = ? ORDER BY id", (game_id,))
+
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n") if fmt == "csv" else None
+    if writer:
+        writer.writerow(columns)
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        for row in rows:
+            if writer:
+                writer.writerow(tuple(row))
+            else:
+                buf.write(json.dumps(dict(zip(columns, tuple(row))), ensure_ascii=False) + "\n")
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+    tail = buf.getvalue()
+    if tail:
+        yield tail
+
+
+# ----------------------------
+# CLI
+# ----------------------------
+@click.command("import-bank")
+@click.argument("game_id", type=int)
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--kind", type=click.Choice(KINDS), default="questions", show_default=True)
+@click.option("--format", "fmt", type=click.Choice(FORMATS), default=None, help="Defaults to the file extension")
+@with_appcontext
+def import_bank_command(game_id, path, kind, fmt):
+    """Import questions or teams from a CSV/JSONL file into a game"""
+    fmt = fmt or format_for(path)
+
+    def progress(report):
+        click.echo(f"  {report['inserted']} inserted, {report['skipped']} skipped, {report['invalid']} invalid")
+
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        try:
+            report = import_file(game_id, kind, f, fmt, progress=progress)
+        except ValueError as e:
+            raise click.ClickException(str(e))
+    for line_no, message in report["errors"]:
+        click.echo(f"  line {line_no}: {message}", err=True)
+    click.echo(f"Imported {report['inserted']} {kind} into game {game_id} "
+               f"({report['skipped']} skipped, {report['invalid']} invalid).")
+
+
+@click.command("export-bank")
+@click.argument("game_id", type=int)
+@click.argument("path", type=click.Path(dir_okay=False, allow_dash=True))
+@click.option("--kind", type=click.Choice(KINDS), default="questions", show_default=True)
+@click.option("--format", "fmt", type=click.Choice(FORMATS), default=None, help="Defaults to the file extension")
+@with_appcontext
+def export_bank_command(game_id, path, kind, fmt):
+    """Export a game's questions or teams to a CSV/JSONL file ('-' for stdout)"""
+    fmt = fmt or format_for(path)
+    with click.open_file(path, "w", encoding="utf-8") as f:
+        for text in export_rows(get_db(), game_id, kind, fmt):
+            f.write(text)
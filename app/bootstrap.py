@@ -0,0 +1,60 @@
+"""One-time startup pipeline, run by ``create_app`` before serving.
+
+1. create any missing tables, columns and indexes, including the FTS5
+   question search index where SQLite supports it
+2. insert the demo game if the database is empty (``SEED_DEMO_DATA``)
+3. pre-warm per-process caches (``PREWARM_GAMES``): every game's in-memory
+   state and snapshot, the default game and the team-code index
+
+Page handlers never seed or check for an empty database; they only read
+the caches this fills. Each database path is bootstrapped once per process.
+"""
+import threading
+import time
+
+from . import registry
+from .db import ensure_question_search, get_db, init_db, seed_if_empty
+
+_done = set()        # DB paths already bootstrapped in this process
+_lock = threading.Lock()
+
+
+def prewarm() -> int:
+    """Load every game into memory and build its snapshot; return the game count"""
+    from .snapshot import state_snapshot
+    from .state import get_game
+
+    db = get_db()
+    game_ids = [r["id"] for r in db.execute("SELECT id FROM games ORDER BY id")]
+    for game_id in game_ids:
+        game = get_game(game_id)
+        if game is not None:
+            state_snapshot(game)
+    registry.default_game_id()
+    registry.warm_team_codes(db)
+    return len(game_ids)
+
+
+def bootstrap(app, force: bool = False) -> bool:
+    """Prepare the app's database and caches; return False if already done"""
+    path = str(app.config["DB_PATH"])
+    with _lock:
+        if path in _done and not force:
+            return False
+        started = time.perf_counter()
+        with app.app_context():
+            init_db()
+            if not ensure_question_search(get_db()):
+                app.logger.warning("bootstrap: SQLite has no FTS5; question search falls back to LIKE")
+            if app.config["SEED_DEMO_DATA"]:
+                seed_if_empty()
+            warmed = prewarm() if app.config["PREWARM_GAMES"] else 0
+        _done.add(path)
+    app.logger.info("bootstrap: %d game(s) warmed in %.1f ms", warmed, (time.perf_counter() - started) * 1000)
+    return True
+
+
+def reset() -> None:
+    """Allow the next bootstrap to run again (benchmarks that swap databases)"""
+    with _lock:
+        _done.clear()
@@ -0,0 +1,92 @@
+"""In-memory buzzer arbitration.
+
+The winner of a question is decided by an atomic ``dict.setdefault`` on the
+question id, so arbitration never waits on a lock or on SQLite. Every attempt,
+winning or not, is stamped with its server receive time in microseconds and
+handed to the write-behind journal, which persists ``buzzer_events`` and the
+matching ``game_events`` rows in batches.
+"""
+import time
+
+from . import eventlog
+from .journal import journal
+
+# OR IGNORE keeps a stale accepted row for a question that was reset in the
+# meantime from colliding with the new winner
+INSERT_BUZZ = (
+    "INSERT OR IGNORE INTO buzzer_events (game_id, team_id, question_id, ts, ts_us, accepted) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+
+
+def recv_us() -> int:
+    """High-resolution server receive timestamp (microseconds since the epoch)"""
+    return time.time_ns() // 1000
+
+
+class BuzzAttempt:
+    __slots__ = ("team_id", "question_id", "recv_us", "accepted")
+
+    def __init__(self, team_id: int, question_id: int, recv_us: int):
+        self.team_id = team_id
+        self.question_id = question_id
+        self.recv_us = recv_us
+        self.accepted = False
+
+
+class BuzzerArbiter:
+    """Per-game first-buzz-wins arbiter"""
+
+    def __init__(self, game_id: int):
+        self.game_id = game_id
+        self.winners = {}    # question id -> winning BuzzAttempt
+        # Optional global confirmation for multi-worker runs, see app/cluster.py:
+        # called with (game_id, attempt) for a local winner, returns the real winner's team id
+        # or None if the database has no winner
+        self.confirm = None
+
+    def load_winner(self, question_id: int, team_id: int, ts_us: int = 0) -> None:
+        """Restore an accepted buzz that is already persisted"""
+        attempt = BuzzAttempt(team_id, question_id, ts_us)
+        attempt.accepted = True
+        self.winners[question_id] = attempt
+
+    def winner(self, question_id: int):
+        attempt = self.winners.get(question_id)
+        return attempt.team_id if attempt else None
+
+    def claim(self, team_id: int, question_id: int, received_us: int) -> bool:
+        """Record an attempt and return True if it is the first for the question"""
+        attempt = BuzzAttempt(team_id, question_id, received_us)
+        attempt.accepted = self.winners.setdefault(question_id, attempt) is attempt
+        if attempt.accepted and self.confirm is not None:
+            winner_id = self.confirm(self.game_id, attempt)
+            if winner_id == team_id:
+                self._log(attempt)
+                return True    # the confirming claim already persisted the row
+            attempt.accepted = False
+            if winner_id is None:
+                # Nothing persisted: forget the local claim so the question stays open
+                if self.winners.get(question_id) is attempt:
+                    del self.winners[question_id]
+            else:
+                self.load_winner(question_id, winner_id)
+        self._record(attempt)
+        return attempt.accepted
+
+    def reject(self, team_id: int, question_id: int, received_us: int) -> None:
+        """Record an attempt refused before arbitration (e.g. outside SHOW)"""
+        self._record(BuzzAttempt(team_id, question_id, received_us))
+
+    def reset(self, question_id: int) -> None:
+        self.winners.pop(question_id, None)
+
+    def _record(self, a: BuzzAttempt) -> None:
+        journal.append(
+            INSERT_BUZZ,
+            (self.game_id, a.team_id, a.question_id, a.recv_us // 1000, a.recv_us, int(a.accepted)),
+        )
+        self._log(a)
+
+    def _log(self, a: BuzzAttempt) -> None:
+        eventlog.record(self.game_id, "buzz", a.team_id, a.question_id, ts_us=a.recv_us, accepted=int(a.accepted))
@@ -0,0 +1,224 @@
+"""Multi-process deployment support.
+
+Several worker processes can serve the same games. Socket.IO rooms are shared
+through ``SOCKETIO_MESSAGE_QUEUE``; in-memory game state is kept coherent with
+small messages on a cluster broker:
+
+- ``invalidate``: an admin write changed a game; other workers reload it
+- ``buzz``: a worker accepted the winning buzz for a question
+- ``lifeline``: a worker applied a 50-50 for a team
+- ``answer``: a worker took an all-play answer, so every worker's tallies match
+
+Buzz arbitration stays globally correct by confirming each local winner with
+an atomic claim on the ``idx_buzzer_accepted_unique`` index in the shared
+SQLite file. Losers on a worker that already knows the winner never reach the
+database, so there is at most one claim per worker per question. Deadline
+expiry is claimed the same way, with a conditional settings update (see
+``GameState.lock_at_deadline``), so every worker runs its scheduler but only
+one locks each question.
+
+Brokers:
+
+- ``redis://``: production, with the Redis Socket.IO message queue
+- ``file:///path/bus.jsonl``: processes on one machine append messages to a
+  shared file and follow it; for tests and benchmarks without Redis
+- ``local://``: delivers within one process only, where a worker ignores its
+  own messages, so it exercises the publish and claim paths but no replication
+"""
+import json
+import os
+import uuid
+
+from .db import get_pool
+
+CHANNEL = "quizzmaster:cluster"
+
+
+class LocalBroker:
+    """In-process publish/subscribe with the same interface as RedisBroker"""
+
+    def __init__(self):
+        self._subscribers = []
+
+    def publish(self, message: dict) -> None:
+        for callback in list(self._subscribers):
+            callback(json.loads(json.dumps(message)))
+
+    def subscribe(self, callback, socketio) -> None:
+        self._subscribers.append(callback)
+
+
+class FileBroker:
+    """Publish/subscribe over an append-only JSON-lines file shared by local processes"""
+
+    def __init__(self, path: str, poll_s: float = 0.002):
+        self.path = path
+        self.poll_s = poll_s
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        open(path, "a").close()
+
+    def publish(self, message: dict) -> None:
+        # One O_APPEND write per message, so lines from different processes never interleave
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND)
+        try:
+            os.write(fd, (json.dumps(message, separators=(",", ":")) + "\n").encode())
+        finally:
+            os.close(fd)
+
+    def subscribe(self, callback, socketio) -> None:
+        f = open(self.path, "rb")
+        f.seek(0, os.SEEK_END)    # only messages published from now on
+
+        def follow():
+            partial = b""
+            while True:
+                chunk = f.read()
+                if not chunk:
+                    socketio.sleep(self.poll_s)
+                    continue
+                lines = (partial + chunk).split(b"\n")
+                partial = lines.pop()
+                for line in lines:
+                    if line:
+                        callback(json.loads(line))
+
+        socketio.start_background_task(follow)
+
+
+class RedisBroker:
+    def __init__(self, url: str, channel: str = CHANNEL):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("CLUSTER_BROKER_URL=redis://... requires the 'redis' package") from e
+        self._redis = redis.Redis.from_url(url)
+        self.channel = channel
+
+    def publish(self, message: dict) -> None:
+        self._redis.publish(self.channel, json.dumps(message))
+
+    def subscribe(self, callback, socketio) -> None:
+        pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(self.channel)
+
+        def listen():
+            for item in pubsub.listen():
+                callback(json.loads(item["data"]))
+
+        socketio.start_background_task(listen)
+
+
+def make_broker(url: str):
+    if url.startswith("local://"):
+        return LocalBroker()
+    if url.startswith("file://"):
+        return FileBroker(url[len("file://"):])
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBroker(url)
+    raise ValueError(f"Unsupported CLUSTER_BROKER_URL: {url}")
+
+
+class Cluster:
+    def __init__(self):
+        self.app = None
+        self.broker = None
+        self.worker_id = uuid.uuid4().hex
+        self.messages_sent = 0
+        self.messages_applied = 0
+        self.buzz_claims = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.broker is not None
+
+    def init_app(self, app, socketio, broker=None) -> None:
+        self.app = app
+        url = app.config.get("CLUSTER_BROKER_URL")
+        if broker is None and url:
+            broker = make_broker(url)
+        self.broker = broker
+        if broker is not None:
+            broker.subscribe(self._on_message, socketio)
+
+    # ----------------------------
+    # Outgoing
+    # ----------------------------
+    def publish(self, kind: str, game_id: int, **fields) -> None:
+        if self.broker is None:
+            return
+        message = {"kind": kind, "gameId": game_id, "origin": self.worker_id}
+        message.update(fields)
+        self.broker.publish(message)
+        self.messages_sent += 1
+
+    def confirm_buzz(self, game_id: int, attempt) -> int:
+        """Claim a question in the shared database; return the global winner's team id.
+
+        None when the claim was ignored yet no accepted row exists, so no
+        worker may declare a winner the database does not have.
+        """
+        from .buzzer import INSERT_BUZZ
+
+        self.buzz_claims += 1
+        pool = get_pool(self.app)
+        db = pool.acquire()
+        try:
+            cursor = db.execute(
+                INSERT_BUZZ,
+                (game_id, attempt.team_id, attempt.question_id,
+                 attempt.recv_us // 1000, attempt.recv_us, 1),
+            )
+            if cursor.rowcount == 1:
+                db.execute(
+                    "UPDATE settings SET active_team_id = ? WHERE game_id = ?",
+                    (attempt.team_id, game_id),
+                )
+                db.commit()
+                return attempt.team_id
+            db.commit()
+            row = db.execute(
+                "SELECT team_id FROM buzzer_events WHERE game_id = ? AND question_id = ? AND accepted = 1",
+                (game_id, attempt.question_id),
+            ).fetchone()
+            return row["team_id"] if row else None
+        finally:
+            pool.release(db)
+
+    # ----------------------------
+    # Incoming
+    # ----------------------------
+    def _on_message(self, message: dict) -> None:
+        if message.get("origin") == self.worker_id:
+            return
+        from . import registry
+        from .state import forget_game, peek_game
+
+        kind = message.get("kind")
+        game_id = message.get("gameId")
+        if kind == "invalidate":
+            forget_game(game_id)
+            registry.forget_team_codes()
+        else:
+            game = peek_game(game_id)
+            if game is None:
+                return
+            if kind == "buzz":
+                game.apply_remote_buzz(message["questionId"], message["teamId"])
+            elif kind == "answer":
+                game.apply_remote_answer(message["teamId"], message["questionId"], message["choice"])
+            elif kind == "lifeline":
+                game.apply_remote_lifeline(
+                    message["teamId"], message["questionId"], message["masked"], tuple(message["usage"])
+                )
+        self.messages_applied += 1
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "messages_sent": self.messages_sent,
+            "messages_applied": self.messages_applied,
+            "buzz_claims": self.buzz_claims,
+        }
+
+
+cluster = Cluster()
@@ -14,7 +14,24 @@ class Config:
     INSTANCE_DIR = BASE_DIR / 'instance'
     
     # Database configuration
-    DB_PATH = INSTANCE_DIR / 'app.db'
+    DB_PATH = Path(os.environ.get('DB_PATH') or INSTANCE_DIR / 'app.db')
+    # Connection pool: idle connections kept per process, and per-connection PRAGMAs
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', '8'))
+    DB_BUSY_TIMEOUT_MS = int(os.environ.get('DB_BUSY_TIMEOUT_MS', '5000'))
+    DB_SYNCHRONOUS = os.environ.get('DB_SYNCHRONOUS', 'NORMAL')
+    DB_CACHE_SIZE_KB = int(os.environ.get('DB_CACHE_SIZE_KB', '8192'))
+    DB_MMAP_SIZE = int(os.environ.get('DB_MMAP_SIZE', str(64 * 1024 * 1024)))
+    DB_STATEMENT_CACHE_SIZE = int(os.environ.get('DB_STATEMENT_CACHE_SIZE', '256'))
+    # Startup: insert the demo game into an empty database, and load every game into memory
+    SEED_DEMO_DATA = os.environ.get('SEED_DEMO_DATA', 'true').lower() in ['true', '1', 'yes']
+    PREWARM_GAMES = os.environ.get('PREWARM_GAMES', 'true').lower() in ['true', '1', 'yes']
+    # Admin console: rows per page for the question/team lists and JSON API
+    ADMIN_PAGE_SIZE = int(os.environ.get('ADMIN_PAGE_SIZE', '50'))
+    # Bulk import: rows per executemany transaction
+    IMPORT_CHUNK_SIZE = int(os.environ.get('IMPORT_CHUNK_SIZE', '1000'))
+    # Write-behind journal: audit rows are committed together every few ms or every N rows
+    JOURNAL_FLUSH_INTERVAL_MS = int(os.environ.get('JOURNAL_FLUSH_INTERVAL_MS', '5'))
+    JOURNAL_MAX_BATCH = int(os.environ.get('JOURNAL_MAX_BATCH', '500'))
     
     # JSON configuration
     JSON_SORT_KEYS = False
@@ -26,10 +43,59 @@ class Config:
     
     # Socket.IO configuration
     SOCKETIO_CORS_ALLOWED_ORIGINS = "*"  # For development
-    SOCKETIO_ASYNC_MODE = os.environ.get('SOCKETIO_ASYNC_MODE', 'eventlet')
+    # Runtime: 'threading' (default), 'eventlet' or 'gevent', see app/runtime.py. Under the green
+    # runtimes DB_OFFLOAD moves SQLite write statements and commits to a native thread pool
+    SOCKETIO_ASYNC_MODE = os.environ.get('SOCKETIO_ASYNC_MODE', 'threading').lower()
+    DB_OFFLOAD = os.environ.get('DB_OFFLOAD', 'true').lower() in ['true', '1', 'yes']
+    # Wire format: 'json' (text) or 'msgpack' (binary MessagePack; needs the msgpack package,
+    # and pages load the Socket.IO client build with the matching parser)
+    SOCKETIO_SERIALIZER = os.environ.get('SOCKETIO_SERIALIZER', 'json').lower()
+    # Multi-process mode: Socket.IO rooms are shared through the message queue
+    # (e.g. redis://localhost:6379/0) and game state through the cluster broker
+    SOCKETIO_MESSAGE_QUEUE = os.environ.get('SOCKETIO_MESSAGE_QUEUE') or None
+    CLUSTER_BROKER_URL = os.environ.get('CLUSTER_BROKER_URL') or SOCKETIO_MESSAGE_QUEUE
+    # 'unicast': join/state_request/state_push are answered to the requesting sid only;
+    # 'broadcast': legacy behaviour, every request re-broadcasts to the whole game room
+    STATE_REPLY_MODE = os.environ.get('STATE_REPLY_MODE', 'unicast')
+    # Send room-wide transitions as sequenced state_patch deltas instead of full snapshots
+    STATE_DELTAS = os.environ.get('STATE_DELTAS', 'true').lower() in ['true', '1', 'yes']
+    
+    # Spam guard: token buckets per socket and per team; refused events are dropped and counted
+    RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', 'true').lower() in ['true', '1', 'yes']
+    BUZZ_RATE_PER_S = float(os.environ.get('BUZZ_RATE_PER_S', '4'))
+    BUZZ_BURST = float(os.environ.get('BUZZ_BURST', '6'))
+    FIFTY_RATE_PER_S = float(os.environ.get('FIFTY_RATE_PER_S', '1'))
+    FIFTY_BURST = float(os.environ.get('FIFTY_BURST', '3'))
+    ANSWER_RATE_PER_S = float(os.environ.get('ANSWER_RATE_PER_S', '2'))
+    ANSWER_BURST = float(os.environ.get('ANSWER_BURST', '4'))
+    
+    # Instrumentation: handler/query/emit metrics served as text on /metrics
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'false').lower() in ['true', '1', 'yes']
+    # Profiling: 'off', 'cprofile' (every event) or 'sample' (1 in PROFILE_SAMPLE_RATE per event type);
+    # per-event-type .prof dumps and slow_events.jsonl are written to PROFILE_DIR
+    PROFILE_MODE = os.environ.get('PROFILE_MODE', 'off').lower()
+    PROFILE_SAMPLE_RATE = int(os.environ.get('PROFILE_SAMPLE_RATE', '100'))
+    PROFILE_DUMP_EVERY = int(os.environ.get('PROFILE_DUMP_EVERY', '100'))
+    PROFILE_DIR = Path(os.environ.get('PROFILE_DIR') or INSTANCE_DIR / 'profiles')
+    # Handlers and admin ops slower than this are logged with game and query count (0 = off)
+    SLOW_EVENT_MS = float(os.environ.get('SLOW_EVENT_MS', '0'))
     
     # Game settings
     DEFAULT_QUESTION_TIME_S = 30
+    # Question pipeline: queued questions pushed to clients ahead of time, and how far
+    # ahead of "now" a reveal is scheduled so every screen shows it at the same moment
+    PRESTAGE_COUNT = int(os.environ.get('PRESTAGE_COUNT', '3'))
+    REVEAL_LEAD_MS = int(os.environ.get('REVEAL_LEAD_MS', '250'))
+    # Audience screens (role 'spectator') get at most one coalesced state push per this interval
+    SPECTATOR_INTERVAL_MS = int(os.environ.get('SPECTATOR_INTERVAL_MS', '500'))
+    # All-play mode: per-option answer tallies are pushed to the host at most this often
+    TALLY_INTERVAL_MS = int(os.environ.get('TALLY_INTERVAL_MS', '250'))
+    # Points for the admin 'judge' op when no points are given
+    SCORE_CORRECT = int(os.environ.get('SCORE_CORRECT', '10'))
+    SCORE_WRONG = int(os.environ.get('SCORE_WRONG', '0'))
+    # Deadlines: SHOW moves to LOCK on the server when the timer runs out
+    AUTO_LOCK_ON_DEADLINE = os.environ.get('AUTO_LOCK_ON_DEADLINE', 'true').lower() in ['true', '1', 'yes']
+    TIMER_TICK_MS = int(os.environ.get('TIMER_TICK_MS', '50'))
 
 def load_config():
     """Load and return configuration object"""
@@ -1,32 +1,271 @@
 import sqlite3
+import threading
 import click
 from pathlib import Path
 from flask import current_app, g
 from flask.cli import with_appcontext
 import time
 
+from .metrics import metrics
+from .runtime import offloader
+
+# Columns added after the first release: (table, column, declaration)
+SCHEMA_UPGRADES = [
+    ('buzzer_events', 'ts_us', 'INTEGER'),
+    ('settings', 'answer_mode', "TEXT NOT NULL DEFAULT 'BUZZ' CHECK (answer_mode IN ('BUZZ', 'ALL_PLAY'))"),
+    ('settings', 'show_at_ms', 'INTEGER NOT NULL DEFAULT 0'),
+]
+
+def upgrade_schema(db):
+    """Add columns missing from databases created by older schema.sql versions"""
+    for table, column, decl in SCHEMA_UPGRADES:
+        columns = [r[1] for r in db.execute(f'PRAGMA table_info({table})')]
+        if columns and column not in columns:
+            db.execute(f'ALTER TABLE {table} ADD COLUMN {column} {decl}')
+    db.commit()
+
+# Full-text index over question text, kept in sync by triggers. Created at
+# startup rather than in schema.sql because some SQLite builds lack FTS5.
+QUESTION_SEARCH_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS questions_fts USING fts5(text, content='questions', content_rowid='id');
+CREATE TRIGGER IF NOT EXISTS questions_fts_ai AFTER INSERT ON questions BEGIN
+  INSERT INTO questions_fts(rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS questions_fts_ad AFTER DELETE ON questions BEGIN
+  INSERT INTO questions_fts(questions_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+CREATE TRIGGER IF NOT EXISTS questions_fts_au AFTER UPDATE OF text ON questions BEGIN
+  INSERT INTO questions_fts(questions_fts, rowid, text) VALUES ('delete', old.id, old.text);
+  INSERT INTO questions_fts(rowid, text) VALUES (new.id, new.text);
+END;
+"""
+
+def has_question_search(db):
+    """True if the questions_fts index exists in this database"""
+    return db.execute("SELECT 1 FROM sqlite_master WHERE name = 'questions_fts'").fetchone() is not None
+
+def ensure_question_search(db):
+    """Create (and on first creation, backfill) the question text index; False without FTS5"""
+    if has_question_search(db):
+        return True
+    try:
+        db.executescript(QUESTION_SEARCH_SCHEMA)
+    except sqlite3.OperationalError:
+        return False
+    db.execute("INSERT INTO questions_fts(questions_fts) VALUES ('rebuild')")
+    db.commit()
+    return True
+
+def _is_read(sql):
+    return sql.lstrip()[:6].upper() in ('SELECT', 'PRAGMA')
+
+class PooledConnection(sqlite3.Connection):
+    """sqlite3 connection that counts its commits into its pool's stats.
+
+    Under green runtimes with DB_OFFLOAD, every write statement and commit runs
+    in a native thread (see app/runtime.py). A writer waiting on SQLite's lock
+    then sleeps in that thread instead of freezing the hub, so the green thread
+    holding the lock can still reach its commit. WAL readers never wait and
+    stay on the hub.
+    """
+
+    pool = None
+
+    def execute(self, sql, *args):
+        if self.pool is not None and self.pool.offload and not _is_read(sql):
+            return offloader.run(super().execute, sql, *args)
+        return super().execute(sql, *args)
+
+    def commit(self):
+        if self.pool is not None and self.pool.offload:
+            offloader.run(super().commit)
+        else:
+            super().commit()
+        if self.pool is not None:
+            self.pool.commits += 1
+
+    def executemany(self, sql, *args):
+        if self.pool is not None and self.pool.offload:
+            return offloader.run(super().executemany, sql, *args)
+        return super().executemany(sql, *args)
+
+class InstrumentedConnection(PooledConnection):
+    """Pooled connection that times every statement for /metrics and the slow-event log"""
+
+    def execute(self, sql, *args):
+        started = time.perf_counter()
+        try:
+            return super().execute(sql, *args)
+        finally:
+            kind = 'read' if _is_read(sql) else 'write'
+            metrics.observe_query(kind, time.perf_counter() - started)
+
+    def executemany(self, sql, *args):
+        started = time.perf_counter()
+        try:
+            return super().executemany(sql, *args)
+        finally:
+            metrics.observe_query('write', time.perf_counter() - started)
+
+    def commit(self):
+        started = time.perf_counter()
+        try:
+            super().commit()
+        finally:
+            metrics.observe_query('commit', time.perf_counter() - started)
+
+class ConnectionPool:
+    """Pool of long-lived SQLite connections for one database file.
+
+    Connections are opened with their PRAGMAs applied once and keep their
+    statement cache for life. ``acquire`` never blocks: when no idle
+    connection is available a new one is opened, and ``release`` closes
+    connections beyond ``size``. The lock only guards list operations, so it
+    is safe under eventlet green threads as well as OS threads.
+    """
+
+    def __init__(self, path, size=8, busy_timeout_ms=5000, synchronous='NORMAL',
+                 cache_size_kb=8192, mmap_size=64 * 1024 * 1024, statement_cache=256,
+                 factory=PooledConnection, offload=False):
+        if str(synchronous).upper() not in ('OFF', 'NORMAL', 'FULL', 'EXTRA'):
+            raise ValueError(f'Invalid DB_SYNCHRONOUS: {synchronous}')
+        self.path = str(path)
+        self.size = size
+        self.busy_timeout_ms = busy_timeout_ms
+        self.synchronous = synchronous
+        self.cache_size_kb = cache_size_kb
+        self.mmap_size = mmap_size
+        self.statement_cache = statement_cache
+        self.factory = factory
+        self.offload = offload
+
+        self._idle = []
+        self._lock = threading.Lock()
+        self._upgraded = False
+        self.opened = 0
+        self.closed = 0
+        self.acquired = 0
+        self.reused = 0
+        self.in_use = 0
+        self.commits = 0
+
+    def _connect(self):
+        conn = sqlite3.connect(
+            self.path,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            cached_statements=self.statement_cache,
+            check_same_thread=False,
+            factory=self.factory,
+        )
+        conn.pool = self
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA foreign_keys=ON')
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(f'PRAGMA busy_timeout={int(self.busy_timeout_ms)}')
+        conn.execute(f'PRAGMA synchronous={self.synchronous}')
+        conn.execute(f'PRAGMA cache_size=-{int(self.cache_size_kb)}')
+        conn.execute(f'PRAGMA mmap_size={int(self.mmap_size)}')
+        if not self._upgraded:
+            upgrade_schema(conn)
+            self._upgraded = True
+        return conn
+
+    def acquire(self):
+        with self._lock:
+            conn = self._idle.pop() if self._idle else None
+            self.acquired += 1
+            self.in_use += 1
+            if conn is not None:
+                self.reused += 1
+        if conn is None:
+            try:
+                conn = self._connect()
+            except Exception:
+                with self._lock:
+                    self.in_use -= 1
+                raise
+            with self._lock:
+                self.opened += 1
+        return conn
+
+    def release(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        with self._lock:
+            self.in_use -= 1
+            if len(self._idle) < self.size:
+                self._idle.append(conn)
+                return
+            self.closed += 1
+        conn.close()
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+            self.closed += len(idle)
+        for conn in idle:
+            conn.close()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': self.size,
+                'idle': len(self._idle),
+                'in_use': self.in_use,
+                'opened': self.opened,
+                'closed': self.closed,
+                'acquired': self.acquired,
+                'reused': self.reused,
+                'commits': self.commits,
+            }
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_pool(app=None):
+    """Return the connection pool for the app's current DB_PATH"""
+    config = (app or current_app).config
+    path = str(config['DB_PATH'])
+    pool = _pools.get(path)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(path)
+            if pool is None:
+                Path(path).parent.mkdir(parents=True, exist_ok=True)
+                pool = ConnectionPool(
+                    path,
+                    size=config['DB_POOL_SIZE'],
+                    busy_timeout_ms=config['DB_BUSY_TIMEOUT_MS'],
+                    synchronous=config['DB_SYNCHRONOUS'],
+                    cache_size_kb=config['DB_CACHE_SIZE_KB'],
+                    mmap_size=config['DB_MMAP_SIZE'],
+                    statement_cache=config['DB_STATEMENT_CACHE_SIZE'],
+                    factory=InstrumentedConnection if _instrumented(config) else PooledConnection,
+                    offload=offloader.enabled,
+                )
+                _pools[path] = pool
+    return pool
+
+def _instrumented(config):
+    """Statement timing is needed for metrics and for query counts in slow-event logs"""
+    return config['METRICS_ENABLED'] or config['PROFILE_MODE'] != 'off' or config['SLOW_EVENT_MS'] > 0
+
+def pool_stats(app=None):
+    """Connection pool counters for the app's database"""
+    return get_pool(app).stats()
+
 def get_db():
-    """Get database connection with row factory and foreign keys enabled"""
+    """Get a pooled database connection with row factory and PRAGMAs applied"""
     if 'db' not in g:
-        # Ensure instance directory exists
-        instance_path = Path(current_app.instance_path)
-        instance_path.mkdir(exist_ok=True)
-        
-        # Open connection with proper settings
-        g.db = sqlite3.connect(
-            current_app.config['DB_PATH'],
-            detect_types=sqlite3.PARSE_DECLTYPES
-        )
-        g.db.row_factory = sqlite3.Row
-        g.db.execute('PRAGMA foreign_keys=ON')
+        g.db = get_pool().acquire()
     
     return g.db
 
 def close_db(e=None):
-    """Close database connection"""
+    """Return the request's connection to the pool"""
     db = g.pop('db', None)
     if db is not None:
-        db.close()
+        get_pool().release(db)
 
 def init_db(schema_path=None):
     """Initialize database with schema from migrations/schema.sql"""
@@ -40,67 +279,70 @@ def init_db(schema_path=None):
     
     db.commit()
 
-def seed_if_empty():
-    """Insert demo data if no games exist"""
-    db = get_db()
-    
-    # Check if any games exist
-    existing_games = db.execute('SELECT COUNT(*) as count FROM games').fetchone()
-    if existing_games['count'] > 0:
-        return
-    
+def create_game(db, name, round_names=('Round 1', 'Round 2', 'Round 3'), teams=()):
+    """Insert a game with its rounds, teams and an IDLE settings row; return its id"""
     current_time = int(time.time() * 1000)
-    
-    # Insert demo game
     cursor = db.execute(
         'INSERT INTO games (name, created_at) VALUES (?, ?)',
-        ('Demo Game', current_time)
+        (name, current_time)
     )
     game_id = cursor.lastrowid
     
-    # Insert 3 rounds
-    rounds_data = [
-        ('Round 1', 1),
-        ('Round 2', 2),
-        ('Round 3', 3)
-    ]
-    
     round_ids = []
-    for round_name, order_index in rounds_data:
+    for order_index, round_name in enumerate(round_names, start=1):
         cursor = db.execute(
             'INSERT INTO rounds (game_id, name, order_index) VALUES (?, ?, ?)',
             (game_id, round_name, order_index)
         )
         round_ids.append(cursor.lastrowid)
     
-    # Insert 2 teams
-    teams_data = [
-        ('Team A', 'TEAM_A'),
-        ('Team B', 'TEAM_B')
-    ]
-    
-    team_ids = []
-    for team_name, team_code in teams_data:
-        cursor = db.execute(
+    for team_name, team_code in teams:
+        db.execute(
             'INSERT INTO teams (game_id, name, code) VALUES (?, ?, ?)',
             (game_id, team_name, team_code)
         )
-        team_ids.append(cursor.lastrowid)
     
-    # Insert sample MCQ
+    db.execute(
+        '''INSERT INTO settings (game_id, current_round_id, current_question_id, state, deadline_epoch_ms, active_team_id)
+           VALUES (?, ?, ?, ?, ?, ?)''',
+        (game_id, round_ids[0] if round_ids else None, None, 'IDLE', 0, None)
+    )
+    
+    # Starting point for replays of this game's event log
+    from .eventlog import record
+    record(game_id, 'settings', db=db, current_round_id=round_ids[0] if round_ids else None, state='IDLE')
+    return game_id
+
+def seed_if_empty():
+    """Insert demo data if no games exist"""
+    db = get_db()
+    
+    # Take the write lock first so workers starting together seed only once
+    db.execute('BEGIN IMMEDIATE')
+    existing_games = db.execute('SELECT COUNT(*) as count FROM games').fetchone()
+    if existing_games['count'] > 0:
+        db.rollback()
+        return
+    
+    # Demo game with 3 rounds and 2 teams
+    game_id = create_game(
+        db,
+        'Demo Game',
+        teams=[('Team A', 'TEAM_A'), ('Team B', 'TEAM_B')]
+    )
+    
+    # Insert sample MCQ and make it current
     cursor = db.execute(
         '''INSERT INTO questions (game_id, text, opt_a, opt_b, opt_c, opt_d, correct_index, type) 
            VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
         (game_id, 'What is the capital of France?', 'London', 'Berlin', 'Paris', 'Madrid', 2, 'MCQ')
     )
-    question_id = cursor.lastrowid
-    
-    # Initialize settings
     db.execute(
-        '''INSERT INTO settings (game_id, current_round_id, current_question_id, state, deadline_epoch_ms, active_team_id)
-           VALUES (?, ?, ?, ?, ?, ?)''',
-        (game_id, round_ids[0], question_id, 'IDLE', 0, None)
+        'UPDATE settings SET current_question_id = ? WHERE game_id = ?',
+        (cursor.lastrowid, game_id)
     )
+    from .eventlog import record
+    record(game_id, 'settings', db=db, current_question_id=cursor.lastrowid)
     
     db.commit()
     click.echo('Database seeded with demo data')
@@ -122,4 +364,11 @@ def init_app(app):
     """Register database functions with Flask app"""
     app.teardown_appcontext(close_db)
     app.cli.add_command(init_db_command)
-    app.cli.add_command(seed_db_command)
\ No newline at end of file
+    app.cli.add_command(seed_db_command)
+    
+    from .bank import export_bank_command, import_bank_command
+    app.cli.add_command(import_bank_command)
+    app.cli.add_command(export_bank_command)
+    
+    from .eventlog import replay_game_command
+    app.cli.add_command(replay_game_command)
\ No newline at end of file
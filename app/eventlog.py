@@ -0,0 +1,239 @@
+"""Append-only game event log and the replay engine that folds it back into state.
+
+Every state transition, buzz attempt, lifeline use, judgement and admin op is
+appended to ``game_events``. Admin writes insert their event in the same
+transaction as the change; hot-path events (buzzes, lifelines) go through the
+write-behind journal, which keeps them in order with the admin writes because
+admin writes flush it first.
+
+``replay`` rebuilds a game's dynamic state (settings, buzz winners, masks, answers,
+lifelines and scores) as of any event id or timestamp. Teams and questions are
+taken from their tables, since they are never deleted.
+
+Kinds and their data:
+
+- settings: the changed settings columns
+- buzz: team/question, ``accepted``
+- buzz_reset: question whose accepted buzz was cleared
+- lifeline: team/question, ``lifeline``, ``roundId``, ``masked``
+- masks_cleared: question
+- answer: team/question, ``choice``, ``correct`` (all-play)
+- answers_reset: question whose all-play answers were cleared when it was shown again
+- judge: team/question, ``correct``, ``points``
+- team_added, question_added: the new row's id
+- bulk_import: ``rows_kind`` (questions or teams) and row counts
+- queue_set: ``roundId`` and its queued ``questionIds``
+- queue_pop: question taken off the front of ``roundId``'s queue
+- admin: ``op`` and its fields (audit only, its effects have their own events)
+
+    flask --app app replay-game GAME_ID [--until EVENT_ID] [--at EPOCH_MS] [--check]
+"""
+import json
+import time
+
+import click
+from flask.cli import with_appcontext
+
+from .db import get_db
+from .journal import journal
+from .leaderboard import Leaderboard
+
+INSERT_EVENT = (
+    "INSERT INTO game_events (game_id, ts_us, kind, team_id, question_id, data) VALUES (?, ?, ?, ?, ?, ?)"
+)
+
+
+def record(game_id: int, kind: str, team_id=None, question_id=None, db=None, ts_us=None, **data) -> None:
+    """Append an event; written with ``db`` in the caller's transaction, else through the journal"""
+    params = (
+        game_id,
+        ts_us if ts_us is not None else time.time_ns() // 1000,
+        kind,
+        team_id,
+        question_id,
+        json.dumps(data, separators=(",", ":")) if data else "{}",
+    )
+    if db is not None:
+        db.execute(INSERT_EVENT, params)
+    else:
+        journal.append(INSERT_EVENT, params)
+
+
+def events(db, game_id: int, after: int = 0, limit: int = 500) -> list:
+    """A page of events after an event id, oldest first"""
+    rows = db.execute(
+        "SELECT * FROM game_events WHERE game_id = ? AND id > ? ORDER BY id LIMIT ?",
+        (game_id, after, limit),
+    )
+    return [_event_dict(row) for row in rows]
+
+
+def _event_dict(row) -> dict:
+    return {
+        "id": row["id"],
+        "tsUs": row["ts_us"],
+        "kind": row["kind"],
+        "teamId": row["team_id"],
+        "questionId": row["question_id"],
+        "data": json.loads(row["data"]),
+    }
+
+
+# ----------------------------
+# Replay
+# ----------------------------
+class GameView:
+    """Dynamic game state rebuilt from events"""
+
+    SETTINGS = ("state", "current_round_id", "current_question_id", "deadline_epoch_ms", "active_team_id",
+                "answer_mode", "show_at_ms")
+
+    def __init__(self, game_id: int):
+        self.game_id = game_id
+        self.state = "IDLE"
+        self.current_round_id = None
+        self.current_question_id = None
+        self.deadline_epoch_ms = 0
+        self.show_at_ms = 0
+        self.active_team_id = None
+        self.answer_mode = "BUZZ"
+        self.winners = {}      # question id -> team id
+        self.masks = {}        # (team id, question id) -> [i1, i2]
+        self.lifelines = set() # (team id, lifeline, round id)
+        self.answers = {}      # (team id, question id) -> choice
+        self.leaderboard = Leaderboard()
+        self.last_event_id = 0
+        self.last_ts_us = 0
+        self.events = 0
+
+    def apply(self, event: dict) -> None:
+        kind, data = event["kind"], event["data"]
+        team_id, qid = event["teamId"], event["questionId"]
+
+        if kind == "settings":
+            for key in self.SETTINGS:
+                if key in data:
+                    setattr(self, key, data[key])
+        elif kind == "buzz":
+            if data.get("accepted") and qid not in self.winners:
+                self.winners[qid] = team_id
+                if qid == self.current_question_id:
+                    self.active_team_id = team_id
+        elif kind == "buzz_reset":
+            self.winners.pop(qid, None)
+        elif kind == "lifeline":
+            self.masks[(team_id, qid)] = data["masked"]
+            self.lifelines.add((team_id, data["lifeline"], data["roundId"]))
+        elif kind == "masks_cleared":
+            for key in [k for k in self.masks if k[1] == qid]:
+                del self.masks[key]
+        elif kind == "answers_reset":
+            for key in [k for k in self.answers if k[1] == qid]:
+                del self.answers[key]
+        elif kind == "answer":
+            self.answers.setdefault((team_id, qid), data["choice"])
+        elif kind == "judge":
+            self.leaderboard.judge(team_id, qid, data["correct"], data["points"])
+
+        self.last_event_id = event["id"]
+        self.last_ts_us = event["tsUs"]
+        self.events += 1
+
+    def to_dict(self, teams: dict) -> dict:
+        return {
+            "gameId": self.game_id,
+            "lastEventId": self.last_event_id,
+            "lastTsUs": self.last_ts_us,
+            "events": self.events,
+            "state": self.state,
+            "currentRoundId": self.current_round_id,
+            "currentQuestionId": self.current_question_id,
+            "deadlineEpochMs": self.deadline_epoch_ms,
+            "activeTeamId": self.active_team_id,
+            "answerMode": self.answer_mode,
+            "answerTallies": self._tallies(),
+            "winners": {str(q): t for q, t in sorted(self.winners.items())},
+            "masks": [{"teamId": t, "questionId": q, "masked": m} for (t, q), m in sorted(self.masks.items())],
+            "lifelines": [{"teamId": t, "lifeline": l, "roundId": r} for t, l, r in sorted(self.lifelines)],
+            "leaderboard": self.leaderboard.standings(teams),
+        }
+
+    def _tallies(self) -> dict:
+        tallies = {}
+        for (_, qid), choice in self.answers.items():
+            tallies.setdefault(str(qid), [0, 0, 0, 0])[choice] += 1
+        return tallies
+
+
+def replay(db, game_id: int, until=None, at_ms=None) -> GameView:
+    """Fold a game's events up to event id ``until`` and/or time ``at_ms`` (inclusive)"""
+    sql = "SELECT * FROM game_events WHERE game_id = ?"
+    params = [game_id]
+    if until is not None:
+        sql += " AND id <= ?"
+        params.append(until)
+    if at_ms is not None:
+        sql += " AND ts_us <= ?"
+        params.append(at_ms * 1000 + 999)
+    view = GameView(game_id)
+    for row in db.execute(sql + " ORDER BY id", params):
+        view.apply(_event_dict(row))
+    return view
+
+
+def team_map(db, game_id: int) -> dict:
+    return {t["id"]: dict(t) for t in db.execute("SELECT id, name, code FROM teams WHERE game_id = ?", (game_id,))}
+
+
+def diff_live(view: GameView, game) -> list:
+    """Fields where a full replay disagrees with the live in-memory state"""
+    problems = []
+    for key in GameView.SETTINGS:
+        if getattr(view, key) != getattr(game, key):
+            problems.append(f"{key}: replay {getattr(view, key)!r}, live {getattr(game, key)!r}")
+    live_winners = {q: a.team_id for q, a in game.buzzer.winners.items() if a.accepted}
+    if view.winners != live_winners:
+        problems.append(f"buzz winners: replay {view.winners}, live {live_winners}")
+    if view.masks != game.masks:
+        problems.append("50-50 masks differ")
+    if view.lifelines != game.lifelines:
+        problems.append("lifeline usage differs")
+    live_answers = {(t, q): c for q, answered in game.answers.answers.items() for t, c in answered.items()}
+    if view.answers != live_answers:
+        problems.append("all-play answers differ")
+    replayed = {t: tuple(v) for t, v in view.leaderboard.totals.items() if any(v)}
+    live = {t: tuple(v) for t, v in game.leaderboard.totals.items() if any(v)}
+    if replayed != live:
+        problems.append(f"scores: replay {replayed}, live {live}")
+    return problems
+
+
+# ----------------------------
+# CLI
+# ----------------------------
+@click.command("replay-game")
+@click.argument("game_id", type=int)
+@click.option("--until", type=int, default=None, help="Last event id to apply")
+@click.option("--at", "at_ms", type=int, default=None, help="Replay up to this epoch time in ms")
+@click.option("--check", is_flag=True, help="Compare a full replay with the state loaded from SQLite")
+@with_appcontext
+def replay_game_command(game_id, until, at_ms, check):
+    """Rebuild a game's state from its event log and print it as JSON"""
+    from .state import GameState
+
+    journal.flush()
+    db = get_db()
+    view = replay(db, game_id, until, at_ms)
+    click.echo(json.dumps(view.to_dict(team_map(db, game_id)), indent=2))
+    if check:
+        if until is not None or at_ms is not None:
+            raise click.UsageError("--check compares a full replay; drop --until/--at")
+        game = GameState.load(db, game_id)
+        if game is None:
+            raise click.ClickException(f"Game {game_id} not found")
+        problems = diff_live(view, game)
+        for problem in problems:
+            click.echo(f"  mismatch: {problem}", err=True)
+        if problems:
+            raise click.ClickException(f"replay differs from stored state in {len(problems)} place(s)")
+        click.echo("replay matches stored state", err=True)
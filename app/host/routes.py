@@ -1,52 +1,42 @@
 from flask import Blueprint, render_template, current_app
-from ..db import get_db, seed_if_empty
+from ..registry import default_game_id
+from ..snapshot import spectator_snapshot, state_snapshot
+from ..state import get_game
 
 bp = Blueprint('host', __name__)
 
 @bp.route('/')
-def index():
+@bp.route('/<int:game_id>/')
+def index(game_id=None):
     """Host view - displays current question, timer, and game state"""
-    # Ensure demo data exists
-    seed_if_empty()
+    # Without a game in the URL, show the first game (demo game)
+    if game_id is None:
+        game_id = default_game_id()
+        if game_id is None:
+            return render_template('host.html', error="No game found")
     
-    db = get_db()
-    
-    # Get the first game (demo game)
-    game = db.execute('SELECT * FROM games ORDER BY id LIMIT 1').fetchone()
+    game = get_game(game_id)
     if not game:
-        return render_template('host.html', error="No game found")
+        return render_template('host.html', error=f"Game {game_id} not found")
     
-    game_id = game['id']
+    # Initial state is the same cached snapshot sockets broadcast
+    initial_state = dict(state_snapshot(game))
     
-    # Get current settings
-    settings = db.execute('SELECT * FROM settings WHERE game_id = ?', (game_id,)).fetchone()
+    return render_template('host.html', initial_state=initial_state, role='host')
+
+@bp.route('/audience')
+@bp.route('/<int:game_id>/audience')
+def audience(game_id=None):
+    """Read-only spectator view for projectors and phones in the audience"""
+    if game_id is None:
+        game_id = default_game_id()
+        if game_id is None:
+            return render_template('host.html', error="No game found")
     
-    # Build initial state
-    initial_state = {
-        'gameId': game_id,
-        'state': settings['state'] if settings else 'IDLE',
-        'deadlineEpochMs': settings['deadline_epoch_ms'] if settings else 0,
-        'activeTeamId': settings['active_team_id'] if settings else None
-    }
+    game = get_game(game_id)
+    if not game:
+        return render_template('host.html', error=f"Game {game_id} not found")
     
-    # Add question data if available
-    if settings and settings['current_question_id']:
-        question = db.execute(
-            'SELECT * FROM questions WHERE id = ?',
-            (settings['current_question_id'],)
-        ).fetchone()
-        
-        if question:
-            initial_state['question'] = {
-                'id': question['id'],
-                'text': question['text'],
-                'options': [
-                    question['opt_a'],
-                    question['opt_b'],
-                    question['opt_c'],
-                    question['opt_d']
-                ],
-                'type': question['type']
-            }
+    initial_state = dict(spectator_snapshot(game))
     
-    return render_template('host.html', initial_state=initial_state)
\ No newline at end of file
+    return render_template('host.html', initial_state=initial_state, role='spectator')
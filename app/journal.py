@@ -0,0 +1,134 @@
+"""Batched write-behind journal for high-rate audit inserts.
+
+Buzz attempts, 50-50 masks and lifeline usage are queued here instead of being
+committed one by one. A background task writes everything queued in a single
+transaction every ``JOURNAL_FLUSH_INTERVAL_MS``, or as soon as
+``JOURNAL_MAX_BATCH`` rows are waiting. ``flush()`` is the durable "write it
+now" hook for admin actions that must see the rows, and runs again at exit.
+"""
+import atexit
+import sqlite3
+import threading
+from collections import deque
+
+from .db import get_pool
+
+
+class Journal:
+    def __init__(self):
+        self.app = None
+        self.interval_s = 0.005
+        self.max_batch = 500
+        self._queue = deque()      # (sql, params) in arrival order
+        self._flush_lock = threading.Lock()
+        self._running = False
+        self.rows_written = 0
+        self.commits = 0
+        self.rows_failed = 0
+
+    def init_app(self, app, socketio) -> None:
+        self.app = app
+        self.interval_s = app.config["JOURNAL_FLUSH_INTERVAL_MS"] / 1000.0
+        self.max_batch = app.config["JOURNAL_MAX_BATCH"]
+        if not self._running:
+            self._running = True
+            socketio.start_background_task(self._run, socketio)
+            atexit.register(self.stop)
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def append(self, sql: str, params: tuple) -> None:
+        """Queue one row; flushes inline once a full batch is waiting"""
+        self._queue.append((sql, params))
+        if len(self._queue) >= self.max_batch:
+            self.flush()
+
+    def flush(self) -> int:
+        """Write every queued row in one transaction and return how many were written.
+
+        Waits for a batch another thread is already writing, so when this
+        returns every row appended before the call is committed.
+        """
+        if self.app is None:
+            return 0
+        with self._flush_lock:
+            batch = []
+            try:
+                while True:
+                    batch.append(self._queue.popleft())
+            except IndexError:
+                pass
+            if not batch:
+                return 0
+
+            pool = get_pool(self.app)
+            db = pool.acquire()
+            try:
+                try:
+                    for sql, rows in _group(batch):
+                        db.executemany(sql, rows)
+                    db.commit()
+                except sqlite3.IntegrityError:
+                    db.rollback()
+                    self._write_one_by_one(db, batch)
+                except Exception:
+                    # Keep the rows for the next flush rather than losing them; a
+                    # transient error ("database is locked") must not drop the batch
+                    db.rollback()
+                    self._queue.extendleft(reversed(batch))
+                    self.app.logger.exception("journal: flush of %d rows failed, requeued", len(batch))
+                    raise
+            finally:
+                pool.release(db)
+            self.commits += 1
+            self.rows_written += len(batch)
+            return len(batch)
+
+    def _write_one_by_one(self, db, batch) -> None:
+        # Salvage the batch when one row violates a constraint
+        for sql, params in batch:
+            try:
+                db.execute(sql, params)
+            except sqlite3.Error as e:
+                self.rows_failed += 1
+                self.app.logger.warning("journal: dropped row (%s): %s", e, sql)
+        db.commit()
+
+    def _run(self, socketio) -> None:
+        while self._running:
+            socketio.sleep(self.interval_s)
+            try:
+                self.flush()
+            except Exception:
+                self.app.logger.exception("journal: flush failed")
+
+    def clear(self) -> None:
+        """Drop queued rows without writing them (for runs without a database)"""
+        self._queue.clear()
+
+    def stop(self) -> None:
+        self._running = False
+        self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "queued": len(self._queue),
+            "rows_written": self.rows_written,
+            "commits": self.commits,
+            "rows_failed": self.rows_failed,
+        }
+
+
+def _group(batch):
+    """Split a batch into runs of the same statement, keeping arrival order"""
+    runs = []
+    for sql, params in batch:
+        if runs and runs[-1][0] == sql:
+            runs[-1][1].append(params)
+        else:
+            runs.append((sql, [params]))
+    return runs
+
+
+journal = Journal()
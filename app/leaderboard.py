@@ -0,0 +1,63 @@
+"""Incrementally maintained team standings.
+
+Each judgement adjusts the judged team's running totals by its difference
+from any earlier judgement of the same question, so totals never need
+recomputing from raw rows. The sorted standings are cached until the next
+change, which makes reading them during a show O(1).
+"""
+
+
+class Leaderboard:
+    def __init__(self):
+        self.totals = {}       # team id -> [points, correct, wrong]
+        self.judgements = {}   # (team id, question id) -> (correct, points)
+        self._standings = None
+
+    def load_total(self, team_id: int, points: int, correct: int, wrong: int) -> None:
+        self.totals[team_id] = [points, correct, wrong]
+        self._standings = None
+
+    def load_judgement(self, team_id: int, question_id: int, correct: bool, points: int) -> None:
+        self.judgements[(team_id, question_id)] = (bool(correct), points)
+
+    def delta(self, team_id: int, question_id: int, correct: bool, points: int) -> tuple:
+        """The ``(points, correct, wrong)`` change a judgement would make to the team's totals"""
+        old_correct, old_points = self.judgements.get((team_id, question_id), (None, 0))
+        return (
+            points - old_points,
+            int(bool(correct)) - int(old_correct is True),
+            int(not correct) - int(old_correct is False),
+        )
+
+    def judge(self, team_id: int, question_id: int, correct: bool, points: int) -> tuple:
+        """Apply a judgement and return its change to the team's totals"""
+        delta = self.delta(team_id, question_id, correct, points)
+        self.judgements[(team_id, question_id)] = (bool(correct), points)
+        total = self.totals.setdefault(team_id, [0, 0, 0])
+        for i, change in enumerate(delta):
+            total[i] += change
+        self._standings = None
+        return delta
+
+    def invalidate(self) -> None:
+        """Drop cached standings, e.g. after a team is added"""
+        self._standings = None
+
+    def standings(self, teams: dict) -> list:
+        """Every team ranked by points, then correct answers; ties share a rank"""
+        cached = self._standings
+        if cached is not None:
+            return cached
+        rows = []
+        for team_id, team in teams.items():
+            points, correct, wrong = self.totals.get(team_id, (0, 0, 0))
+            rows.append({"teamId": team_id, "name": team["name"], "code": team["code"],
+                         "points": points, "correct": correct, "wrong": wrong})
+        rows.sort(key=lambda r: (-r["points"], -r["correct"], r["name"]))
+        rank, previous = 0, None
+        for i, row in enumerate(rows, start=1):
+            if (row["points"], row["correct"]) != previous:
+                rank, previous = i, (row["points"], row["correct"])
+            row["rank"] = rank
+        self._standings = rows
+        return rows
@@ -0,0 +1,234 @@
+"""Hot-path instrumentation exposed as Prometheus text on ``/metrics``.
+
+With ``METRICS_ENABLED`` on, the app records:
+
+- latency histograms and query counts per socket handler and admin op
+- SQLite statement counts and durations (reads, writes, commits) from pooled
+  connections; write and commit times include waiting for the database lock
+- emit counts and payload bytes per room
+- events dropped by the rate limiter, by event and reason
+- connected clients per game, plus journal, pool, cluster and timer counters
+
+When it is off, ``timer`` returns a shared no-op, pooled connections are plain
+and ``socketio.emit`` is not wrapped, so the cost is one attribute check.
+"""
+import bisect
+import functools
+import threading
+import time
+
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+PREFIX = "quizzmaster_"
+
+
+class Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def lines(self, name: str, labels: str) -> list:
+        sep = "," if labels else ""
+        out, cumulative = [], 0
+        for bound, n in zip(BUCKETS, self.counts):
+            cumulative += n
+            out.append(f'{name}_bucket{{{labels}{sep}le="{bound}"}} {cumulative}')
+        out.append(f'{name}_bucket{{{labels}{sep}le="+Inf"}} {self.count}')
+        out.append(f"{name}_sum{{{labels}}} {self.sum:.6f}")
+        out.append(f"{name}_count{{{labels}}} {self.count}")
+        return out
+
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ("metrics", "name", "started", "queries")
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        local = self.metrics._local
+        self.queries = getattr(local, "queries", 0)
+        local.queries = 0
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.started
+        local = self.metrics._local
+        queries = local.queries
+        local.queries = self.queries + queries   # nested timers roll up into the outer one
+        self.metrics.observe_handler(self.name, elapsed, queries)
+        return False
+
+
+def _room_label(to) -> str:
+    """Collapse rooms to a bounded label set: game:N, game:N:team, sid or all"""
+    if to is None:
+        return "all"
+    to = str(to)
+    if not to.startswith("game:"):
+        return "sid"
+    parts = to.split(":")
+    return ":".join(parts[:3]) if len(parts) > 2 else to
+
+
+class Metrics:
+    def __init__(self):
+        self.enabled = False
+        self.serializer = "json"
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.handlers = {}          # name -> Histogram
+        self.handler_queries = {}   # name -> total queries
+        self.queries = {}           # kind -> Histogram
+        self.emits = {}             # room label -> [count, bytes]
+        self._emit_wrapped = False
+
+    def init_app(self, app, socketio) -> None:
+        self.enabled = bool(app.config.get("METRICS_ENABLED"))
+        self.serializer = app.config.get("SOCKETIO_SERIALIZER", "json")
+        if self.enabled and not self._emit_wrapped:
+            socketio.emit = self._wrap_emit(socketio.emit)
+            self._emit_wrapped = True
+        app.add_url_rule("/metrics", "metrics", self.view)
+
+    # ----------------------------
+    # Recording
+    # ----------------------------
+    def timer(self, name: str):
+        """Context manager timing a handler and counting its queries"""
+        return _Timer(self, name) if self.enabled else _NULL_TIMER
+
+    def timed(self, name: str):
+        """Decorator form of ``timer``"""
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                with _Timer(self, name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def observe_handler(self, name: str, seconds: float, queries: int) -> None:
+        with self._lock:
+            hist = self.handlers.get(name)
+            if hist is None:
+                hist = self.handlers[name] = Histogram()
+            hist.observe(seconds)
+            self.handler_queries[name] = self.handler_queries.get(name, 0) + queries
+
+    def observe_query(self, kind: str, seconds: float) -> None:
+        local = self._local
+        local.queries = getattr(local, "queries", 0) + 1
+        with self._lock:
+            hist = self.queries.get(kind)
+            if hist is None:
+                hist = self.queries[kind] = Histogram()
+            hist.observe(seconds)
+
+    def observe_emit(self, to, size: int) -> None:
+        label = _room_label(to)
+        with self._lock:
+            entry = self.emits.get(label)
+            if entry is None:
+                entry = self.emits[label] = [0, 0]
+            entry[0] += 1
+            entry[1] += size
+
+    def _wrap_emit(self, emit):
+        from .snapshot import encoded_size
+
+        def instrumented_emit(event, *args, **kwargs):
+            if self.enabled:
+                payload = args[0] if len(args) == 1 else list(args)
+                size = encoded_size(event, payload, self.serializer)
+                self.observe_emit(kwargs.get("to") or kwargs.get("room"), size)
+            return emit(event, *args, **kwargs)
+        return instrumented_emit
+
+    def reset(self) -> None:
+        with self._lock:
+            self.handlers.clear()
+            self.handler_queries.clear()
+            self.queries.clear()
+            self.emits.clear()
+
+    # ----------------------------
+    # Exposition
+    # ----------------------------
+    def render(self, app) -> str:
+        from . import registry
+        from .cluster import cluster
+        from .db import pool_stats
+        from .journal import journal
+        from .ratelimit import limiter
+        from .runtime import offloader
+        from .spectators import spectator_feed
+        from .timers import timers
+
+        lines = [f"{PREFIX}metrics_enabled {int(self.enabled)}"]
+        with self._lock:
+            if self.handlers:
+                lines.append(f"# TYPE {PREFIX}handler_seconds histogram")
+                for name, hist in sorted(self.handlers.items()):
+                    lines += hist.lines(f"{PREFIX}handler_seconds", f'handler="{name}"')
+                lines.append(f"# TYPE {PREFIX}handler_queries_total counter")
+                for name, n in sorted(self.handler_queries.items()):
+                    lines.append(f'{PREFIX}handler_queries_total{{handler="{name}"}} {n}')
+            if self.queries:
+                lines.append(f"# TYPE {PREFIX}db_query_seconds histogram")
+                for kind, hist in sorted(self.queries.items()):
+                    lines += hist.lines(f"{PREFIX}db_query_seconds", f'kind="{kind}"')
+            if self.emits:
+                lines.append(f"# TYPE {PREFIX}emits_total counter")
+                for room, (count, _) in sorted(self.emits.items()):
+                    lines.append(f'{PREFIX}emits_total{{room="{room}"}} {count}')
+                lines.append(f"# TYPE {PREFIX}emit_bytes_total counter")
+                for room, (_, size) in sorted(self.emits.items()):
+                    lines.append(f'{PREFIX}emit_bytes_total{{room="{room}"}} {size}')
+
+        lines.append(f"# TYPE {PREFIX}connected_clients gauge")
+        for game_id, count in sorted(registry.sessions_by_game().items()):
+            lines.append(f'{PREFIX}connected_clients{{game="{game_id}"}} {count}')
+
+        lines.append(f"# TYPE {PREFIX}dropped_events_total counter")
+        for (event, reason), n in sorted(limiter.dropped.items()):
+            lines.append(f'{PREFIX}dropped_events_total{{event="{event}",reason="{reason}"}} {n}')
+
+        for source, stats in (("journal", journal.stats()), ("db_pool", pool_stats(app)),
+                              ("cluster", cluster.stats()), ("spectators", spectator_feed.stats()),
+                              ("db_offload", offloader.stats())):
+            for key, value in stats.items():
+                lines.append(f"{PREFIX}{source}_{key} {int(value)}")
+        lines.append(f"{PREFIX}timers_pending {timers.pending()}")
+        lines.append(f"{PREFIX}timers_transitions_total {timers.transitions}")
+        return "\n".join(lines) + "\n"
+
+    def view(self):
+        from flask import Response, current_app
+
+        return Response(self.render(current_app), mimetype="text/plain; version=0.0.4")
+
+
+metrics = Metrics()
@@ -0,0 +1,199 @@
+"""Opt-in profiling of socket handlers and admin ops for latency post-mortems.
+
+``PROFILE_MODE``:
+
+- ``off`` (default): handlers run unwrapped apart from one attribute check
+- ``cprofile``: every event runs under cProfile
+- ``sample``: one event in ``PROFILE_SAMPLE_RATE`` per event type runs under cProfile
+
+Stats accumulate per event type and are written to ``PROFILE_DIR/<event>.prof``
+(readable with ``python -m pstats`` or snakeviz) every ``PROFILE_DUMP_EVERY``
+profiled events and at exit. Each handler thread profiles into its own
+``cProfile.Profile`` and the dump merges them. From Python 3.12 cProfile is a
+process-wide ``sys.monitoring`` tool, so there an event that starts while
+another is being profiled runs unprofiled.
+
+Independently, any event slower than ``SLOW_EVENT_MS`` is appended to
+``PROFILE_DIR/slow_events.jsonl`` and logged with its name, game, duration and
+query count.
+"""
+import atexit
+import cProfile
+import functools
+import json
+import pstats
+import sys
+import threading
+import time
+from pathlib import Path
+
+from .metrics import metrics
+
+MODES = ("off", "cprofile", "sample")
+# Only one cProfile can be enabled at a time from 3.12 (sys.monitoring)
+EXCLUSIVE = sys.version_info >= (3, 12)
+
+
+class Profiler:
+    def __init__(self):
+        self.app = None
+        self.mode = "off"
+        self.sample_rate = 100
+        self.dump_every = 100
+        self.slow_ms = 0
+        self.directory = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._exclusive = threading.Lock()
+        self._profiles = {}     # event name -> [(cProfile.Profile, guard, thread)], one per thread
+        self._retired = {}      # event name -> pstats.Stats merged from finished threads
+        self._seen = {}         # event name -> events handled
+        self._profiled = {}     # event name -> events profiled since the last dump
+        self.slow_events = 0
+        self._atexit = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off" or self.slow_ms > 0
+
+    def init_app(self, app) -> None:
+        mode = app.config["PROFILE_MODE"]
+        if mode not in MODES:
+            raise ValueError(f"PROFILE_MODE must be one of {', '.join(MODES)}")
+        self.app = app
+        self.mode = mode
+        self.sample_rate = max(1, app.config["PROFILE_SAMPLE_RATE"])
+        self.dump_every = max(1, app.config["PROFILE_DUMP_EVERY"])
+        self.slow_ms = app.config["SLOW_EVENT_MS"]
+        self.directory = Path(app.config["PROFILE_DIR"])
+        if self.enabled:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            if not self._atexit:
+                atexit.register(self.dump)
+                self._atexit = True
+
+    # ----------------------------
+    # Wrapping
+    # ----------------------------
+    def profiled(self, name: str):
+        """Decorator for socket handlers; the game comes from the event data or the bound session"""
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                return self.call(name, None, fn, *args, **kwargs)
+            return wrapper
+        return decorator
+
+    def call(self, name: str, game_id, fn, *args, **kwargs):
+        """Run ``fn`` as event ``name``, profiling and slow-logging it as configured"""
+        if not self.enabled or getattr(self._local, "active", False):
+            return fn(*args, **kwargs)
+
+        entry = self._profile_for(name)
+        if entry is not None and EXCLUSIVE and not self._exclusive.acquire(blocking=False):
+            entry = None
+        queries_before = getattr(metrics._local, "queries", 0)
+        self._local.active = True
+        started = time.perf_counter()
+        try:
+            if entry is None:
+                return fn(*args, **kwargs)
+            profile, guard, _ = entry
+            with guard:
+                profile.enable()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    profile.disable()
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self._local.active = False
+            if entry is not None:
+                if EXCLUSIVE:
+                    self._exclusive.release()
+                self._after_profiled(name)
+            if self.slow_ms and elapsed_ms >= self.slow_ms:
+                queries = getattr(metrics._local, "queries", 0) - queries_before
+                self._log_slow(name, game_id if game_id is not None else _game_id(args), elapsed_ms, queries)
+
+    def _profile_for(self, name: str):
+        """This thread's profile and its guard for event ``name``, or None when not sampled"""
+        if self.mode == "off":
+            return None
+        with self._lock:
+            seen = self._seen.get(name, 0)
+            self._seen[name] = seen + 1
+            if self.mode == "sample" and seen % self.sample_rate:
+                return None
+        mine = getattr(self._local, "profiles", None)
+        if mine is None:
+            mine = self._local.profiles = {}
+        entry = mine.get(name)
+        if entry is None:
+            entry = mine[name] = (cProfile.Profile(), threading.Lock(), threading.current_thread())
+            with self._lock:
+                self._profiles.setdefault(name, []).append(entry)
+        return entry
+
+    def _after_profiled(self, name: str) -> None:
+        with self._lock:
+            count = self._profiled.get(name, 0) + 1
+            self._profiled[name] = count
+        if count % self.dump_every == 0:
+            self.dump(name)
+
+    # ----------------------------
+    # Output
+    # ----------------------------
+    def _log_slow(self, name: str, game_id, elapsed_ms: float, queries: int) -> None:
+        entry = {"ts": int(time.time() * 1000), "event": name, "gameId": game_id,
+                 "ms": round(elapsed_ms, 3), "queries": queries}
+        with self._lock:
+            self.slow_events += 1
+            with open(self.directory / "slow_events.jsonl", "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+        if self.app is not None:
+            self.app.logger.warning("slow event %s game=%s %.1fms queries=%d", name, game_id, elapsed_ms, queries)
+
+    def dump(self, name=None) -> None:
+        """Write accumulated stats for one event type, or all of them"""
+        with self._lock:
+            names = [name] if name else list(self._profiles)
+            for event in names:
+                entries = self._profiles.get(event, [])
+                # Fold profiles of finished threads into one Stats so thread churn stays bounded
+                for entry in [e for e in entries if not e[2].is_alive()]:
+                    entries.remove(entry)
+                    self._retired.setdefault(event, pstats.Stats()).add(entry[0])
+            items = [(event, list(self._profiles.get(event, ()))) for event in names]
+        for event, entries in items:
+            stats = pstats.Stats()
+            with self._lock:
+                if event in self._retired:
+                    stats.add(self._retired[event])
+            for profile, guard, _ in entries:
+                # The guard waits out an event in progress on that thread
+                with guard:
+                    stats.add(profile)
+            if stats.stats:
+                stats.dump_stats(str(self.directory / f"{event}.prof"))
+
+
+def _game_id(args):
+    """Game id of an event: a ``gameId`` in its data, else the socket's bound session"""
+    for arg in args:
+        if isinstance(arg, dict) and arg.get("gameId") is not None:
+            return arg["gameId"]
+    try:
+        from flask import request
+        from . import registry
+
+        bound = registry.session(request.sid)
+        return bound[0] if bound else None
+    except (RuntimeError, AttributeError):
+        return None
+
+
+profiler = Profiler()
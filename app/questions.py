@@ -0,0 +1,53 @@
+"""Compiled question bank entries.
+
+Questions are compiled once when a game is loaded: the public part sent to
+clients is built and JSON-encoded up front, so showing a question is a lookup.
+A team's 50-50 mask is computed the first time it asks on a question and
+memoized; loading a game costs nothing per team×question pair.
+"""
+import json
+import random
+
+
+def fifty_fifty_mask(game_id: int, team_code: str, question_id: int, correct_index: int) -> list:
+    """Deterministic pair of wrong options to hide for a team on a question"""
+    wrong = [i for i in range(4) if i != correct_index]
+    rng = random.Random(f"{game_id}:{team_code}:{question_id}")
+    return sorted(rng.sample(wrong, 2))
+
+
+class Question:
+    """One question with its client payload and memoized 50-50 masks"""
+
+    __slots__ = ("id", "game_id", "text", "options", "correct_index", "type",
+                 "public", "public_json", "fifty_masks")
+
+    def __init__(self, game_id: int, question_id: int, text: str, options, correct_index: int, qtype: str):
+        self.id = question_id
+        self.game_id = game_id
+        self.text = text
+        self.options = tuple(options)
+        self.correct_index = correct_index
+        self.type = qtype
+        self.public = {"id": question_id, "text": text, "options": list(self.options), "type": qtype}
+        self.public_json = json.dumps(self.public, separators=(",", ":"))
+        self.fifty_masks = {}    # team id -> [i1, i2], filled on first request
+
+    @classmethod
+    def from_row(cls, row):
+        return cls(row["game_id"], row["id"], row["text"],
+                   (row["opt_a"], row["opt_b"], row["opt_c"], row["opt_d"]),
+                   row["correct_index"], row["type"])
+
+    @property
+    def supports_fifty_fifty(self) -> bool:
+        return self.type == "MCQ"
+
+    def fifty_mask(self, team_id: int, team_code: str):
+        """A team's 50-50 mask, computed on first use; None for non-MCQ questions"""
+        if not self.supports_fifty_fifty:
+            return None
+        mask = self.fifty_masks.get(team_id)
+        if mask is None:
+            mask = self.fifty_masks[team_id] = fifty_fifty_mask(self.game_id, team_code, self.id, self.correct_index)
+        return mask
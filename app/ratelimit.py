@@ -0,0 +1,88 @@
+"""Token-bucket limits for spammable team events (``buzz``, ``fifty_request``, ``answer``).
+
+Each event type has a bucket per socket and one per team, so neither one
+device hammering the button nor a team spread over several devices can flood
+the server. Refused events are dropped without a reply and counted by reason;
+the counts are exported on ``/metrics``.
+
+Buckets are updated without a lock: a rare lost update under OS threads only
+lets one extra event through, which is acceptable for a spam guard.
+"""
+import threading
+import time
+
+LIMITED_EVENTS = ("buzz", "fifty_request", "answer")
+
+
+class TokenBucket:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, burst: float):
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def take(self, rate: float, burst: float) -> bool:
+        now = time.monotonic()
+        self.tokens = min(burst, self.tokens + (now - self.updated) * rate)
+        self.updated = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class RateLimiter:
+    def __init__(self):
+        self.enabled = False
+        self.limits = {}     # event -> (tokens per second, burst)
+        self._sids = {}      # (event, sid) -> TokenBucket
+        self._teams = {}     # (event, game id, team id) -> TokenBucket
+        self._lock = threading.Lock()
+        self.dropped = {}    # (event, reason) -> count
+
+    def init_app(self, app) -> None:
+        self.enabled = bool(app.config["RATE_LIMIT_ENABLED"])
+        self.limits = {
+            "buzz": (app.config["BUZZ_RATE_PER_S"], app.config["BUZZ_BURST"]),
+            "fifty_request": (app.config["FIFTY_RATE_PER_S"], app.config["FIFTY_BURST"]),
+            "answer": (app.config["ANSWER_RATE_PER_S"], app.config["ANSWER_BURST"]),
+        }
+
+    def allow_sid(self, event: str, sid: str) -> bool:
+        """Per-socket check, made before any lookup"""
+        return self._take(self._sids, (event, sid), event, "sid")
+
+    def allow_team(self, event: str, game_id: int, team_id: int) -> bool:
+        """Per-team check across all of the team's sockets"""
+        return self._take(self._teams, (event, game_id, team_id), event, "team")
+
+    def _take(self, buckets: dict, key, event: str, reason: str) -> bool:
+        if not self.enabled:
+            return True
+        rate, burst = self.limits[event]
+        bucket = buckets.get(key)
+        if bucket is None:
+            bucket = buckets.setdefault(key, TokenBucket(burst))
+        if bucket.take(rate, burst):
+            return True
+        self.drop(event, reason)
+        return False
+
+    def drop(self, event: str, reason: str) -> None:
+        """Count an event refused before it reached the game"""
+        key = (event, reason)
+        with self._lock:
+            self.dropped[key] = self.dropped.get(key, 0) + 1
+
+    def forget_sid(self, sid: str) -> None:
+        for event in LIMITED_EVENTS:
+            self._sids.pop((event, sid), None)
+
+    def reset(self) -> None:
+        self._sids.clear()
+        self._teams.clear()
+        with self._lock:
+            self.dropped.clear()
+
+
+limiter = RateLimiter()
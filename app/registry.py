@@ -0,0 +1,88 @@
+"""Process-wide lookups for hosting many games at once.
+
+- the default game (lowest id), for URLs that do not name a game
+- team code -> game ids, for ``/team/<code>`` links without a game
+- socket session -> (game id, team code), bound on ``join`` so team events
+  resolve their game and team with one dict lookup
+"""
+import threading
+
+from .db import get_db
+
+_lock = threading.Lock()
+_default_game_id = None
+_team_games = {}     # team code -> sorted list of game ids using it
+_sessions = {}       # sid -> (game id, team code or None, role)
+
+
+def default_game_id():
+    """Id of the first game, or None if there are no games yet"""
+    global _default_game_id
+    if _default_game_id is None:
+        row = get_db().execute("SELECT id FROM games ORDER BY id ASC LIMIT 1").fetchone()
+        if row:
+            _default_game_id = row["id"]
+    return _default_game_id
+
+
+def games_for_team_code(code: str) -> list:
+    """Game ids that have a team with this code, lowest first"""
+    games = _team_games.get(code)
+    if games is None:
+        rows = get_db().execute("SELECT game_id FROM teams WHERE code = ? ORDER BY game_id", (code,)).fetchall()
+        games = [r["game_id"] for r in rows]
+        # Unknown codes are not cached, so probing random codes cannot grow the index
+        if games:
+            with _lock:
+                _team_games[code] = games
+    return games
+
+
+def warm_team_codes(db) -> None:
+    """Index every team code in one query"""
+    games = {}
+    for row in db.execute("SELECT code, game_id FROM teams ORDER BY game_id"):
+        games.setdefault(row["code"], []).append(row["game_id"])
+    with _lock:
+        _team_games.update(games)
+
+
+def team_added(game_id: int, code: str) -> None:
+    with _lock:
+        games = _team_games.get(code)
+        if games is not None and game_id not in games:
+            _team_games[code] = sorted(games + [game_id])
+
+
+def forget_team_codes() -> None:
+    with _lock:
+        _team_games.clear()
+
+
+def bind_session(sid: str, game_id: int, team_code, role: str) -> None:
+    _sessions[sid] = (game_id, team_code, role)
+
+
+def session(sid: str):
+    return _sessions.get(sid)
+
+
+def unbind_session(sid: str):
+    return _sessions.pop(sid, None)
+
+
+def sessions_by_game() -> dict:
+    """Connected socket count per game id"""
+    counts = {}
+    for game_id, _, _ in list(_sessions.values()):
+        counts[game_id] = counts.get(game_id, 0) + 1
+    return counts
+
+
+def reset() -> None:
+    """Forget cached lookups (tests and benchmarks that swap databases)"""
+    global _default_game_id
+    with _lock:
+        _default_game_id = None
+        _team_games.clear()
+        _sessions.clear()
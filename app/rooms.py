@@ -0,0 +1,14 @@
+# ----------------------------
+# Room helpers
+# ----------------------------
+def game_room(game_id: int) -> str:
+    return f"game:{game_id}"
+
+def team_room(game_id: int, team_code: str) -> str:
+    return f"game:{game_id}:team:{team_code}"
+
+def host_room(game_id: int) -> str:
+    return f"game:{game_id}:host"
+
+def spectator_room(game_id: int) -> str:
+    return f"game:{game_id}:spectators"
@@ -0,0 +1,70 @@
+"""Async runtimes the Socket.IO server can run on, and offloading blocking SQLite work.
+
+- threading (default): an OS thread per connection. Blocking sqlite3 calls
+  only hold up their own thread. Served by werkzeug in development, or by
+  gunicorn's threaded worker (``gunicorn -w 1 --threads 100 wsgi:app``)
+- eventlet / gevent: every connection is a green thread on one OS thread, and
+  sqlite3 never yields to the hub, so a slow commit or a writer waiting on the
+  database lock stalls every socket. With ``DB_OFFLOAD`` on, pooled
+  connections run their write statements and commits in the runtime's native
+  thread pool (``eventlet.tpool``, the gevent hub's threadpool) and the hub
+  keeps serving other sockets meanwhile
+
+Green runtimes need the standard library monkey-patched before anything
+else is imported. ``run.py`` and ``wsgi.py`` patch inline at the top, since
+importing this module would load the ``app`` package (and the standard
+library) first.
+"""
+import importlib
+
+ASYNC_MODES = ("threading", "eventlet", "gevent")
+GREEN_MODES = ("eventlet", "gevent")
+
+
+def check_async_mode(mode: str) -> str:
+    """Validate SOCKETIO_ASYNC_MODE and make sure its package is installed"""
+    if mode not in ASYNC_MODES:
+        raise ValueError(f"Invalid SOCKETIO_ASYNC_MODE: {mode} (expected one of {', '.join(ASYNC_MODES)})")
+    if mode in GREEN_MODES:
+        try:
+            importlib.import_module(mode)
+        except ImportError as e:
+            raise RuntimeError(f"SOCKETIO_ASYNC_MODE={mode} requires the '{mode}' package") from e
+    return mode
+
+
+class Offloader:
+    """Runs blocking calls in a native thread pool under green runtimes"""
+
+    def __init__(self):
+        self.enabled = False
+        self.mode = "threading"
+        self._execute = None
+        self.calls = 0
+
+    def init_app(self, app) -> None:
+        self.mode = check_async_mode(app.config["SOCKETIO_ASYNC_MODE"])
+        self.enabled = bool(app.config["DB_OFFLOAD"]) and self.mode in GREEN_MODES
+        if not self.enabled:
+            self._execute = None
+        elif self.mode == "eventlet":
+            from eventlet import tpool
+
+            self._execute = tpool.execute
+        else:
+            import gevent
+
+            self._execute = lambda fn, *args: gevent.get_hub().threadpool.apply(fn, args)
+
+    def run(self, fn, *args):
+        """Call ``fn(*args)``, in the thread pool when offloading is on"""
+        if self._execute is None:
+            return fn(*args)
+        self.calls += 1
+        return self._execute(fn, *args)
+
+    def stats(self) -> dict:
+        return {"enabled": int(self.enabled), "calls": self.calls}
+
+
+offloader = Offloader()
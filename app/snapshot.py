@@ -0,0 +1,219 @@
+"""Shared ``state_update`` payload builder and delta protocol.
+
+The payload for a game is built and JSON-encoded once per ``GameState.version``
+and reused for every emit until settings, questions or teams change.
+
+Snapshots carry ``seq`` (the version they were built from). Clients get a full
+``state_update`` on join; room-wide transitions are sent as ``state_patch``
+events holding only the top-level keys that changed since the previous
+broadcast. A client whose ``seq`` is not the patch's ``baseSeq`` asks for a
+resync with ``state_request``.
+
+With SOCKETIO_SERIALIZER=msgpack every packet is MessagePack instead of JSON
+text; a snapshot's MessagePack bytes are built once, like its JSON text.
+
+Spectators are not in the game room: they get full snapshots without team
+codes, coalesced by ``spectator_feed`` (app/spectators.py).
+"""
+import json
+
+from flask import current_app
+
+from . import socketio
+from .cluster import cluster
+from .metrics import metrics
+from .rooms import game_room
+from .spectators import spectator_feed
+from .state import get_game
+
+
+class Snapshot(dict):
+    """A ``state_update`` payload with its pre-encoded JSON text.
+
+    ``fragments`` maps keys to values that are already JSON-encoded (such as a
+    question's public payload); they are spliced in rather than re-encoded.
+    """
+
+    def __init__(self, payload: dict, version: int, fragments=None):
+        super().__init__(payload)
+        self.version = version
+        self._packed = None
+        if not fragments:
+            self.encoded = json.dumps(payload, separators=(",", ":"))
+            return
+        rest = {k: v for k, v in payload.items() if k not in fragments}
+        parts = [json.dumps(rest, separators=(",", ":"))[1:-1]] if rest else []
+        parts += [json.dumps(key) + ":" + fragment for key, fragment in fragments.items()]
+        self.encoded = "{" + ",".join(parts) + "}"
+
+    @property
+    def packed(self) -> bytes:
+        """MessagePack encoding, built on first use"""
+        if self._packed is None:
+            import msgpack
+
+            self._packed = msgpack.packb(dict(self))
+        return self._packed
+
+
+class SnapshotJSON:
+    """JSON module for Socket.IO that splices cached snapshots instead of re-encoding them"""
+
+    @staticmethod
+    def dumps(obj, **kwargs):
+        if type(obj) is list and len(obj) == 2 and isinstance(obj[1], Snapshot):
+            return "[" + json.dumps(obj[0]) + "," + obj[1].encoded + "]"
+        return json.dumps(obj, **kwargs)
+
+    @staticmethod
+    def loads(*args, **kwargs):
+        return json.loads(*args, **kwargs)
+
+
+def msgpack_packet_class():
+    """Socket.IO packet class for SOCKETIO_SERIALIZER=msgpack that splices cached snapshots"""
+    try:
+        import msgpack
+        from socketio.msgpack_packet import MsgPackPacket
+    except ImportError as e:
+        raise RuntimeError("SOCKETIO_SERIALIZER=msgpack requires the 'msgpack' package") from e
+
+    class SnapshotMsgPackPacket(MsgPackPacket):
+        def encode(self):
+            data = self.data
+            if not (type(data) is list and len(data) == 2 and isinstance(data[1], Snapshot)):
+                return super().encode()
+            # The packet map with the snapshot's cached bytes spliced in as data[1]
+            packer = msgpack.Packer()
+            fields = self._to_dict()
+            parts = [packer.pack_map_header(len(fields))]
+            for key, value in fields.items():
+                parts.append(packer.pack(key))
+                if key == "data":
+                    parts += [packer.pack_array_header(2), packer.pack(data[0]), data[1].packed]
+                else:
+                    parts.append(packer.pack(value))
+            return b"".join(parts)
+
+    return SnapshotMsgPackPacket
+
+
+def encoded_size(event: str, payload, serializer: str = "json") -> int:
+    """Bytes an emit's arguments take in a packet with the given serializer"""
+    if serializer == "msgpack":
+        import msgpack
+
+        if isinstance(payload, Snapshot):
+            return len(payload.packed)
+        return len(msgpack.packb([event, payload]))
+    if isinstance(payload, Snapshot):
+        return len(payload.encoded)
+    return len(SnapshotJSON.dumps([event, payload]))
+
+
+def _build_payload(game):
+    """Return ``(payload, fragments)`` for a game's current state"""
+    payload = {
+        "seq": game.version,
+        "gameId": game.game_id,
+        "state": game.state,
+        "deadlineEpochMs": game.deadline_epoch_ms,
+        "activeTeamId": game.active_team_id,
+        "currentRoundId": game.current_round_id,
+        "answerMode": game.answer_mode,
+    }
+
+    fragments = None
+    q = game.current_question()
+    if q:
+        payload["question"] = q.public
+        fragments = {"question": q.public_json}
+
+    active = None
+    t = game.active_team()
+    if t:
+        active = {"id": t["id"], "name": t["name"], "code": t["code"]}
+    payload["activeTeam"] = active
+    return payload, fragments
+
+
+def state_snapshot(game) -> Snapshot:
+    """Return the cached snapshot for a game, rebuilding it only if the version moved"""
+    snap = game.snapshot
+    if snap is not None and snap.version == game.version:
+        return snap
+    with game.lock:
+        payload, fragments = _build_payload(game)
+        snap = Snapshot(payload, game.version, fragments)
+        game.snapshot = snap
+    return snap
+
+
+def spectator_snapshot(game) -> Snapshot:
+    """The audience copy of the cached snapshot: team codes are left out"""
+    snap = state_snapshot(game)
+    spectator = game.spectator_snapshot
+    if spectator is not None and spectator.version == snap.version:
+        return spectator
+    payload = dict(snap)
+    if payload["activeTeam"]:
+        payload["activeTeam"] = {k: v for k, v in payload["activeTeam"].items() if k != "code"}
+    spectator = Snapshot(payload, snap.version)
+    game.spectator_snapshot = spectator
+    return spectator
+
+
+def _diff(old: dict, new: dict):
+    changed = {k: v for k, v in new.items() if k != "seq" and (k not in old or old[k] != v)}
+    removed = [k for k in old if k not in new]
+    return changed, removed
+
+
+@metrics.timed("broadcast_state")
+def broadcast_state(game_id: int, force: bool = False) -> None:
+    """Send a state transition to the whole game room, as a patch when possible.
+
+    Nothing is sent when the state has not changed since the last broadcast,
+    unless ``force`` asks for a full rebroadcast (the admin ``broadcast`` op).
+    """
+    game = get_game(game_id)
+    if not game:
+        return
+    snap = state_snapshot(game)
+    with game.lock:
+        prev = game.broadcast_snapshot
+        if prev is not None and prev.version == snap.version and not force:
+            return
+        game.broadcast_snapshot = snap
+    spectator_feed.mark(game_id)
+
+    # Nothing to diff against, an explicit rebroadcast, or several workers
+    # broadcasting with their own version counters: send it all
+    if (prev is None or force or cluster.enabled
+            or not current_app.config.get("STATE_DELTAS")):
+        socketio.emit("state_update", snap, to=game_room(game_id))
+        return
+
+    changed, removed = _diff(prev, snap)
+    # A staged question is already on every screen (obfuscated) and its reveal
+    # carries the key: the patch names it instead of repeating its body
+    question = changed.get("question")
+    if question and question["id"] in game.stage_pushed:
+        changed["question"] = {"id": question["id"], "staged": True}
+    patch = {"gameId": snap["gameId"], "baseSeq": prev.version, "seq": snap.version, "set": changed}
+    if removed:
+        patch["unset"] = removed
+    socketio.emit("state_patch", patch, to=game_room(game_id))
+
+
+@metrics.timed("send_state")
+def send_state(game_id: int, sid: str, spectator: bool = False) -> None:
+    """Answer one client's join/state request without touching the rest of the room"""
+    if current_app.config.get("STATE_REPLY_MODE") == "broadcast" and not spectator:
+        broadcast_state(game_id, force=True)
+        return
+    game = get_game(game_id)
+    if not game:
+        return
+    snap = spectator_snapshot(game) if spectator else state_snapshot(game)
+    socketio.emit("state_update", snap, to=sid)
@@ -1,94 +1,47 @@
-import random
-import time
+from flask import request
 from flask_socketio import emit, join_room, leave_room
-from . import socketio
-from .db import get_db
+from . import eventlog, socketio
+from .journal import journal
+from .metrics import metrics
+from .profiling import profiler
+from .ratelimit import limiter
+from .rooms import game_room, host_room, spectator_room, team_room
+from .snapshot import broadcast_state, send_state
+from .staging import stage_upcoming
+from .buzzer import recv_us
+from . import registry
+from .state import get_game, now_ms
 
 # ----------------------------
-# Room helpers
+# Session helpers
 # ----------------------------
-def game_room(game_id: int) -> str:
-    return f"game:{game_id}"
-
-def team_room(game_id: int, team_code: str) -> str:
-    return f"game:{game_id}:team:{team_code}"
+def _team_for_event(data):
+    """Resolve ``(game, team, error)`` for a team event, preferring the sid bound on join"""
+    bound = registry.session(request.sid)
+    if bound and bound[2] == "spectator":
+        return None, None, "Spectators cannot play"
+    if bound and bound[1]:
+        game_id, team_code = bound[0], bound[1]
+    else:
+        game_id, team_code = data.get("gameId"), data.get("teamCode")
+        if not game_id or not team_code:
+            return None, None, "Game ID and team code required"
+    game = get_game(game_id)
+    team = game.team_by_code(team_code) if game else None
+    if not team:
+        return None, None, "Invalid team"
+    return game, team, None
 
-# ----------------------------
-# DB helpers
-# ----------------------------
-def get_team_by_code(game_id: int, team_code: str):
-    db = get_db()
-    return db.execute(
-        "SELECT * FROM teams WHERE game_id = ? AND code = ?",
-        (game_id, team_code)
-    ).fetchone()
-
-def get_game_settings(game_id: int):
-    db = get_db()
-    return db.execute(
-        "SELECT * FROM settings WHERE game_id = ?",
-        (game_id,)
-    ).fetchone()
-
-def get_current_question(game_id: int):
-    db = get_db()
-    return db.execute(
-        """
-        SELECT q.*
-        FROM questions q
-        JOIN settings s ON q.id = s.current_question_id
-        WHERE s.game_id = ?
-        """,
-        (game_id,)
-    ).fetchone()
-
-def get_team_masks(game_id: int, team_id: int, question_id: int):
-    db = get_db()
-    return db.execute(
-        "SELECT masked_i1, masked_i2 FROM team_masks WHERE game_id = ? AND team_id = ? AND question_id = ?",
-        (game_id, team_id, question_id)
-    ).fetchone()
-
-# ----------------------------
-# Broadcast shared state
-# ----------------------------
-def _broadcast_state(game_id: int) -> None:
-    db = get_db()
-    s = get_game_settings(game_id)
-    if not s:
-        return
-
-    payload = {
-        "gameId": game_id,
-        "state": s["state"],
-        "deadlineEpochMs": s["deadline_epoch_ms"],
-        "activeTeamId": s["active_team_id"],
-        "currentRoundId": s["current_round_id"],
-    }
-
-    if s["current_question_id"]:
-        q = db.execute("SELECT * FROM questions WHERE id = ?", (s["current_question_id"],)).fetchone()
-        if q:
-            payload["question"] = {
-                "id": q["id"],
-                "text": q["text"],
-                "options": [q["opt_a"], q["opt_b"], q["opt_c"], q["opt_d"]],
-                "type": q["type"],
-            }
-
-    active = None
-    if s["active_team_id"]:
-        t = db.execute("SELECT id, name, code FROM teams WHERE id = ?", (s["active_team_id"],)).fetchone()
-        if t:
-            active = {"id": t["id"], "name": t["name"], "code": t["code"]}
-    payload["activeTeam"] = active
-
-    socketio.emit("state_update", payload, to=game_room(game_id))
+def _is_spectator():
+    bound = registry.session(request.sid)
+    return bool(bound) and bound[2] == "spectator"
 
 # ----------------------------
 # Socket.IO handlers
 # ----------------------------
 @socketio.on("join")
+@profiler.profiled("join")
+@metrics.timed("join")
 def handle_join(data):
     game_id = data.get("gameId")
     team_code = data.get("teamCode")
@@ -98,65 +51,76 @@ def handle_join(data):
         emit("error", {"message": "Game ID required"})
         return
 
+    game = get_game(game_id)
+    if not game:
+        emit("error", {"message": "Invalid game"})
+        return
+
+    # Audience screens are read-only and fed by app/spectators.py
+    if role == "spectator":
+        join_room(spectator_room(game_id))
+        registry.bind_session(request.sid, game.game_id, None, role)
+        emit("joined", {"gameId": game_id, "role": role})
+        send_state(game_id, request.sid, spectator=True)
+        return
+
     join_room(game_room(game_id))
+    if role == "host":
+        join_room(host_room(game_id))
 
     if team_code:
-        team = get_team_by_code(game_id, team_code)
-        if not team:
+        if not game.team_by_code(team_code):
             emit("error", {"message": "Invalid team code"})
             return
         join_room(team_room(game_id, team_code))
 
+    registry.bind_session(request.sid, game.game_id, team_code, role)
     emit("joined", {"gameId": game_id, "teamCode": team_code, "role": role})
-    _broadcast_state(game_id)
+    send_state(game_id, request.sid)
+    stage_upcoming(game, request.sid)
+
+@socketio.on("disconnect")
+@profiler.profiled("disconnect")
+@metrics.timed("disconnect")
+def handle_disconnect(*args):
+    registry.unbind_session(request.sid)
+    limiter.forget_sid(request.sid)
 
 @socketio.on("state_request")
+@profiler.profiled("state_request")
+@metrics.timed("state_request")
 def handle_state_request(data):
     game_id = data.get("GameId") or data.get("gameId")
     if game_id:
-        _broadcast_state(game_id)
+        send_state(game_id, request.sid, spectator=_is_spectator())
 
 @socketio.on("buzz")
+@profiler.profiled("buzz")
+@metrics.timed("buzz")
 def handle_buzz(data):
-    game_id = data.get("gameId")
-    team_code = data.get("teamCode")
-
-    if not game_id or not team_code:
-        emit("error", {"message": "Game ID and team code required"})
+    received_us = recv_us()
+    if not limiter.allow_sid("buzz", request.sid):
         return
-
-    db = get_db()
-    team = get_team_by_code(game_id, team_code)
-    if not team:
-        emit("error", {"message": "Invalid team"})
+    game, team, error = _team_for_event(data)
+    if error:
+        emit("error", {"message": error})
         return
-
-    s = get_game_settings(game_id)
-    if not s or s["state"] != "SHOW":
-        emit("error", {"message": "Buzzing not allowed in current state"})
+    if not limiter.allow_team("buzz", game.game_id, team["id"]):
         return
-
-    qid = s["current_question_id"]
-    if not qid:
-        emit("error", {"message": "No current question"})
+    game_id, team_code = game.game_id, team["code"]
+
+    # Late presses for a decided question are answered from memory; the attempt is
+    # still queued on the journal so every press is recorded with accepted=0
+    qid = game.current_question_id
+    if game.buzz_decided():
+        limiter.drop("buzz", "decided")
+        game.buzzer.reject(team["id"], qid, received_us)
+        emit("error", {"message": "Another team buzzed first"})
         return
 
-    now_ms = int(time.time() * 1000)
-
-    try:
-        db.execute("BEGIN IMMEDIATE")
-        db.execute(
-            "INSERT INTO buzzer_events (game_id, team_id, question_id, ts, accepted) VALUES (?, ?, ?, ?, 1)",
-            (game_id, team["id"], qid, now_ms),
-        )
-        db.execute("UPDATE settings SET active_team_id = ? WHERE game_id = ?", (team["id"], game_id))
-        db.commit()
-    except Exception as e:
-        db.rollback()
-        if "UNIQUE constraint failed" in str(e):
-            emit("error", {"message": "Another team buzzed first"})
-        else:
-            emit("error", {"message": "Buzz failed due to system error"})
+    qid, error = game.try_buzz(team, received_us)
+    if error:
+        emit("error", {"message": error})
         return
 
     socketio.emit(
@@ -164,83 +128,83 @@ def handle_buzz(data):
         {"questionId": qid, "winnerTeamCode": team_code, "winnerTeamName": team["name"]},
         to=game_room(game_id),
     )
+    broadcast_state(game_id)
 
-@socketio.on("fifty_request")
-def handle_fifty_fifty(data):
-    game_id = data.get("gameId")
-    team_code = data.get("teamCode")
+    # Memory is already authoritative; the attempt rows were queued by the arbiter
+    journal.append("UPDATE settings SET active_team_id = ? WHERE game_id = ?", (team["id"], game.game_id))
 
-    if not game_id or not team_code:
-        emit("error", {"message": "Game ID and team code required"})
+@socketio.on("answer")
+@profiler.profiled("answer")
+@metrics.timed("answer")
+def handle_answer(data):
+    received_us = recv_us()
+    if not limiter.allow_sid("answer", request.sid):
         return
-
-    db = get_db()
-    team = get_team_by_code(game_id, team_code)
-    if not team:
-        emit("error", {"message": "Invalid team"})
+    game, team, error = _team_for_event(data)
+    if error:
+        emit("error", {"message": error})
         return
-
-    s = get_game_settings(game_id)
-    if not s or s["state"] != "SHOW":
-        emit("error", {"message": "50-50 not allowed in current state"})
+    if not limiter.allow_team("answer", game.game_id, team["id"]):
         return
 
-    qid = s["current_question_id"]
-    if not qid:
-        emit("error", {"message": "No current question"})
+    # Validated and tallied in memory; the row and its event are journaled and
+    # the host sees the new counts on the next tally push
+    qid, error = game.submit_answer(team, data.get("choice"), received_us)
+    if error:
+        emit("error", {"message": error})
         return
+    emit("answer_ack", {"questionId": qid, "choice": data.get("choice")})
 
-    q = db.execute("SELECT * FROM questions WHERE id = ?", (qid,)).fetchone()
-    if not q or q["type"] != "MCQ":
-        emit("error", {"message": "50-50 only available for multiple choice questions"})
+@socketio.on("fifty_request")
+@profiler.profiled("fifty_request")
+@metrics.timed("fifty_request")
+def handle_fifty_fifty(data):
+    if not limiter.allow_sid("fifty_request", request.sid):
         return
-
-    existing_mask = db.execute(
-        "SELECT masked_i1, masked_i2 FROM team_masks WHERE game_id = ? AND team_id = ? AND question_id = ?",
-        (game_id, team["id"], qid),
-    ).fetchone()
-    if existing_mask:
-        masked = [existing_mask["masked_i1"], existing_mask["masked_i2"]]
-        socketio.emit(
-            "mask_applied",
-            {"gameId": game_id, "teamCode": team_code, "questionId": qid, "maskedOptions": masked},
-            to=team_room(game_id, team_code),
-        )
+    game, team, error = _team_for_event(data)
+    if error:
+        emit("error", {"message": error})
+        return
+    if not limiter.allow_team("fifty_request", game.game_id, team["id"]):
         return
+    game_id, team_code = game.game_id, team["code"]
 
-    used = db.execute(
-        "SELECT 1 FROM lifeline_usage WHERE game_id=? AND team_id=? AND lifeline=? AND used_in_round_id=?",
-        (game_id, team["id"], "FIFTY_FIFTY", s["current_round_id"]),
-    ).fetchone()
-    if used:
-        emit("error", {"message": "50-50 lifeline already used this round"})
+    qid, masked, usage, error = game.take_fifty_fifty(team)
+    if error:
+        emit("error", {"message": error})
         return
 
-    correct = q["correct_index"]
-    wrong = [i for i in range(4) if i != correct]
-    seed = f"{game_id}:{team_code}:{qid}"
-    rng = random.Random(seed)
-    masked = sorted(rng.sample(wrong, 2))
+    socketio.emit(
+        "mask_applied",
+        {"gameId": game_id, "teamCode": team_code, "questionId": qid, "maskedOptions": masked},
+        to=team_room(game_id, team_code),
+    )
+
+    if not usage:
+        return
 
-    now_ms = int(time.time() * 1000)
-    db.execute(
+    ts = now_ms()
+    journal.append(
         "INSERT INTO team_masks (game_id, team_id, question_id, masked_i1, masked_i2, ts) VALUES (?, ?, ?, ?, ?, ?)",
-        (game_id, team["id"], qid, masked[0], masked[1], now_ms),
+        (game.game_id, team["id"], qid, masked[0], masked[1], ts),
     )
-    db.execute(
+    journal.append(
         "INSERT INTO lifeline_usage (game_id, team_id, lifeline, used_in_round_id, used_at) VALUES (?, ?, ?, ?, ?)",
-        (game_id, team["id"], "FIFTY_FIFTY", s["current_round_id"], now_ms),
+        (game.game_id, *usage, ts),
     )
-    db.commit()
+    eventlog.record(game.game_id, "lifeline", team["id"], qid, lifeline=usage[1], roundId=usage[2], masked=masked)
 
-    socketio.emit(
-        "mask_applied",
-        {"gameId": game_id, "teamCode": team_code, "questionId": qid, "maskedOptions": masked},
-        to=team_room(game_id, team_code),
-    )
+@socketio.on("clock_ping")
+@profiler.profiled("clock_ping")
+@metrics.timed("clock_ping")
+def handle_clock_ping(data):
+    # Echo the client's send time with ours so it can estimate its clock offset
+    emit("clock_pong", {"t0": data.get("t0"), "serverMs": now_ms()})
 
 @socketio.on("state_push")
+@profiler.profiled("state_push")
+@metrics.timed("state_push")
 def handle_state_push(data):
     game_id = data.get("gameId")
     if game_id:
-        _broadcast_state(game_id)
+        send_state(game_id, request.sid, spectator=_is_spectator())
@@ -0,0 +1,78 @@
+"""Read-only audience feed: projectors and phones watching a game.
+
+Spectators join ``game:{id}:spectators`` instead of the game room, so the
+per-transition patches, buzz locks, staged questions and toasts sent to teams
+and hosts never fan out to them. Every state broadcast and admin toast only
+marks the game here; one background task sends each marked game's audience
+snapshot (team codes left out) at most every ``SPECTATOR_INTERVAL_MS``, so
+any number of changes inside a window reach the audience as one emit.
+"""
+import threading
+
+from .rooms import spectator_room
+
+
+class SpectatorFeed:
+    def __init__(self):
+        self.app = None
+        self.interval_s = 0.5
+        self._dirty = set()        # game ids whose state changed since the last push
+        self._toasts = {}          # game id -> toast messages since the last push
+        self._sent = {}            # game id -> snapshot last pushed
+        self._lock = threading.Lock()
+        self._running = False
+        self.marks = 0
+        self.pushes = 0
+
+    def init_app(self, app, socketio) -> None:
+        self.app = app
+        self.interval_s = app.config["SPECTATOR_INTERVAL_MS"] / 1000.0
+        if not self._running:
+            self._running = True
+            socketio.start_background_task(self._run, socketio)
+
+    def mark(self, game_id: int) -> None:
+        """Note a state change; O(1) so broadcasting paths pay nothing for the audience"""
+        with self._lock:
+            self._dirty.add(game_id)
+            self.marks += 1
+
+    def toast(self, game_id: int, msg: str) -> None:
+        with self._lock:
+            self._toasts.setdefault(game_id, []).append(msg)
+            self.marks += 1
+
+    def _run(self, socketio) -> None:
+        from .snapshot import spectator_snapshot
+        from .state import peek_game
+
+        while self._running:
+            socketio.sleep(self.interval_s)
+            with self._lock:
+                dirty, self._dirty = self._dirty, set()
+                toasts, self._toasts = self._toasts, {}
+            for game_id in dirty | set(toasts):
+                game = peek_game(game_id)
+                if game is None:
+                    continue
+                try:
+                    with self.app.app_context():
+                        snap = spectator_snapshot(game)
+                        if game_id in dirty and self._sent.get(game_id) is not snap:
+                            socketio.emit("state_update", snap, to=spectator_room(game_id))
+                            self._sent[game_id] = snap
+                            self.pushes += 1
+                        if game_id in toasts:
+                            socketio.emit("toast", {"msg": " · ".join(toasts[game_id])}, to=spectator_room(game_id))
+                            self.pushes += 1
+                except Exception:
+                    self.app.logger.exception("spectators: push for game %s failed", game_id)
+
+    def stats(self) -> dict:
+        return {"marks": self.marks, "pushes": self.pushes}
+
+    def stop(self) -> None:
+        self._running = False
+
+
+spectator_feed = SpectatorFeed()
@@ -0,0 +1,74 @@
+"""Pre-staged question pipeline for synchronized reveals.
+
+Each round has a queue of questions (``GameState.queues``). The next
+``PRESTAGE_COUNT`` are pushed to the game room ahead of time as
+``question_stage`` events holding an obfuscated copy of the question's public
+JSON. Revealing one is then a ``question_reveal`` of a few dozen bytes:
+
+    {gameId, questionId, key, showAt, deadlineEpochMs}
+
+Clients decode the staged payload with ``key`` and show it at ``showAt`` (server
+clock, ``REVEAL_LEAD_MS`` ahead), so every screen flips at the same moment
+instead of rendering whenever the full state push lands. Clients that missed
+the stage ignore the reveal and show the question from the state push.
+
+Payloads are XORed with a 16-byte key derived from ``SECRET_KEY``. This keeps
+the text out of sight in the browser's dev tools until the reveal. It is not
+encryption. Keys are deterministic, so every worker stages and reveals a
+question with the same key.
+"""
+import base64
+import hashlib
+import hmac
+
+from flask import current_app
+
+from . import socketio
+from .rooms import game_room
+
+
+def _key(game, q) -> bytes:
+    secret = str(current_app.config["SECRET_KEY"]).encode()
+    return hmac.new(secret, f"{game.game_id}:{q.id}:{q.public_json}".encode(), hashlib.sha256).digest()[:16]
+
+
+def staged_payload(game, q) -> tuple:
+    """``(key, blob)`` for a question, both base64; built once per loaded game"""
+    cached = game.staged.get(q.id)
+    if cached is not None:
+        return cached
+    key = _key(game, q)
+    data = q.public_json.encode()
+    blob = bytes(b ^ key[i % len(key)] for i, b in enumerate(data))
+    cached = game.staged[q.id] = (base64.b64encode(key).decode(), base64.b64encode(blob).decode())
+    return cached
+
+
+def stage_upcoming(game, sid=None) -> int:
+    """Push the round's upcoming questions to one socket, or to the room the first time; return how many"""
+    qids = game.upcoming(current_app.config["PRESTAGE_COUNT"])
+    if sid is None:
+        qids = [qid for qid in qids if qid not in game.stage_pushed]
+    questions = [{"id": qid, "blob": staged_payload(game, game.questions[qid])[1]}
+                 for qid in qids if qid in game.questions]
+    if not questions:
+        return 0
+    socketio.emit("question_stage", {"gameId": game.game_id, "questions": questions},
+                  to=sid or game_room(game.game_id))
+    if sid is None:
+        game.stage_pushed.update(q["id"] for q in questions)
+    return len(questions)
+
+
+def reveal(game, question_id: int, show_at_ms: int, deadline_ms: int) -> bool:
+    """Send the reveal for a question the room already has staged; False if it was never pushed"""
+    if question_id not in game.stage_pushed:
+        return False
+    key, _ = staged_payload(game, game.questions[question_id])
+    socketio.emit(
+        "question_reveal",
+        {"gameId": game.game_id, "questionId": question_id, "key": key,
+         "showAt": show_at_ms, "deadlineEpochMs": deadline_ms},
+        to=game_room(game.game_id),
+    )
+    return True
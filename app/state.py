@@ -0,0 +1,561 @@
+"""In-memory authoritative game state.
+
+Each game is loaded from SQLite once per process and then served from memory.
+Socket handlers read and arbitrate against these objects only; SQLite is kept
+as the journal of what happened so a restart can rebuild the same state.
+"""
+import threading
+import time
+
+from . import eventlog
+from .answers import AnswerBook, tally_stream
+from .buzzer import BuzzerArbiter
+from .cluster import cluster
+from .db import get_db
+from .journal import journal
+from .leaderboard import Leaderboard
+from .questions import Question
+from . import registry
+from .timers import timers
+
+STATES = ("IDLE", "SHOW", "LOCK", "REVEAL")
+ANSWER_MODES = ("BUZZ", "ALL_PLAY")
+FIFTY_FIFTY = "FIFTY_FIFTY"
+
+
+def now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+class GameState:
+    """Settings, questions, teams and lifeline state for one game"""
+
+    def __init__(self, game_id: int):
+        self.game_id = game_id
+        self.lock = threading.RLock()
+
+        # settings row
+        self.state = "IDLE"
+        self.deadline_epoch_ms = 0
+        self.current_round_id = None
+        self.current_question_id = None
+        self.active_team_id = None
+        self.answer_mode = "BUZZ"
+        self.show_at_ms = 0            # staged reveal moment; no buzz or answer counts before it
+
+        self.round_ids = set()     # the game's rounds, fixed when it is created
+        self.questions = {}        # question id -> Question (app/questions.py)
+        self.teams = {}            # team id -> team dict
+        self.teams_by_code = {}    # team code -> team dict
+        self.masks = {}            # (team id, question id) -> [i1, i2]
+        self.lifelines = set()     # (team id, lifeline, round id)
+        self.buzzer = BuzzerArbiter(game_id)
+        self.leaderboard = Leaderboard()   # scores, see app/leaderboard.py
+        self.answers = AnswerBook(game_id)  # all-play answers, see app/answers.py
+
+        # Question pipeline, see app/staging.py
+        self.queues = {}           # round id -> question ids waiting to be revealed, in order
+        self.staged = {}           # question id -> (key, blob) obfuscated client payload
+        self.stage_pushed = set()  # question ids already pushed to the whole room
+        if cluster.enabled:
+            self.buzzer.confirm = cluster.confirm_buzz
+
+        # Bumped on every write to settings, questions or teams
+        self.version = 0
+        self.snapshot = None            # cached state_update payload, see app/snapshot.py
+        self.broadcast_snapshot = None  # last snapshot patched/sent to the whole room
+        self.spectator_snapshot = None  # cached audience payload, without team codes
+
+    # ----------------------------
+    # Loading
+    # ----------------------------
+    @classmethod
+    def load(cls, db, game_id: int):
+        """Build the state for a game from SQLite, or None if it has no settings"""
+        s = db.execute("SELECT * FROM settings WHERE game_id = ?", (game_id,)).fetchone()
+        if not s:
+            return None
+
+        game = cls(game_id)
+        game.state = s["state"]
+        game.deadline_epoch_ms = s["deadline_epoch_ms"]
+        game.current_round_id = s["current_round_id"]
+        game.current_question_id = s["current_question_id"]
+        game.active_team_id = s["active_team_id"]
+        game.answer_mode = s["answer_mode"]
+        game.show_at_ms = s["show_at_ms"]
+        if game.state == "SHOW" and game.deadline_epoch_ms:
+            timers.schedule(game_id, game.deadline_epoch_ms)
+
+        game.round_ids = {r["id"] for r in db.execute("SELECT id FROM rounds WHERE game_id = ?", (game_id,))}
+        for t in db.execute("SELECT id, name, code FROM teams WHERE game_id = ?", (game_id,)):
+            game._put_team(dict(t))
+        for q in db.execute("SELECT * FROM questions WHERE game_id = ?", (game_id,)):
+            game._put_question(Question.from_row(q))
+        for m in db.execute(
+            "SELECT team_id, question_id, masked_i1, masked_i2 FROM team_masks WHERE game_id = ?",
+            (game_id,),
+        ):
+            game.masks[(m["team_id"], m["question_id"])] = [m["masked_i1"], m["masked_i2"]]
+        for u in db.execute(
+            "SELECT team_id, lifeline, used_in_round_id FROM lifeline_usage WHERE game_id = ?",
+            (game_id,),
+        ):
+            game.lifelines.add((u["team_id"], u["lifeline"], u["used_in_round_id"]))
+        for b in db.execute(
+            "SELECT question_id, team_id, ts_us FROM buzzer_events WHERE game_id = ? AND accepted = 1",
+            (game_id,),
+        ):
+            game.buzzer.load_winner(b["question_id"], b["team_id"], b["ts_us"] or 0)
+        for r in db.execute("SELECT team_id, points, correct, wrong FROM team_scores WHERE game_id = ?", (game_id,)):
+            game.leaderboard.load_total(r["team_id"], r["points"], r["correct"], r["wrong"])
+        for j in db.execute("SELECT team_id, question_id, correct, points FROM judgements WHERE game_id = ?", (game_id,)):
+            game.leaderboard.load_judgement(j["team_id"], j["question_id"], j["correct"], j["points"])
+        for a in db.execute("SELECT team_id, question_id, choice FROM answers WHERE game_id = ?", (game_id,)):
+            game.answers.load(a["team_id"], a["question_id"], a["choice"])
+        for r in db.execute(
+            "SELECT round_id, question_id FROM question_queue WHERE game_id = ? ORDER BY round_id, position",
+            (game_id,),
+        ):
+            game.queues.setdefault(r["round_id"], []).append(r["question_id"])
+        return game
+
+    def _put_question(self, q: Question) -> None:
+        self.questions[q.id] = q
+        self.version += 1
+
+    def _put_team(self, t: dict) -> None:
+        self.teams[t["id"]] = t
+        self.teams_by_code[t["code"]] = t
+        self.leaderboard.invalidate()
+        self.version += 1
+
+    # ----------------------------
+    # Reads
+    # ----------------------------
+    def team_by_code(self, code: str):
+        return self.teams_by_code.get(code)
+
+    def current_question(self):
+        if self.current_question_id is None:
+            return None
+        return self.questions.get(self.current_question_id)
+
+    def active_team(self):
+        if self.active_team_id is None:
+            return None
+        return self.teams.get(self.active_team_id)
+
+    def upcoming(self, limit=None) -> list:
+        """The next queued question ids for the current round"""
+        return self.queues.get(self.current_round_id, [])[:limit]
+
+    def standings(self) -> list:
+        with self.lock:
+            return self.leaderboard.standings(self.teams)
+
+    # ----------------------------
+    # Team events (memory first, journal after)
+    # ----------------------------
+    def buzz_decided(self) -> bool:
+        """Whether the current question already has a winner"""
+        qid = self.current_question_id
+        return bool(qid) and self.buzzer.winner(qid) is not None
+
+    def try_buzz(self, team: dict, received_us: int):
+        """Claim the current question for a team.
+
+        Lock-free for losers: only the single winner per question takes the
+        game lock to publish the new active team. Returns ``(question_id, None)``
+        for the winner or ``(None, message)``.
+        """
+        qid = self.current_question_id
+        if not qid:
+            return None, "No current question"
+        if self.state != "SHOW":
+            self.buzzer.reject(team["id"], qid, received_us)
+            return None, "Buzzing not allowed in current state"
+        if received_us // 1000 < self.show_at_ms:
+            self.buzzer.reject(team["id"], qid, received_us)
+            return None, "Question not shown yet"
+        if self.deadline_epoch_ms and received_us // 1000 >= self.deadline_epoch_ms:
+            self.buzzer.reject(team["id"], qid, received_us)
+            return None, "Time is up"
+        if not self.buzzer.claim(team["id"], qid, received_us):
+            if self.buzzer.winner(qid) is None:
+                return None, "Buzz could not be confirmed, try again"
+            return None, "Another team buzzed first"
+        with self.lock:
+            self.active_team_id = team["id"]
+            self.version += 1
+        cluster.publish("buzz", self.game_id, questionId=qid, teamId=team["id"])
+        return qid, None
+
+    def submit_answer(self, team: dict, choice, received_us: int):
+        """Take a team's all-play answer for the current question.
+
+        Returns ``(question_id, None)`` or ``(None, message)``; validation and
+        tallying happen in memory and the row is journaled.
+        """
+        qid = self.current_question_id
+        if self.answer_mode != "ALL_PLAY":
+            return None, "Answers are only taken in all-play mode"
+        if not qid or self.state != "SHOW":
+            return None, "Answers not allowed in current state"
+        if received_us // 1000 < self.show_at_ms:
+            return None, "Question not shown yet"
+        if self.deadline_epoch_ms and received_us // 1000 >= self.deadline_epoch_ms:
+            return None, "Time is up"
+        if type(choice) is not int or not 0 <= choice <= 3:
+            return None, "choice must be 0-3"
+        mask = self.masks.get((team["id"], qid))
+        if mask and choice in mask:
+            return None, "That option was removed by your 50-50"
+        q = self.questions.get(qid)
+        if q is None:
+            return None, "No current question"
+        if not self.answers.submit(team["id"], qid, choice, choice == q.correct_index, received_us):
+            return None, "Answer already submitted"
+        tally_stream.mark(self.game_id, qid)
+        cluster.publish("answer", self.game_id, teamId=team["id"], questionId=qid, choice=choice)
+        return qid, None
+
+    def take_fifty_fifty(self, team: dict):
+        """Apply a 50-50 for a team on the current question.
+
+        Returns ``(question_id, masked, usage, None)`` or ``(None, None, None, message)``,
+        where ``usage`` is the new ``(team id, lifeline, round id)`` entry to journal.
+        Already-applied masks are returned again with ``usage`` None.
+        """
+        with self.lock:
+            if self.state != "SHOW":
+                return None, None, None, "50-50 not allowed in current state"
+            if now_ms() < self.show_at_ms:
+                return None, None, None, "Question not shown yet"
+            if self.deadline_epoch_ms and now_ms() >= self.deadline_epoch_ms:
+                return None, None, None, "Time is up"
+            qid = self.current_question_id
+            if not qid:
+                return None, None, None, "No current question"
+            q = self.questions.get(qid)
+            if not q or not q.supports_fifty_fifty:
+                return None, None, None, "50-50 only available for multiple choice questions"
+
+            existing = self.masks.get((team["id"], qid))
+            if existing:
+                return qid, existing, None, None
+
+            usage = (team["id"], FIFTY_FIFTY, self.current_round_id)
+            if usage in self.lifelines:
+                return None, None, None, "50-50 lifeline already used this round"
+
+            masked = q.fifty_mask(team["id"], team["code"])
+            self.masks[(team["id"], qid)] = masked
+            self.lifelines.add(usage)
+        cluster.publish("lifeline", self.game_id, teamId=team["id"], questionId=qid, masked=masked, usage=usage)
+        return qid, masked, usage, None
+
+    # ----------------------------
+    # Changes made by other workers (see app/cluster.py)
+    # ----------------------------
+    def apply_remote_buzz(self, question_id: int, team_id: int) -> None:
+        with self.lock:
+            self.buzzer.load_winner(question_id, team_id)
+            if question_id == self.current_question_id:
+                self.active_team_id = team_id
+                self.version += 1
+
+    def apply_remote_answer(self, team_id: int, question_id: int, choice: int) -> None:
+        self.answers.load(team_id, question_id, choice)
+        tally_stream.mark(self.game_id, question_id)
+
+    def apply_remote_lifeline(self, team_id: int, question_id: int, masked: list, usage: tuple) -> None:
+        with self.lock:
+            self.masks[(team_id, question_id)] = masked
+            self.lifelines.add(usage)
+
+    # ----------------------------
+    # Admin writes (SQLite first so constraint failures leave memory untouched)
+    # ----------------------------
+    def _save_settings(self, db, before_apply=None, **changes) -> None:
+        """Write the settings row with ``changes`` applied, then apply them in memory.
+
+        Queued journal rows are flushed first so a late write-behind row can
+        never land on top of an admin change; callers that write earlier in the
+        same transaction flush before their first write, since the journal's
+        connection would wait on this one's lock. The change is logged as a
+        ``settings`` event in the same transaction. ``before_apply`` runs after
+        the commit but before memory changes, for resets that must not race
+        the lock-free buzz and answer paths.
+        """
+        if not db.in_transaction:
+            journal.flush()
+        row = {
+            "current_round_id": self.current_round_id,
+            "current_question_id": self.current_question_id,
+            "state": self.state,
+            "deadline_epoch_ms": self.deadline_epoch_ms,
+            "active_team_id": self.active_team_id,
+            "answer_mode": self.answer_mode,
+            "show_at_ms": self.show_at_ms,
+        }
+        row.update(changes)
+        db.execute(
+            """UPDATE settings SET current_round_id = ?, current_question_id = ?, state = ?,
+                   deadline_epoch_ms = ?, active_team_id = ?, answer_mode = ?, show_at_ms = ?
+               WHERE game_id = ?""",
+            (row["current_round_id"], row["current_question_id"], row["state"],
+             row["deadline_epoch_ms"], row["active_team_id"], row["answer_mode"], row["show_at_ms"],
+             self.game_id),
+        )
+        if changes:
+            eventlog.record(self.game_id, "settings", db=db, **changes)
+        db.commit()
+        if before_apply is not None:
+            before_apply()
+        for key, value in changes.items():
+            setattr(self, key, value)
+        self.version += 1
+        if self.state == "SHOW" and self.deadline_epoch_ms:
+            timers.schedule(self.game_id, self.deadline_epoch_ms)
+        cluster.publish("invalidate", self.game_id)
+
+    def _reset_buzz(self, db, question_id: int) -> None:
+        """Demote a question's accepted buzz to a plain attempt so it can be won again"""
+        db.execute(
+            "UPDATE buzzer_events SET accepted = 0 WHERE game_id = ? AND question_id = ? AND accepted = 1",
+            (self.game_id, question_id),
+        )
+        eventlog.record(self.game_id, "buzz_reset", question_id=question_id, db=db)
+
+    def _reset_answers(self, db, question_id: int) -> None:
+        """Drop a question's all-play answers so showing it again starts a fresh tally"""
+        db.execute("DELETE FROM answers WHERE game_id = ? AND question_id = ?", (self.game_id, question_id))
+        eventlog.record(self.game_id, "answers_reset", question_id=question_id, db=db)
+
+    def set_round(self, db, round_id: int) -> None:
+        with self.lock:
+            self._save_settings(db, current_round_id=round_id)
+
+    def set_question(self, db, question_id: int, deadline_ms: int, show_at_ms: int = 0) -> None:
+        """Show a question; a staged one only takes buzzes and answers from ``show_at_ms``"""
+        with self.lock:
+            journal.flush()
+            self._reset_buzz(db, question_id)
+            self._reset_answers(db, question_id)
+
+            def reset():
+                # Before the question goes live in memory, so no buzz or answer can win and be wiped
+                self.buzzer.reset(question_id)
+                self.answers.reset(question_id)
+
+            self._save_settings(
+                db,
+                before_apply=reset,
+                current_question_id=question_id,
+                state="SHOW",
+                deadline_epoch_ms=deadline_ms,
+                active_team_id=None,
+                show_at_ms=show_at_ms,
+            )
+        tally_stream.mark(self.game_id, question_id)
+
+    def lock_at_deadline(self, db, deadline_ms: int) -> bool:
+        """Move SHOW to LOCK if ``deadline_ms`` is still the deadline; True if it did.
+
+        With several workers every scheduler fires; the conditional update lets
+        exactly one of them lock the question, and the others learn of it from
+        its invalidate.
+        """
+        with self.lock:
+            if self.state != "SHOW" or self.deadline_epoch_ms != deadline_ms:
+                return False
+            if cluster.enabled:
+                journal.flush()
+                claimed = db.execute(
+                    "UPDATE settings SET state = 'LOCK' "
+                    "WHERE game_id = ? AND state = 'SHOW' AND deadline_epoch_ms = ?",
+                    (self.game_id, deadline_ms),
+                ).rowcount
+                if not claimed:
+                    db.rollback()
+                    return False
+            self._save_settings(db, state="LOCK")
+            return True
+
+    def set_state(self, db, state: str) -> None:
+        with self.lock:
+            self._save_settings(db, state=state)
+
+    def set_answer_mode(self, db, mode: str) -> None:
+        with self.lock:
+            self._save_settings(db, answer_mode=mode)
+
+    def set_deadline(self, db, deadline_ms: int) -> None:
+        with self.lock:
+            self._save_settings(db, deadline_epoch_ms=deadline_ms)
+
+    def add_time(self, db, seconds: int) -> None:
+        with self.lock:
+            if self.deadline_epoch_ms:
+                self._save_settings(db, deadline_epoch_ms=self.deadline_epoch_ms + seconds * 1000)
+
+    def unlock_buzz(self, db) -> None:
+        with self.lock:
+            qid = self.current_question_id
+            if not qid:
+                return
+            journal.flush()
+            self._reset_buzz(db, qid)
+            self._save_settings(db, before_apply=lambda: self.buzzer.reset(qid), active_team_id=None)
+
+    def clear_masks(self, db) -> None:
+        with self.lock:
+            qid = self.current_question_id
+            if not qid:
+                return
+            journal.flush()
+            db.execute("DELETE FROM team_masks WHERE game_id = ? AND question_id = ?", (self.game_id, qid))
+            eventlog.record(self.game_id, "masks_cleared", question_id=qid, db=db)
+            db.commit()
+            for key in [k for k in self.masks if k[1] == qid]:
+                del self.masks[key]
+        cluster.publish("invalidate", self.game_id)
+
+    def set_active_team(self, db, team_id) -> None:
+        with self.lock:
+            self._save_settings(db, active_team_id=team_id)
+
+    def add_team(self, db, name: str, code: str) -> None:
+        with self.lock:
+            cursor = db.execute(
+                "INSERT INTO teams (game_id, name, code) VALUES (?, ?, ?)",
+                (self.game_id, name, code),
+            )
+            eventlog.record(self.game_id, "team_added", cursor.lastrowid, db=db, name=name, code=code)
+            db.commit()
+            self._put_team({"id": cursor.lastrowid, "name": name, "code": code})
+        registry.team_added(self.game_id, code)
+        cluster.publish("invalidate", self.game_id)
+
+    def add_question(self, db, text: str, options: list, correct_index: int, qtype: str) -> None:
+        with self.lock:
+            cursor = db.execute(
+                "INSERT INTO questions (game_id, text, opt_a, opt_b, opt_c, opt_d, correct_index, type) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (self.game_id, text, *options, correct_index, qtype),
+            )
+            eventlog.record(self.game_id, "question_added", question_id=cursor.lastrowid, db=db)
+            db.commit()
+            self._put_question(Question(self.game_id, cursor.lastrowid, text, options, correct_index, qtype))
+        cluster.publish("invalidate", self.game_id)
+
+    def set_queue(self, db, round_id: int, question_ids: list) -> None:
+        """Replace a round's question queue"""
+        with self.lock:
+            db.execute("DELETE FROM question_queue WHERE game_id = ? AND round_id = ?", (self.game_id, round_id))
+            db.executemany(
+                "INSERT INTO question_queue (game_id, round_id, position, question_id) VALUES (?, ?, ?, ?)",
+                [(self.game_id, round_id, i, qid) for i, qid in enumerate(question_ids)],
+            )
+            eventlog.record(self.game_id, "queue_set", db=db, roundId=round_id, questionIds=question_ids)
+            db.commit()
+            self.queues[round_id] = list(question_ids)
+        cluster.publish("invalidate", self.game_id)
+
+    def pop_queue(self, db):
+        """Take the next queued question of the current round; None if the queue is empty"""
+        with self.lock:
+            queue = self.queues.get(self.current_round_id)
+            if not queue:
+                return None
+            qid = queue[0]
+            journal.flush()
+            db.execute(
+                """DELETE FROM question_queue WHERE rowid = (
+                       SELECT rowid FROM question_queue WHERE game_id = ? AND round_id = ?
+                       ORDER BY position LIMIT 1)""",
+                (self.game_id, self.current_round_id),
+            )
+            eventlog.record(self.game_id, "queue_pop", question_id=qid, db=db, roundId=self.current_round_id)
+            self._save_settings(db)
+            queue.pop(0)
+            return qid
+
+    def judge(self, db, team_id: int, correct: bool, points: int):
+        """Score a team's answer to the current question; return the question id or None.
+
+        Judging the same team and question again replaces the earlier result.
+        """
+        with self.lock:
+            qid = self.current_question_id
+            if not qid:
+                return None
+            journal.flush()
+            delta = self.leaderboard.delta(team_id, qid, correct, points)
+            db.execute(
+                "INSERT OR REPLACE INTO judgements (game_id, team_id, question_id, correct, points, ts) VALUES (?, ?, ?, ?, ?, ?)",
+                (self.game_id, team_id, qid, int(correct), points, now_ms()),
+            )
+            db.execute(
+                """INSERT INTO team_scores (game_id, team_id, points, correct, wrong) VALUES (?, ?, ?, ?, ?)
+                   ON CONFLICT (game_id, team_id) DO UPDATE SET points = points + excluded.points,
+                       correct = correct + excluded.correct, wrong = wrong + excluded.wrong""",
+                (self.game_id, team_id, *delta),
+            )
+            eventlog.record(self.game_id, "judge", team_id, qid, db=db, correct=bool(correct), points=points)
+            db.commit()
+            self.leaderboard.judge(team_id, qid, correct, points)
+        cluster.publish("invalidate", self.game_id)
+        return qid
+
+
+# ----------------------------
+# Per-process registry
+# ----------------------------
+_games = {}
+_games_lock = threading.Lock()
+
+
+def get_game(game_id):
+    """Return the in-memory state for a game, loading it on first use"""
+    try:
+        game_id = int(game_id)
+    except (TypeError, ValueError):
+        return None
+
+    game = _games.get(game_id)
+    if game is not None:
+        return game
+
+    with _games_lock:
+        game = _games.get(game_id)
+        if game is None:
+            game = GameState.load(get_db(), game_id)
+            if game is not None:
+                _games[game_id] = game
+    return game
+
+
+def peek_game(game_id):
+    """Return the cached state for a game without loading it"""
+    try:
+        return _games.get(int(game_id))
+    except (TypeError, ValueError):
+        return None
+
+
+def forget_game(game_id=None) -> None:
+    """Drop cached state so the next access reloads from SQLite"""
+    with _games_lock:
+        if game_id is None:
+            _games.clear()
+        else:
+            _games.pop(int(game_id), None)
+
+
+def reload_game(game_id: int) -> None:
+    """Drop a game after a bulk change so every worker reloads it from SQLite"""
+    journal.flush()
+    forget_game(game_id)
+    registry.forget_team_codes()
+    cluster.publish("invalidate", int(game_id))
@@ -1,71 +1,60 @@
 # At top of file
 from flask import Blueprint, render_template, request, redirect, url_for
-from ..db import get_db, seed_if_empty
+from ..registry import default_game_id, games_for_team_code
+from ..state import get_game
 
 bp = Blueprint("team", __name__)
 
-# Existing index() keeps query-string support
-@bp.route("/")
-def index():
-    seed_if_empty()
-    team_code = request.args.get("code")
-    game_id = request.args.get("game", 1)
-    if not team_code:
-        return redirect(url_for("team.lobby"))  # go to lobby if no code
-    db = get_db()
-    team = db.execute(
-        "SELECT * FROM teams WHERE game_id = ? AND code = ?",
-        (game_id, team_code)
-    ).fetchone()
+def _render_team(game_id, code):
+    """Team page for a team code in a game, served from in-memory state"""
+    game = get_game(game_id)
+    team = game.team_by_code(code) if game else None
     if not team:
-        return render_template("team.html", error=f"Team {team_code} not found in game {game_id}")
-    settings = db.execute(
-        "SELECT current_question_id FROM settings WHERE game_id = ?",
-        (game_id,)
-    ).fetchone()
-    initial_qid = settings["current_question_id"] if settings else None
+        return render_template("team.html", error=f"Team {code} not found in game {game_id}")
     ctx = {
-        "gameId": int(game_id),
+        "gameId": game.game_id,
         "teamCode": team["code"],
         "teamName": team["name"],
         "teamId": team["id"],
-        "initialQuestionId": initial_qid,
+        "initialQuestionId": game.current_question_id,
     }
     return render_template("team.html", **ctx)
 
-# NEW: pretty URL like /team/TEAM_01
+# Existing index() keeps query-string support
+@bp.route("/")
+def index():
+    team_code = request.args.get("code")
+    if not team_code:
+        return redirect(url_for("team.lobby"))  # go to lobby if no code
+    game_id = request.args.get("game", type=int) or default_game_id()
+    return _render_team(game_id, team_code)
+
+# Pretty URL scoped to a game, like /team/3/TEAM_01
+@bp.route("/<int:game_id>/<code>")
+def game_team(game_id, code):
+    return _render_team(game_id, code.upper())
+
+# Pretty URL like /team/TEAM_01; the code picks its game when it is unambiguous
 @bp.route("/<code>")
 def by_code(code):
-    seed_if_empty()
-    game_id = 1  # or read from querystring/path if you run multiple games
-    db = get_db()
-    team = db.execute(
-        "SELECT * FROM teams WHERE game_id = ? AND code = ?",
-        (game_id, code.upper())
-    ).fetchone()
-    if not team:
-        return render_template("team.html", error=f"Team {code} not found in game {game_id}")
-    settings = db.execute(
-        "SELECT current_question_id FROM settings WHERE game_id = ?",
-        (game_id,)
-    ).fetchone()
-    initial_qid = settings["current_question_id"] if settings else None
-    ctx = {
-        "gameId": int(game_id),
-        "teamCode": team["code"],
-        "teamName": team["name"],
-        "teamId": team["id"],
-        "initialQuestionId": initial_qid,
-    }
-    return render_template("team.html", **ctx)
+    code = code.upper()
+    games = games_for_team_code(code)
+    if len(games) > 1:
+        return render_template(
+            "team.html",
+            error=f"Team {code} exists in several games; use /team/<game id>/{code}",
+        )
+    game_id = games[0] if games else default_game_id()
+    return _render_team(game_id, code)
 
 # Optional: a simple lobby that lists all teams and links
 @bp.route("/lobby")
-def lobby():
-    seed_if_empty()
-    db = get_db()
-    game = db.execute("SELECT id FROM games ORDER BY id ASC LIMIT 1").fetchone()
+@bp.route("/<int:game_id>/lobby")
+def lobby(game_id=None):
+    if game_id is None:
+        game_id = default_game_id()
+    game = get_game(game_id) if game_id else None
     if not game:
         return render_template("team.html", error="No game found")
-    teams = db.execute("SELECT name, code FROM teams WHERE game_id = ? ORDER BY id", (game["id"],)).fetchall()
-    return render_template("team_lobby.html", teams=teams, gameId=game["id"])
+    teams = sorted(game.teams.values(), key=lambda t: t["id"])
+    return render_template("team_lobby.html", teams=teams, gameId=game.game_id)
@@ -0,0 +1,81 @@
+"""Server-authoritative question deadlines.
+
+One background task serves every game: deadlines sit in a heap and the task
+sleeps until the earliest one (at most ``TIMER_TICK_MS``). When a SHOW
+question's deadline passes, the game moves to LOCK and the change is
+broadcast. Entries are never removed when a deadline moves; a stale entry is
+simply ignored because it no longer matches the game's current deadline.
+"""
+import heapq
+import threading
+import time
+
+
+def now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+class DeadlineScheduler:
+    def __init__(self):
+        self.app = None
+        self.tick_s = 0.05
+        self._heap = []            # (deadline ms, game id)
+        self._lock = threading.Lock()
+        self._running = False
+        self.transitions = 0
+
+    def init_app(self, app, socketio) -> None:
+        self.app = app
+        self.tick_s = app.config["TIMER_TICK_MS"] / 1000.0
+        if app.config["AUTO_LOCK_ON_DEADLINE"] and not self._running:
+            self._running = True
+            socketio.start_background_task(self._run, socketio)
+
+    def schedule(self, game_id: int, deadline_ms: int) -> None:
+        with self._lock:
+            heapq.heappush(self._heap, (deadline_ms, game_id))
+
+    def pending(self) -> int:
+        return len(self._heap)
+
+    def _due(self, now: int) -> list:
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                due.append(heapq.heappop(self._heap))
+        return due
+
+    def _next_sleep(self, now: int) -> float:
+        with self._lock:
+            if not self._heap:
+                return self.tick_s
+            return min(self.tick_s, max(0.0, (self._heap[0][0] - now) / 1000.0))
+
+    def _run(self, socketio) -> None:
+        while self._running:
+            now = now_ms()
+            for deadline, game_id in self._due(now):
+                try:
+                    self._expire(game_id, deadline)
+                except Exception:
+                    self.app.logger.exception("timers: failed to lock game %s", game_id)
+            socketio.sleep(self._next_sleep(now_ms()))
+
+    def _expire(self, game_id: int, deadline: int) -> None:
+        from .db import get_db
+        from .snapshot import broadcast_state
+        from .state import peek_game
+
+        game = peek_game(game_id)
+        if game is None or game.state != "SHOW" or game.deadline_epoch_ms != deadline:
+            return
+        with self.app.app_context():
+            if game.lock_at_deadline(get_db(), deadline):
+                self.transitions += 1
+                broadcast_state(game_id)
+
+    def stop(self) -> None:
+        self._running = False
+
+
+timers = DeadlineScheduler()
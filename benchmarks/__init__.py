@@ -0,0 +1 @@
+# Offline benchmarks driving the app through Flask-SocketIO test clients
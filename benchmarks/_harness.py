@@ -0,0 +1,114 @@
+"""Shared helpers for the offline benchmarks.
+
+Every run gets a throwaway SQLite file, the threading async mode and the demo
+seed, so results do not depend on instance/app.db or an installed eventlet.
+"""
+import os
+import tempfile
+
+from app import create_app, socketio
+from app import db as app_db
+from app import registry
+from app.bootstrap import bootstrap
+from app.config import load_config
+from app.journal import journal
+from app.ratelimit import limiter
+from app.state import forget_game, now_ms
+
+
+_app = None
+
+
+def make_app(**overrides):
+    """Return the benchmark app pointed at a fresh seeded database.
+
+    Socket handlers are registered on the module-level ``socketio`` server the
+    first time ``create_app`` runs, so one app is reused for every run in a
+    process and only its config is swapped.
+    """
+    global _app
+    journal.flush()
+    tmpdir = tempfile.mkdtemp(prefix="quiz-bench-")
+    config = {
+        "TESTING": True,
+        "DB_PATH": os.path.join(tmpdir, "app.db"),
+        "SOCKETIO_ASYNC_MODE": "threading",
+        # Scripted clients send far faster than people press buttons
+        "RATE_LIMIT_ENABLED": False,
+    }
+    config.update(overrides)
+    forget_game()
+    registry.reset()
+    limiter.reset()
+    if _app is None:
+        _app = create_app(config)
+    else:
+        _app.config.from_object(load_config())
+        _app.config.update(config)
+        limiter.init_app(_app)
+        bootstrap(_app)
+    return _app
+
+
+def add_teams(app, game_id: int, count: int) -> list:
+    """Insert ``count`` extra teams and return their codes"""
+    codes = [f"BENCH_{i:04d}" for i in range(count)]
+    with app.app_context():
+        db = app_db.get_db()
+        db.executemany(
+            "INSERT INTO teams (game_id, name, code) VALUES (?, ?, ?)",
+            [(game_id, f"Bench {code}", code) for code in codes],
+        )
+        db.commit()
+    forget_game(game_id)
+    return codes
+
+
+def add_game(app, name: str, team_count: int, question_count: int = 1):
+    """Insert a game with one round, ``team_count`` teams and MCQ questions.
+
+    Returns ``(game_id, team_codes, question_ids)``.
+    """
+    with app.app_context():
+        db = app_db.get_db()
+        game_id = db.execute(
+            "INSERT INTO games (name, created_at) VALUES (?, ?)", (name, now_ms())
+        ).lastrowid
+        round_id = db.execute(
+            "INSERT INTO rounds (game_id, name, order_index) VALUES (?, ?, 1)", (game_id, "Round 1")
+        ).lastrowid
+        codes = [f"G{game_id}_T{i:04d}" for i in range(team_count)]
+        db.executemany(
+            "INSERT INTO teams (game_id, name, code) VALUES (?, ?, ?)",
+            [(game_id, f"Team {code}", code) for code in codes],
+        )
+        question_ids = [
+            db.execute(
+                "INSERT INTO questions (game_id, text, opt_a, opt_b, opt_c, opt_d, correct_index, type) "
+                "VALUES (?, ?, 'A', 'B', 'C', 'D', ?, 'MCQ')",
+                (game_id, f"Question {i}", i % 4),
+            ).lastrowid
+            for i in range(question_count)
+        ]
+        db.execute(
+            "INSERT INTO settings (game_id, current_round_id, current_question_id, state, deadline_epoch_ms) "
+            "VALUES (?, ?, ?, 'IDLE', 0)",
+            (game_id, round_id, question_ids[0]),
+        )
+        db.commit()
+    return game_id, codes, question_ids
+
+
+def connect_teams(app, game_id: int, codes: list) -> list:
+    """Connect and join one test client per team code"""
+    clients = []
+    for code in codes:
+        client = socketio.test_client(app)
+        client.emit("join", {"gameId": game_id, "teamCode": code, "role": "team"})
+        clients.append(client)
+    return clients
+
+
+def drain(clients) -> int:
+    """Discard queued messages and return how many there were"""
+    return sum(len(c.get_received()) for c in clients)
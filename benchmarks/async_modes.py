@@ -0,0 +1,193 @@
+"""Buzz and reconnect latency over real sockets under each async runtime.
+
+Each variant seeds a fresh database and serves it with ``run.py`` in the
+async mode under test and, for eventlet/gevent, with ``DB_OFFLOAD`` off and on.
+The driver connects one ``socketio.Client`` per team over websocket, then:
+
+- buzz: the admin shows a question and every team buzzes at once; a team's
+  latency runs until it learns the outcome (its ``error`` or the room's
+  ``buzz_lock``, whichever arrives first)
+- reconnect: every team drops, then all rejoin at once; latency runs from
+  connecting until its ``state_update`` arrives
+
+Modes whose package is not installed are skipped. The driver needs the
+Socket.IO client extras (``pip install "python-socketio[client]"``).
+
+    python -m benchmarks.async_modes [TEAMS]
+"""
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROUNDS = 20
+VARIANTS = [
+    ("threading", False),
+    ("eventlet", False),
+    ("eventlet", True),
+    ("gevent", False),
+    ("gevent", True),
+]
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_for_port(port: int, timeout_s: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"server on port {port} did not start")
+
+
+class _Team:
+    """One team's client, timing how long each request takes to be answered"""
+
+    def __init__(self, url: str, game_id: int, code: str):
+        import socketio
+
+        self.url, self.game_id, self.code = url, game_id, code
+        self.client = socketio.Client(reconnection=False)
+        self.answered = threading.Event()
+        self.client.on("error", lambda data: self.answered.set())
+        self.client.on("buzz_lock", lambda data: self.answered.set())
+        self.client.on("state_update", lambda data: self.answered.set())
+
+    def join(self) -> float:
+        started = time.perf_counter()
+        self.answered.clear()
+        self.client.connect(self.url, transports=["websocket"])
+        self.client.emit("join", {"gameId": self.game_id, "teamCode": self.code, "role": "team"})
+        return self._wait(started)
+
+    def buzz(self) -> float:
+        started = time.perf_counter()
+        self.answered.clear()
+        self.client.emit("buzz", {"gameId": self.game_id, "teamCode": self.code})
+        return self._wait(started)
+
+    def leave(self) -> float:
+        self.client.disconnect()
+        return 0.0
+
+    def _wait(self, started: float) -> float:
+        if not self.answered.wait(10):
+            raise RuntimeError(f"team {self.code}: no reply within 10s")
+        return time.perf_counter() - started
+
+
+def _all_at_once(teams, action) -> list:
+    """Run ``action(team)`` for every team concurrently and return the latencies"""
+    latencies = [0.0] * len(teams)
+    gate = threading.Barrier(len(teams))
+
+    def worker(i, team):
+        gate.wait()
+        latencies[i] = action(team)
+
+    threads = [threading.Thread(target=worker, args=(i, t)) for i, t in enumerate(teams)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return latencies
+
+
+def _drive(port: int, ready: dict) -> dict:
+    import socketio
+    from .suite import _percentile
+
+    url = f"http://127.0.0.1:{port}"
+    game_id = ready["gameId"]
+    teams = [_Team(url, game_id, code) for code in ready["codes"]]
+    for team in teams:
+        team.join()
+    admin = socketio.Client(reconnection=False)
+    admin.connect(url, namespaces=["/admin"], transports=["websocket"])
+    time.sleep(0.2)  # let the join replies settle
+
+    buzz = []
+    started = time.perf_counter()
+    for qid in ready["questionIds"]:
+        admin.call("op", {"gameId": game_id, "op": "set_question", "question_id": qid, "seconds": 300},
+                   namespace="/admin")
+        buzz += _all_at_once(teams, _Team.buzz)
+    buzz_s = time.perf_counter() - started
+
+    # Closing a websocket can linger client-side, so only the rejoin wave is timed
+    _all_at_once(teams, _Team.leave)
+    started = time.perf_counter()
+    reconnect = _all_at_once(teams, _Team.join)
+    reconnect_s = time.perf_counter() - started
+
+    _all_at_once(teams, _Team.leave)
+    admin.disconnect()
+    buzz.sort()
+    reconnect.sort()
+    return {
+        "buzz_p50_ms": _percentile(buzz, 50) * 1000, "buzz_p99_ms": _percentile(buzz, 99) * 1000,
+        "buzz_per_s": len(buzz) / buzz_s,
+        "reconnect_p50_ms": _percentile(reconnect, 50) * 1000,
+        "reconnect_p99_ms": _percentile(reconnect, 99) * 1000,
+        "reconnect_per_s": len(reconnect) / reconnect_s,
+    }
+
+
+def run(teams: int = 50) -> list:
+    from app.runtime import check_async_mode
+    from ._harness import add_game, make_app
+
+    rows = []
+    for mode, offload in VARIANTS:
+        try:
+            check_async_mode(mode)
+        except RuntimeError as e:
+            print(f"skipping {mode}: {e}", file=sys.stderr)
+            continue
+        # Seed a fresh database here, then serve it through run.py as in production
+        app = make_app()
+        game_id, codes, question_ids = add_game(app, "Modes", teams, question_count=ROUNDS)
+        log_path = os.path.join(os.path.dirname(app.config["DB_PATH"]), "server.log")
+        port = _free_port()
+        env = dict(os.environ, SOCKETIO_ASYNC_MODE=mode, DB_OFFLOAD=str(offload).lower(),
+                   DB_PATH=app.config["DB_PATH"], HOST="127.0.0.1", PORT=str(port), WORKERS="1",
+                   RATE_LIMIT_ENABLED="false")
+        with open(log_path, "w") as log:
+            server = subprocess.Popen([sys.executable, "run.py"], cwd=ROOT, env=env,
+                                      stdout=log, stderr=subprocess.STDOUT)
+        try:
+            _wait_for_port(port)
+            row = _drive(port, {"gameId": game_id, "codes": codes, "questionIds": question_ids})
+        except Exception as e:
+            raise RuntimeError(f"{mode} (offload {offload}) failed, server log: {log_path}") from e
+        finally:
+            server.terminate()
+            server.wait()
+        rows.append({"mode": mode, "offload": offload, "teams": teams, **row})
+    return rows
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    teams = int(argv[0]) if argv else 50
+    rows = run(teams)
+    print(f"{'mode':<10} {'offload':>7} {'teams':>6} {'buzz p50':>9} {'buzz p99':>9} {'buzz/s':>8} "
+          f"{'rejoin p50':>11} {'rejoin p99':>11} {'rejoin/s':>9}")
+    for r in rows:
+        print(f"{r['mode']:<10} {'-' if r['mode'] == 'threading' else 'on' if r['offload'] else 'off':>7} {r['teams']:>6} "
+              f"{r['buzz_p50_ms']:>9.2f} {r['buzz_p99_ms']:>9.2f} {r['buzz_per_s']:>8.0f} "
+              f"{r['reconnect_p50_ms']:>11.2f} {r['reconnect_p99_ms']:>11.2f} {r['reconnect_per_s']:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
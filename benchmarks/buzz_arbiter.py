@@ -0,0 +1,63 @@
+"""Decision latency of the in-memory buzzer arbiter under a buzz storm.
+
+Hundreds of threads are released at once against one question; each records
+how long ``GameState.try_buzz`` took to decide. Exactly one must win.
+
+    python -m benchmarks.buzz_arbiter [TEAMS] [ROUNDS]
+"""
+import statistics
+import sys
+import threading
+import time
+
+from app.buzzer import recv_us
+from app.journal import journal
+from app.state import GameState
+
+
+def storm(teams: int) -> list:
+    game = GameState(1)
+    game.state = "SHOW"
+    game.current_question_id = 1
+    roster = [{"id": i, "name": f"T{i}", "code": f"T{i}"} for i in range(teams)]
+
+    start = threading.Barrier(teams)
+    latencies = [0.0] * teams
+    winners = []
+
+    def press(i):
+        start.wait()
+        t0 = time.perf_counter()
+        qid, _ = game.try_buzz(roster[i], recv_us())
+        latencies[i] = time.perf_counter() - t0
+        if qid:
+            winners.append(i)
+
+    threads = [threading.Thread(target=press, args=(i,)) for i in range(teams)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(winners) == 1, winners
+    return latencies
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    teams = int(argv[0]) if argv else 300
+    rounds = int(argv[1]) if len(argv) > 1 else 20
+
+    samples = []
+    for _ in range(rounds):
+        samples.extend(storm(teams))
+        journal.clear()
+    samples.sort()
+    us = lambda v: v * 1e6
+    print(f"teams={teams} rounds={rounds} attempts={len(samples)}")
+    print(f"decision p50={us(statistics.median(samples)):.1f}us "
+          f"p99={us(samples[int(len(samples) * 0.99) - 1]):.1f}us max={us(samples[-1]):.1f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""Event throughput as the number of worker processes grows.
+
+Each worker is a separate process running ``create_app()`` in cluster mode
+against one shared SQLite file, with a ``file://`` broker so invalidations and
+buzzes really replicate between them. Workers own their own games and drive
+question/buzz cycles through Socket.IO test clients; aggregate events/sec is
+reported per worker count.
+
+Before the timed phase every worker buzzes the same contested question at
+once, and the run fails unless exactly one buzz was accepted globally. After
+it, worker 0 shows a shared question with a short deadline and the last
+worker buzzes it; the run fails unless every worker ends with the same
+snapshot, in LOCK, and exactly one worker logged the deadline's LOCK.
+
+    python -m benchmarks.cluster_scaling [WORKERS ...]
+"""
+import multiprocessing
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+TEAMS_PER_GAME = 20
+ROUNDS = 100
+DEADLINE_MS = 500
+
+
+def _worker(index, db_path, broker_url, contested, shared, own_game, barrier, results):
+    from app.buzzer import recv_us
+    from app.db import get_db
+    from app.journal import journal
+    from app.snapshot import state_snapshot
+    from app.state import get_game, now_ms
+    from ._harness import connect_teams, drain, make_app
+
+    app = make_app(DB_PATH=db_path, CLUSTER_BROKER_URL=broker_url)
+    game_id, codes, question_ids = own_game
+
+    # Contested buzz: one team per worker, all released together
+    contested_game, contested_codes = contested
+    with app.app_context():
+        game = get_game(contested_game)
+        team = game.team_by_code(contested_codes[index])
+        barrier.wait()
+        won, _ = game.try_buzz(team, recv_us())
+
+    clients = connect_teams(app, game_id, codes)
+    drain(clients)
+    barrier.wait()
+
+    events = 0
+    started = time.perf_counter()
+    for r in range(ROUNDS):
+        with app.app_context():
+            get_game(game_id).set_question(get_db(), question_ids[r % len(question_ids)], now_ms() + 30000)
+        for client, code in zip(clients, codes):
+            client.emit("buzz", {"gameId": game_id, "teamCode": code})
+        events += len(clients) + 1
+        drain(clients)
+    elapsed = time.perf_counter() - started
+    journal.flush()
+    for client in clients:
+        client.disconnect()
+
+    # Coherence: one admin write, one remote buzz, one deadline, then compare
+    shared_game, shared_codes, shared_qid = shared
+    with app.app_context():
+        get_game(shared_game)
+    barrier.wait()
+    if index == 0:
+        with app.app_context():
+            get_game(shared_game).set_question(get_db(), shared_qid, now_ms() + DEADLINE_MS)
+    barrier.wait()
+    time.sleep(0.05)
+    with app.app_context():
+        game = get_game(shared_game)    # reloaded after the invalidate, with the deadline scheduled
+        if index == len(shared_codes) - 1:
+            game.try_buzz(game.team_by_code(shared_codes[index]), recv_us())
+    time.sleep(DEADLINE_MS / 1000.0 + 0.5)
+    with app.app_context():
+        snapshot = {k: v for k, v in state_snapshot(get_game(shared_game)).items() if k != "seq"}
+    results.put({"worker": index, "won": bool(won), "events": events, "elapsed": elapsed, "snapshot": snapshot})
+
+
+def run(worker_counts) -> list:
+    from app.db import get_db
+    from ._harness import add_game, make_app
+
+    ctx = multiprocessing.get_context("spawn")
+    rows = []
+    for workers in worker_counts:
+        tmpdir = tempfile.mkdtemp(prefix="quiz-cluster-")
+        db_path = os.path.join(tmpdir, "app.db")
+        broker_url = "file://" + os.path.join(tmpdir, "bus.jsonl")
+        app = make_app(DB_PATH=db_path)
+        contested_game, contested_codes, _ = add_game(app, "Contested", workers)
+        shared_game, shared_codes, shared_qids = add_game(app, "Shared", workers)
+        with app.app_context():
+            get_db().execute("UPDATE settings SET state = 'SHOW' WHERE game_id = ?", (contested_game,))
+            get_db().commit()
+        own_games = [add_game(app, f"Worker {i}", TEAMS_PER_GAME, question_count=4) for i in range(workers)]
+
+        barrier = ctx.Barrier(workers)
+        results = ctx.Queue()
+        processes = [
+            ctx.Process(
+                target=_worker,
+                args=(i, db_path, broker_url, (contested_game, contested_codes),
+                      (shared_game, shared_codes, shared_qids[0]), own_games[i], barrier, results),
+            )
+            for i in range(workers)
+        ]
+        for p in processes:
+            p.start()
+        reports = [results.get() for _ in processes]
+        for p in processes:
+            p.join()
+
+        shared = sqlite3.connect(db_path)
+        accepted = shared.execute(
+            "SELECT COUNT(*) FROM buzzer_events WHERE game_id = ? AND accepted = 1", (contested_game,)
+        ).fetchone()[0]
+        winners = sum(r["won"] for r in reports)
+        if accepted != 1 or winners != 1:
+            raise AssertionError(f"{workers} workers: {winners} local winners, {accepted} accepted rows")
+
+        snapshots = [r["snapshot"] for r in sorted(reports, key=lambda r: r["worker"])]
+        if any(snap != snapshots[0] for snap in snapshots) or snapshots[0]["state"] != "LOCK":
+            raise AssertionError(f"{workers} workers: snapshots differ after admin writes: {snapshots}")
+        if snapshots[0]["activeTeamId"] is None:
+            raise AssertionError(f"{workers} workers: the remote buzz did not replicate")
+        locks = shared.execute(
+            "SELECT COUNT(*) FROM game_events WHERE game_id = ? AND kind = 'settings' AND data = ?",
+            (shared_game, '{"state":"LOCK"}'),
+        ).fetchone()[0]
+        if locks != 1:
+            raise AssertionError(f"{workers} workers: deadline locked {locks} times")
+
+        events = sum(r["events"] for r in reports)
+        wall = max(r["elapsed"] for r in reports)
+        rows.append({"workers": workers, "events": events, "seconds": wall, "events_per_s": events / wall})
+    return rows
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    worker_counts = [int(a) for a in argv] or [1, 2, 4]
+    print(f"{'workers':>7} {'events':>8} {'seconds':>8} {'events/s':>10}")
+    for r in run(worker_counts):
+        print(f"{r['workers']:>7} {r['events']:>8} {r['seconds']:>8.2f} {r['events_per_s']:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
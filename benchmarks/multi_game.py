@@ -0,0 +1,69 @@
+"""Many games hosted side by side in one process.
+
+Each game gets its own teams, all connected through Socket.IO test clients.
+Every round opens a question in every game and every team buzzes; the run
+fails unless each game ends each round with exactly one accepted buzz.
+
+    python -m benchmarks.multi_game [GAMES ...]
+"""
+import sys
+import time
+
+TEAMS_PER_GAME = 10
+ROUNDS = 20
+
+
+def run(game_counts) -> list:
+    from app.db import get_db
+    from app.journal import journal
+    from app.state import get_game, now_ms
+    from ._harness import add_game, connect_teams, drain, make_app
+
+    rows = []
+    for count in game_counts:
+        app = make_app()
+        games = [add_game(app, f"Game {i}", TEAMS_PER_GAME, question_count=ROUNDS) for i in range(count)]
+        clients = {game_id: connect_teams(app, game_id, codes) for game_id, codes, _ in games}
+        for group in clients.values():
+            drain(group)
+
+        events = 0
+        started = time.perf_counter()
+        for r in range(ROUNDS):
+            with app.app_context():
+                for game_id, _, question_ids in games:
+                    get_game(game_id).set_question(get_db(), question_ids[r], now_ms() + 30000)
+            # Interleave games so every buzz lands on a different game than the last
+            for i in range(TEAMS_PER_GAME):
+                for game_id, codes, _ in games:
+                    clients[game_id][i].emit("buzz", {"gameId": game_id, "teamCode": codes[i]})
+            events += count * (TEAMS_PER_GAME + 1)
+            for group in clients.values():
+                drain(group)
+        elapsed = time.perf_counter() - started
+        journal.flush()
+
+        with app.app_context():
+            rows_by_game = dict(get_db().execute(
+                "SELECT game_id, COUNT(*) FROM buzzer_events WHERE accepted = 1 GROUP BY game_id"
+            ).fetchall())
+        for game_id, _, _ in games:
+            if rows_by_game.get(game_id) != ROUNDS:
+                raise AssertionError(f"game {game_id}: {rows_by_game.get(game_id)} accepted buzzes, expected {ROUNDS}")
+        for group in clients.values():
+            for client in group:
+                client.disconnect()
+        rows.append({"games": count, "events": events, "seconds": elapsed, "events_per_s": events / elapsed})
+    return rows
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    game_counts = [int(a) for a in argv] or [1, 10, 50]
+    print(f"{'games':>5} {'events':>8} {'seconds':>8} {'events/s':>10}")
+    for r in run(game_counts):
+        print(f"{r['games']:>5} {r['events']:>8} {r['seconds']:>8.2f} {r['events_per_s']:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
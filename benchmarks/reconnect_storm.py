@@ -0,0 +1,49 @@
+"""Count Socket.IO messages produced by a reconnect wave.
+
+Every team disconnects and rejoins, as after a venue Wi-Fi blip. In
+'broadcast' mode each join re-broadcasts state to the whole room, so the
+message count grows with N²; in 'unicast' mode it should stay linear.
+
+    python -m benchmarks.reconnect_storm [N ...]
+"""
+import sys
+
+from ._harness import add_teams, connect_teams, drain, make_app
+
+
+def reconnect_wave(game_id: int, clients, codes) -> int:
+    """Drop and rejoin every client; return the messages delivered meanwhile"""
+    drain(clients)
+    for client in clients:
+        client.disconnect()
+    for client in clients:
+        client.connect()
+    for client, code in zip(clients, codes):
+        client.emit("join", {"gameId": game_id, "teamCode": code, "role": "team"})
+    return drain(clients)
+
+
+def run(team_counts) -> list:
+    results = []
+    for mode in ("broadcast", "unicast"):
+        for n in team_counts:
+            app = make_app(STATE_REPLY_MODE=mode)
+            codes = add_teams(app, 1, n)
+            clients = connect_teams(app, 1, codes)
+            messages = reconnect_wave(1, clients, codes)
+            for client in clients:
+                client.disconnect()
+            results.append({"mode": mode, "teams": n, "messages": messages, "per_team": messages / n})
+    return results
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    team_counts = [int(a) for a in argv] or [10, 50, 100, 200]
+    print(f"{'mode':<10} {'teams':>6} {'messages':>10} {'per team':>9}")
+    for r in run(team_counts):
+        print(f"{r['mode']:<10} {r['teams']:>6} {r['messages']:>10} {r['per_team']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
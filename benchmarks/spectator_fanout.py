@@ -0,0 +1,77 @@
+"""Team-path latency and audience traffic with many viewers connected.
+
+Viewers join either the game room, as every connection did before the
+spectator role, or the spectator room fed by app/spectators.py. Each round the
+admin shows a question and every team buzzes; the run reports buzz p50/p99
+latency and the messages and bytes delivered to the viewers.
+
+    python -m benchmarks.spectator_fanout [VIEWERS ...]
+"""
+import sys
+import time
+
+TEAMS = 20
+ROUNDS = 20
+INTERVAL_MS = 100
+
+
+def run(viewer_counts) -> list:
+    from app import socketio
+    from app.snapshot import SnapshotJSON
+    from .suite import _percentile
+    from ._harness import add_game, connect_teams, drain, make_app
+
+    rows = []
+    for mode in ("game_room", "spectator"):
+        for count in viewer_counts:
+            app = make_app(SPECTATOR_INTERVAL_MS=INTERVAL_MS)
+            game_id, codes, question_ids = add_game(app, "Audience", TEAMS, question_count=ROUNDS)
+            teams = connect_teams(app, game_id, codes)
+            viewers = [socketio.test_client(app) for _ in range(count)]
+            for viewer in viewers:
+                viewer.emit("join", {"gameId": game_id, "role": "viewer" if mode == "game_room" else "spectator"})
+            admin = socketio.test_client(app, namespace="/admin")
+            drain(teams)
+            drain(viewers)
+
+            latencies = []
+            started = time.perf_counter()
+            for qid in question_ids:
+                admin.emit("op", {"gameId": game_id, "op": "set_question", "question_id": qid, "seconds": 300},
+                           namespace="/admin", callback=True)
+                for client, code in zip(teams, codes):
+                    t0 = time.perf_counter()
+                    client.emit("buzz", {"gameId": game_id, "teamCode": code})
+                    latencies.append(time.perf_counter() - t0)
+                time.sleep(INTERVAL_MS / 1000.0 / ROUNDS)
+            elapsed = time.perf_counter() - started
+            time.sleep(3 * INTERVAL_MS / 1000.0)  # let the last coalesced push land
+
+            # Every viewer gets the same messages; measure one and scale
+            received = viewers[0].get_received()
+            messages = len(received) * count
+            viewer_bytes = sum(len(SnapshotJSON.dumps([m["name"], *m["args"]])) for m in received) * count
+            drain(viewers)
+            samples = sorted(latencies)
+            rows.append({
+                "mode": mode, "viewers": count, "seconds": elapsed,
+                "p50_ms": _percentile(samples, 50) * 1000, "p99_ms": _percentile(samples, 99) * 1000,
+                "viewer_messages": messages, "viewer_bytes": viewer_bytes,
+            })
+            for client in teams + viewers:
+                client.disconnect()
+            admin.disconnect(namespace="/admin")
+    return rows
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    viewer_counts = [int(a) for a in argv] or [100, 500, 2000]
+    print(f"{'mode':<10} {'viewers':>7} {'seconds':>8} {'buzz p50':>9} {'buzz p99':>9} {'messages':>9} {'bytes':>11}")
+    for r in run(viewer_counts):
+        print(f"{r['mode']:<10} {r['viewers']:>7} {r['seconds']:>8.2f} {r['p50_ms']:>9.3f} {r['p99_ms']:>9.3f} "
+              f"{r['viewer_messages']:>9} {r['viewer_bytes']:>11}")
+
+
+if __name__ == "__main__":
+    main()
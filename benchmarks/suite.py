@@ -0,0 +1,242 @@
+"""Load-generation suite for the Socket.IO event paths.
+
+Starts the app from ``create_app()`` on a throwaway database, joins N teams to
+one game and drives each scenario through Flask-SocketIO test clients:
+
+- join: every team connects and joins ``game:{id}``
+- admin_cycle: ``set_question`` over the ``/admin`` namespace, acknowledged
+- buzz_storm: every team buzzes on every question
+- fifty_fifty: every team asks for a 50-50 on every question
+- all_play: every team submits an answer on every question in all-play mode
+- reconnect_wave: every team drops and rejoins
+
+For each scenario it reports p50/p99 per-event latency (time for the server
+to handle one emit), events/sec, SQLite commits/sec and the JSON bytes
+delivered to clients. Results are written to ``benchmarks/results/`` and
+compared with the previous run so regressions show up between commits.
+
+    python -m benchmarks.suite [--teams N] [--rounds R] [--no-save] [--baseline FILE]
+"""
+import argparse
+import json
+import platform
+import subprocess
+import time
+from pathlib import Path
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+class Recorder:
+    """Per-scenario latency samples and counters"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.latencies = []
+        self.events = 0
+
+    def emit(self, client, event, data, namespace=None, callback=False):
+        t0 = time.perf_counter()
+        result = client.emit(event, data, namespace=namespace, callback=callback)
+        self.latencies.append(time.perf_counter() - t0)
+        self.events += 1
+        return result
+
+    def time(self, fn, *args):
+        t0 = time.perf_counter()
+        result = fn(*args)
+        self.latencies.append(time.perf_counter() - t0)
+        self.events += 1
+        return result
+
+
+def _percentile(sorted_values, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def _received_bytes(clients, namespace=None) -> int:
+    """Drain clients and return the JSON size of everything they received"""
+    from app.snapshot import SnapshotJSON
+
+    total = 0
+    for client in clients:
+        for message in client.get_received(namespace):
+            total += len(SnapshotJSON.dumps([message["name"], *message["args"]]))
+    return total
+
+
+def _measure(app, name, clients, body) -> dict:
+    """Run ``body(recorder)`` and collect latency, throughput, commits and bytes"""
+    from app.db import pool_stats
+    from app.journal import journal
+
+    _received_bytes(clients)
+    recorder = Recorder(name)
+    commits_before = pool_stats(app)["commits"]
+    started = time.perf_counter()
+    body(recorder)
+    journal.flush()
+    wall = time.perf_counter() - started
+    time.sleep(0.05)  # let deferred admin fan-out land before counting bytes
+    emitted = _received_bytes(clients)
+    commits = pool_stats(app)["commits"] - commits_before
+
+    samples = sorted(recorder.latencies)
+    return {
+        "scenario": name,
+        "events": recorder.events,
+        "seconds": round(wall, 4),
+        "events_per_s": round(recorder.events / wall, 1) if wall else 0.0,
+        "p50_ms": round(_percentile(samples, 50) * 1000, 3),
+        "p99_ms": round(_percentile(samples, 99) * 1000, 3),
+        "commits": commits,
+        "commits_per_s": round(commits / wall, 1) if wall else 0.0,
+        "bytes": emitted,
+        "bytes_per_event": round(emitted / recorder.events, 1) if recorder.events else 0.0,
+    }
+
+
+def run(teams: int = 100, rounds: int = 10) -> list:
+    from app import socketio
+    from ._harness import add_game, make_app
+
+    app = make_app()
+    game_id, codes, question_ids = add_game(app, "Suite", teams, question_count=rounds)
+    admin = socketio.test_client(app, namespace="/admin")
+    clients = [socketio.test_client(app) for _ in codes]
+    results = []
+
+    def join(rec):
+        for client, code in zip(clients, codes):
+            rec.emit(client, "join", {"gameId": game_id, "teamCode": code, "role": "team"})
+
+    def show(qid, rec=None):
+        data = {"gameId": game_id, "op": "set_question", "question_id": qid, "seconds": 300}
+        if rec is None:
+            admin.emit("op", data, namespace="/admin", callback=True)
+        else:
+            rec.emit(admin, "op", data, namespace="/admin", callback=True)
+
+    def admin_cycle(rec):
+        for qid in question_ids:
+            show(qid, rec)
+
+    def buzz_storm(rec):
+        for qid in question_ids:
+            show(qid)
+            for client, code in zip(clients, codes):
+                rec.emit(client, "buzz", {"gameId": game_id, "teamCode": code})
+
+    def fifty_fifty(rec):
+        for qid in question_ids:
+            show(qid)
+            for client, code in zip(clients, codes):
+                rec.emit(client, "fifty_request", {"gameId": game_id, "teamCode": code})
+
+    def all_play(rec):
+        data = {"gameId": game_id, "op": "set_answer_mode", "mode": "ALL_PLAY"}
+        admin.emit("op", data, namespace="/admin", callback=True)
+        for qid in question_ids:
+            show(qid)
+            for i, (client, code) in enumerate(zip(clients, codes)):
+                rec.emit(client, "answer", {"gameId": game_id, "teamCode": code, "choice": i % 4})
+        data["mode"] = "BUZZ"
+        admin.emit("op", data, namespace="/admin", callback=True)
+
+    def reconnect_wave(rec):
+        for client, code in zip(clients, codes):
+            client.disconnect()
+            rec.time(client.connect)
+            rec.emit(client, "join", {"gameId": game_id, "teamCode": code, "role": "team"})
+
+    for name, body in (("join", join), ("admin_cycle", admin_cycle), ("buzz_storm", buzz_storm),
+                       ("fifty_fifty", fifty_fifty), ("all_play", all_play), ("reconnect_wave", reconnect_wave)):
+        results.append(_measure(app, name, clients, body))
+
+    for client in clients:
+        client.disconnect()
+    admin.disconnect(namespace="/admin")
+    return results
+
+
+# ----------------------------
+# Saved results
+# ----------------------------
+def _git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=Path(__file__).parent, timeout=5,
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+def save(results: list, params: dict) -> Path:
+    from app import socketio
+
+    RESULTS_DIR.mkdir(exist_ok=True)
+    path = RESULTS_DIR / time.strftime("suite-%Y%m%d-%H%M%S.json")
+    path.write_text(json.dumps({
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "async_mode": socketio.async_mode,
+        "params": params,
+        "results": results,
+    }, indent=2))
+    return path
+
+
+def latest_result(params: dict, exclude=None):
+    """Most recent saved run with the same parameters"""
+    if not RESULTS_DIR.exists():
+        return None
+    for path in sorted(RESULTS_DIR.glob("suite-*.json"), reverse=True):
+        if path != exclude and json.loads(path.read_text()).get("params") == params:
+            return path
+    return None
+
+
+def _change(new, old) -> str:
+    if not old:
+        return ""
+    return f"{(new - old) / old * 100:+.0f}%"
+
+
+def report(results: list, baseline=None) -> None:
+    base = {r["scenario"]: r for r in baseline["results"]} if baseline else {}
+    print(f"{'scenario':<15} {'events':>7} {'events/s':>9} {'p50 ms':>8} {'p99 ms':>8} "
+          f"{'commits/s':>9} {'bytes/ev':>9}  vs baseline (events/s, p99)")
+    for r in results:
+        old = base.get(r["scenario"], {})
+        print(f"{r['scenario']:<15} {r['events']:>7} {r['events_per_s']:>9.0f} {r['p50_ms']:>8.3f} "
+              f"{r['p99_ms']:>8.3f} {r['commits_per_s']:>9.0f} {r['bytes_per_event']:>9.0f}  "
+              f"{_change(r['events_per_s'], old.get('events_per_s'))} {_change(r['p99_ms'], old.get('p99_ms'))}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--teams", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--no-save", action="store_true", help="do not write benchmarks/results/")
+    parser.add_argument("--baseline", help="result file to compare with (default: the previous run)")
+    args = parser.parse_args(argv)
+
+    params = {"teams": args.teams, "rounds": args.rounds}
+    results = run(args.teams, args.rounds)
+    saved = None if args.no_save else save(results, params)
+    baseline_path = Path(args.baseline) if args.baseline else latest_result(params, exclude=saved)
+    baseline = json.loads(baseline_path.read_text()) if baseline_path else None
+
+    report(results, baseline)
+    if baseline_path:
+        print(f"baseline: {baseline_path} ({baseline.get('revision') or 'unknown revision'})")
+    if saved:
+        print(f"saved: {saved}")
+
+
+if __name__ == "__main__":
+    main()
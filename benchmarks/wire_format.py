@@ -0,0 +1,101 @@
+"""Bytes on the wire and encode CPU per broadcast, JSON vs MessagePack.
+
+Builds the real payloads of a game (a ``state_update`` with its
+question, the ``state_patch`` after a buzz, ``buzz_lock`` and ``mask_applied``)
+and encodes each as one Socket.IO packet with both serializers, the way the
+server does once per room emit. Snapshots are measured warm (cached encoding
+reused, as for every join after the first) and cold (built and encoded).
+Decode time is the receiving side's cost per message.
+
+Websocket frames carry the packet as is; the polling transport sends binary
+packets base64-encoded, so over polling MessagePack costs more bytes than JSON.
+
+    python -m benchmarks.wire_format [ITERATIONS]
+"""
+import sys
+import time
+
+
+def _packets():
+    import socketio.packet as sio_packet
+    from app.snapshot import SnapshotJSON, msgpack_packet_class
+
+    class JSONPacket(sio_packet.Packet):
+        json = SnapshotJSON
+
+    return {"json": JSONPacket, "msgpack": msgpack_packet_class()}
+
+
+def _payloads() -> dict:
+    from app.db import get_db
+    from app.snapshot import Snapshot, _diff, state_snapshot
+    from app.state import get_game, now_ms
+    from ._harness import add_game, make_app
+
+    app = make_app()
+    game_id, codes, question_ids = add_game(app, "Wire", 10, question_count=1)
+    with app.app_context():
+        game = get_game(game_id)
+        game.set_question(get_db(), question_ids[0], now_ms() + 30000)
+        before = state_snapshot(game)
+        team = game.team_by_code(codes[0])
+        game.try_buzz(team, now_ms() * 1000)
+        after = state_snapshot(game)
+        qid, masked, _, _ = game.take_fifty_fifty(team)
+    changed, _ = _diff(before, after)
+
+    def cold():
+        return Snapshot(dict(after), after.version, {"question": game.current_question().public_json})
+
+    return {
+        "state_update": (after, cold),
+        "state_patch": ({"gameId": game_id, "baseSeq": before.version, "seq": after.version, "set": changed}, None),
+        "buzz_lock": ({"questionId": qid, "winnerTeamCode": team["code"], "winnerTeamName": team["name"]}, None),
+        "mask_applied": ({"gameId": game_id, "teamCode": team["code"], "questionId": qid, "maskedOptions": masked}, None),
+    }
+
+
+def _per_call_us(fn, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def run(iterations: int = 20000) -> list:
+    from socketio import packet
+
+    packets = _packets()
+    rows = []
+    for event, (payload, cold) in _payloads().items():
+        for fmt, packet_class in packets.items():
+            def encode(payload=payload):
+                return packet_class(packet.EVENT, data=[event, payload]).encode()
+
+            encoded = encode()
+            size = len(encoded.encode() if isinstance(encoded, str) else encoded)
+            polling = size if isinstance(encoded, str) else 1 + (size + 2) // 3 * 4
+            row = {
+                "event": event, "format": fmt, "bytes": size, "polling_bytes": polling,
+                "encode_us": _per_call_us(encode, iterations),
+                "decode_us": _per_call_us(lambda: packet_class(encoded_packet=encoded), iterations),
+            }
+            if cold is not None:
+                row["cold_encode_us"] = _per_call_us(lambda: encode(cold()), max(1, iterations // 10))
+            rows.append(row)
+    return rows
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    iterations = int(argv[0]) if argv else 20000
+    rows = run(iterations)
+    print(f"{'event':<14} {'format':<8} {'bytes':>6} {'polling':>8} {'encode us':>10} {'cold us':>8} {'decode us':>10}")
+    for r in rows:
+        cold = f"{r['cold_encode_us']:>8.2f}" if "cold_encode_us" in r else f"{'':>8}"
+        print(f"{r['event']:<14} {r['format']:<8} {r['bytes']:>6} {r['polling_bytes']:>8} "
+              f"{r['encode_us']:>10.2f} {cold} {r['decode_us']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
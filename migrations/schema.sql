@@ -46,6 +46,8 @@ CREATE TABLE IF NOT EXISTS settings (
   state TEXT NOT NULL DEFAULT 'IDLE' CHECK (state IN ('IDLE','SHOW','LOCK','REVEAL')),
   deadline_epoch_ms INTEGER NOT NULL DEFAULT 0,
   active_team_id INTEGER,
+  answer_mode TEXT NOT NULL DEFAULT 'BUZZ' CHECK (answer_mode IN ('BUZZ','ALL_PLAY')),
+  show_at_ms INTEGER NOT NULL DEFAULT 0,
   FOREIGN KEY (game_id) REFERENCES games(id) ON DELETE CASCADE,
   FOREIGN KEY (current_round_id) REFERENCES rounds(id) ON DELETE SET NULL,
   FOREIGN KEY (current_question_id) REFERENCES questions(id) ON DELETE SET NULL,
@@ -72,6 +74,7 @@ CREATE TABLE IF NOT EXISTS buzzer_events (
   team_id INTEGER NOT NULL,
   question_id INTEGER NOT NULL,
   ts INTEGER NOT NULL,
+  ts_us INTEGER,
   accepted INTEGER NOT NULL DEFAULT 0 CHECK (accepted IN (0,1)),
   FOREIGN KEY (game_id) REFERENCES games(id) ON DELETE CASCADE,
   FOREIGN KEY (team_id) REFERENCES teams(id) ON DELETE CASCADE,
@@ -95,10 +98,80 @@ CREATE TABLE IF NOT EXISTS team_masks (
   UNIQUE(game_id, team_id, question_id)
 );
 
+-- All-play answers: one per team per question, written in batches by the journal
+CREATE TABLE IF NOT EXISTS answers (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  game_id INTEGER NOT NULL,
+  team_id INTEGER NOT NULL,
+  question_id INTEGER NOT NULL,
+  choice INTEGER NOT NULL CHECK (choice BETWEEN 0 AND 3),
+  correct INTEGER NOT NULL CHECK (correct IN (0,1)),
+  ts_us INTEGER NOT NULL,
+  FOREIGN KEY (game_id) REFERENCES games(id) ON DELETE CASCADE,
+  FOREIGN KEY (team_id) REFERENCES teams(id) ON DELETE CASCADE,
+  FOREIGN KEY (question_id) REFERENCES questions(id) ON DELETE CASCADE,
+  UNIQUE(game_id, team_id, question_id)
+);
+
+-- Append-only log of state transitions, buzz attempts, lifelines, judgements and admin ops;
+-- app/eventlog.py replays it to rebuild a game at any point
+CREATE TABLE IF NOT EXISTS game_events (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  game_id INTEGER NOT NULL,
+  ts_us INTEGER NOT NULL,
+  kind TEXT NOT NULL,
+  team_id INTEGER,
+  question_id INTEGER,
+  data TEXT NOT NULL DEFAULT '{}',
+  FOREIGN KEY (game_id) REFERENCES games(id) ON DELETE CASCADE
+);
+
+-- Answer correctness per team per question (re-judging replaces the row)
+CREATE TABLE IF NOT EXISTS judgements (
+  game_id INTEGER NOT NULL,
+  team_id INTEGER NOT NULL,
+  question_id INTEGER NOT NULL,
+  correct INTEGER NOT NULL CHECK (correct IN (0,1)),
+  points INTEGER NOT NULL,
+  ts INTEGER NOT NULL,
+  PRIMARY KEY (game_id, team_id, question_id),
+  FOREIGN KEY (game_id) REFERENCES games(id) ON DELETE CASCADE,
+  FOREIGN KEY (team_id) REFERENCES teams(id) ON DELETE CASCADE,
+  FOREIGN KEY (question_id) REFERENCES questions(id) ON DELETE CASCADE
+);
+
+-- Leaderboard aggregates, updated incrementally with every judgement
+CREATE TABLE IF NOT EXISTS team_scores (
+  game_id INTEGER NOT NULL,
+  team_id INTEGER NOT NULL,
+  points INTEGER NOT NULL DEFAULT 0,
+  correct INTEGER NOT NULL DEFAULT 0,
+  wrong INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (game_id, team_id),
+  FOREIGN KEY (game_id) REFERENCES games(id) ON DELETE CASCADE,
+  FOREIGN KEY (team_id) REFERENCES teams(id) ON DELETE CASCADE
+);
+
+-- Questions queued per round; app/staging.py pushes the next few to clients ahead of their reveal
+CREATE TABLE IF NOT EXISTS question_queue (
+  game_id INTEGER NOT NULL,
+  round_id INTEGER NOT NULL,
+  position INTEGER NOT NULL,
+  question_id INTEGER NOT NULL,
+  PRIMARY KEY (game_id, round_id, position),
+  FOREIGN KEY (game_id) REFERENCES games(id) ON DELETE CASCADE,
+  FOREIGN KEY (round_id) REFERENCES rounds(id) ON DELETE CASCADE,
+  FOREIGN KEY (question_id) REFERENCES questions(id) ON DELETE CASCADE
+);
+
 CREATE INDEX IF NOT EXISTS idx_rounds_game_order ON rounds(game_id, order_index);
 CREATE INDEX IF NOT EXISTS idx_teams_game_code ON teams(game_id, code);
 CREATE INDEX IF NOT EXISTS idx_questions_game ON questions(game_id);
+CREATE INDEX IF NOT EXISTS idx_questions_game_type ON questions(game_id, type, id);
+CREATE INDEX IF NOT EXISTS idx_questions_game_text ON questions(game_id, text);
+CREATE INDEX IF NOT EXISTS idx_teams_game_name ON teams(game_id, name);
 CREATE INDEX IF NOT EXISTS idx_buzzer_events_game_question ON buzzer_events(game_id, question_id);
 CREATE INDEX IF NOT EXISTS idx_buzzer_events_accepted ON buzzer_events(game_id, question_id, accepted);
 CREATE INDEX IF NOT EXISTS idx_team_masks_lookup ON team_masks(game_id, team_id, question_id);
 CREATE INDEX IF NOT EXISTS idx_lifeline_usage_lookup ON lifeline_usage(game_id, team_id, lifeline, used_in_round_id);
+CREATE INDEX IF NOT EXISTS idx_game_events_game ON game_events(game_id, id);
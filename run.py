@@ -1,20 +1,53 @@
 import os
+
+# Green runtimes must patch the standard library before anything else imports it
+# (importing app.runtime would load the app package first, so this is inline)
+ASYNC_MODE = os.environ.get('SOCKETIO_ASYNC_MODE', 'threading').lower()
+if ASYNC_MODE == 'eventlet':
+    import eventlet
+    eventlet.monkey_patch()
+elif ASYNC_MODE == 'gevent':
+    from gevent import monkey
+    monkey.patch_all()
+
+import multiprocessing
 from app import create_app, socketio
 
-if __name__ == '__main__':
+def serve(host, port):
+    """Run one Socket.IO server process"""
     # Create Flask app
     app = create_app()
-    
-    # Get host and port from environment
-    host = os.environ.get("HOST", "0.0.0.0")
-    port = int(os.environ.get('PORT', '5000'))
-    
-    # Run with Socket.IO support
+
+    # Run with Socket.IO support: eventlet/gevent serve with their own WSGI servers,
+    # threading with werkzeug (use wsgi.py under gunicorn for production)
     socketio.run(
         app,
         host=host,
         port=port,
-        allow_unsafe_werkzeug=True,
+        allow_unsafe_werkzeug=ASYNC_MODE == 'threading',
         use_reloader=False,
         log_output=True
     )
+
+if __name__ == '__main__':
+    # Get host and port from environment
+    host = os.environ.get("HOST", "0.0.0.0")
+    port = int(os.environ.get('PORT', '5000'))
+    workers = int(os.environ.get('WORKERS', '1'))
+
+    if workers <= 1:
+        serve(host, port)
+    else:
+        # One process per port (PORT .. PORT+WORKERS-1) behind a sticky load
+        # balancer; rooms and game state are shared through the message queue
+        if not os.environ.get('SOCKETIO_MESSAGE_QUEUE'):
+            raise SystemExit('WORKERS > 1 requires SOCKETIO_MESSAGE_QUEUE (e.g. redis://localhost:6379/0)')
+
+        processes = [
+            multiprocessing.Process(target=serve, args=(host, port + i), name=f'worker-{i}')
+            for i in range(workers)
+        ]
+        for p in processes:
+            p.start()
+        for p in processes:
+            p.join()
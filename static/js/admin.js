@@ -0,0 +1,149 @@
+// Admin console: ops over the /admin Socket.IO namespace (no page reloads)
+// and lazily paged question and team lists backed by the JSON API
+
+function escapeHtml(text) {
+  const div = document.createElement("div");
+  div.textContent = text == null ? "" : String(text);
+  return div.innerHTML;
+}
+
+function pickButton(target, id) {
+  return `<button type="button" class="btn btn-secondary pick" data-target="${target}" data-id="${id}">Pick</button>`;
+}
+
+const listRenderers = {
+  "questions-list": (q) => {
+    const text = q.text.length > 80 ? q.text.slice(0, 80) + "…" : q.text;
+    return `<tr><td>${q.id}</td><td>${escapeHtml(text)}</td><td>${"ABCD"[q.correct_index]}</td>` +
+      `<td>${escapeHtml(q.type)}</td><td>${pickButton("question-id-input", q.id)}</td></tr>`;
+  },
+  "teams-list": (t) =>
+    `<div class="team-card"><h3>${escapeHtml(t.name)}</h3><div>Code: ${escapeHtml(t.code)}</div>` +
+    `<div>ID: ${t.id}</div>${pickButton("team-id-input", t.id)}</div>`,
+};
+
+function searchParams(form) {
+  const params = new URLSearchParams();
+  for (const field of form.elements) {
+    if (!field.name || !field.value) continue;
+    params.set(field.dataset.param || field.name, field.value);
+  }
+  return params;
+}
+
+async function loadPage(section, page) {
+  const params = searchParams(section.querySelector(".list-search"));
+  params.set("page", page);
+  const res = await fetch(`${section.dataset.api}?${params}`);
+  if (!res.ok) {
+    showToast("Failed to load list", "error");
+    return;
+  }
+  const data = await res.json();
+  section.querySelector(".list-rows").innerHTML = data.items.map(listRenderers[section.id]).join("");
+  section.querySelector(".list-total").textContent = data.total;
+
+  const pager = section.querySelector(".list-pager");
+  pager.innerHTML =
+    (data.page > 1 ? `<a class="nav-link" href="#" data-page="${data.page - 1}">Prev</a> ` : "") +
+    `<span class="list-page">Page ${data.page} / ${data.pages}</span>` +
+    (data.page < data.pages ? ` <a class="nav-link" href="#" data-page="${data.page + 1}">Next</a>` : "");
+}
+
+function initializeLists() {
+  for (const id of Object.keys(listRenderers)) {
+    const section = document.getElementById(id);
+    if (!section) continue;
+
+    section.querySelector(".list-search").addEventListener("submit", (e) => {
+      e.preventDefault();
+      loadPage(section, 1);
+    });
+    section.querySelector(".list-pager").addEventListener("click", (e) => {
+      const link = e.target.closest("[data-page]");
+      if (!link) return;
+      e.preventDefault();
+      loadPage(section, link.dataset.page);
+    });
+  }
+
+  // "Pick" copies an id into the Question / Active Team form
+  document.addEventListener("click", (e) => {
+    const button = e.target.closest(".pick");
+    if (!button) return;
+    const input = document.getElementById(button.dataset.target);
+    if (input) {
+      input.value = button.dataset.id;
+      input.focus();
+    }
+  });
+}
+
+// ----------------------------
+// Admin ops: applied and acknowledged in one round-trip
+// ----------------------------
+function renderCurrentState(state) {
+  const set = (id, text) => {
+    const el = document.getElementById(id);
+    if (el) el.textContent = text;
+  };
+  const q = state.question;
+  const round = document.querySelector(`select[name="round_id"] option[value="${state.currentRoundId}"]`);
+  set("cur-state", state.state);
+  set("cur-round", round ? round.textContent.trim() : "");
+  set("cur-question", q ? `#${q.id} ${q.text.length > 60 ? q.text.slice(0, 60) + "…" : q.text}` : "None");
+  set("cur-team", state.activeTeam ? state.activeTeam.name : "None");
+}
+
+async function loadLeaderboard() {
+  const section = document.getElementById("leaderboard");
+  if (!section) return;
+  const res = await fetch(section.dataset.api);
+  if (!res.ok) return;
+  const data = await res.json();
+  section.querySelector(".leaderboard-rows").innerHTML = data.standings
+    .map((r) => `<tr><td>${r.rank}</td><td>${escapeHtml(r.name)}</td><td>${r.points}</td>` +
+      `<td>${r.correct}</td><td>${r.wrong}</td></tr>`)
+    .join("");
+}
+
+function initializeOps() {
+  const grid = document.getElementById("admin-grid");
+  if (!grid || typeof io === "undefined") return;
+  const gameId = Number(grid.dataset.gameId);
+  const socket = io("/admin", { transports: ["websocket", "polling"] });
+
+  document.addEventListener("submit", (e) => {
+    const form = e.target;
+    if (!form.elements.op || !socket.connected) return;  // falls back to the form POST
+    e.preventDefault();
+
+    const data = { gameId };
+    for (const field of form.elements) {
+      if (field.name && field.type !== "submit") data[field.name] = field.value;
+    }
+    if (e.submitter && e.submitter.name) data[e.submitter.name] = e.submitter.value;
+    const buttons = form.querySelectorAll("button");
+    buttons.forEach((b) => (b.disabled = true));
+    socket.emit("op", data, (ack) => {
+      buttons.forEach((b) => (b.disabled = false));
+      if (!ack.ok) {
+        showToast(`${ack.op || "op"}: ${ack.error}`, "error");
+        return;
+      }
+      renderCurrentState(ack.state);
+      const queue = document.getElementById("cur-queue");
+      if (queue) queue.textContent = ack.queue.length ? ack.queue.join(", ") : "Empty";
+      showToast(`${ack.op} applied`, "success");
+      if (ack.op === "add_team") loadPage(document.getElementById("teams-list"), 1);
+      if (ack.op === "add_question") loadPage(document.getElementById("questions-list"), 1);
+      if (ack.op === "add_team" || ack.op === "add_question" || ack.op === "judge") form.reset();
+      if (ack.op === "judge") loadLeaderboard();
+    });
+  });
+}
+
+document.addEventListener("DOMContentLoaded", () => {
+  initializeLists();
+  initializeOps();
+});
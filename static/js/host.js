@@ -3,11 +3,13 @@
 let socket;
 let gameId;
 let timerInterval;
+let lastState = null;   // last full state, patched in place by state_patch
 
 function initializeHost() {
     // Get initial state from page
     if (typeof initialState !== 'undefined') {
         gameId = initialState.gameId;
+        lastState = initialState;
         updateHostDisplay(initialState);
     }
     
@@ -17,26 +19,41 @@ function initializeHost() {
     // Socket event handlers
     socket.on('connect', () => {
         console.log('Host connected to server');
+        syncClock(socket);
         if (gameId) {
-            // Join game room as host
+            // Join game room as host, or the audience room on /host/<id>/audience
             socket.emit('join', {
                 gameId: gameId,
-                role: 'host'
+                role: typeof hostRole !== 'undefined' ? hostRole : 'host'
             });
         }
     });
     
     socket.on('joined', (data) => {
+        // The server answers join with a state_update for this socket only
         console.log('Host joined game:', data);
-        // Request current state
-        socket.emit('state_request', { gameId: gameId });
     });
     
     socket.on('state_update', (data) => {
         console.log('State update received:', data);
-        updateHostDisplay(data);
+        lastState = data;
+        if (!revealPending(data)) updateHostDisplay(data);
     });
     
+    socket.on('state_patch', (patch) => {
+        const next = applyStatePatch(lastState, patch);
+        if (!next) {
+            // Missed a transition: ask for a full snapshot
+            socket.emit('state_request', { gameId: gameId });
+            return;
+        }
+        lastState = next;
+        if (!revealPending(next)) updateHostDisplay(next);
+    });
+    
+    // Staged questions appear on every screen at the reveal's showAt
+    setupQuestionStaging(socket, () => lastState, updateHostDisplay);
+    
     socket.on('buzz_lock', (data) => {
         console.log('Buzz lock received:', data);
         showToast(`${data.winnerTeamName} buzzed in!`, 'success');
@@ -49,6 +66,11 @@ function initializeHost() {
         }
     });
     
+    // All-play mode: per-option counts, pushed at most every TALLY_INTERVAL_MS
+    socket.on('answer_tally', (data) => {
+        if (lastState?.question && data.questionId === lastState.question.id) renderTally(data);
+    });
+    
     socket.on('toast', (data) => {
         showToast(data.msg, 'info');
     });
@@ -65,6 +87,15 @@ function initializeHost() {
     }
 }
 
+// Returns the patched state, or null when the patch does not follow our seq
+function applyStatePatch(state, patch) {
+    if (!state || state.seq !== patch.baseSeq) return null;
+    const next = Object.assign({}, state, patch.set);
+    (patch.unset || []).forEach((key) => delete next[key]);
+    next.seq = patch.seq;
+    return resolveStagedQuestion(next);
+}
+
 function updateHostDisplay(state) {
     // Update state badge
     const stateBadge = $('#stateBadge');
@@ -107,6 +138,15 @@ function updateHostDisplay(state) {
         }
     }
     
+    // The tally belongs to one question in all-play mode; hide it otherwise
+    const tallyElement = $('#answerTally');
+    const questionId = String(state.question ? state.question.id : '');
+    if (tallyElement && (state.answerMode !== 'ALL_PLAY' || tallyElement.dataset.questionId !== questionId)) {
+        tallyElement.textContent = '';
+        tallyElement.style.display = 'none';
+        tallyElement.dataset.questionId = questionId;
+    }
+    
     // Update active team
     const activeTeamElement = $('#activeTeam');
     if (activeTeamElement) {
@@ -120,6 +160,15 @@ function updateHostDisplay(state) {
     }
 }
 
+function renderTally(tally) {
+    const tallyElement = $('#answerTally');
+    if (!tallyElement) return;
+    const labels = ['A', 'B', 'C', 'D'];
+    const counts = tally.counts.map((count, i) => `${labels[i]}: ${count}`).join('  ');
+    tallyElement.textContent = `${counts}  (${tally.total}/${tally.teams} answered)`;
+    tallyElement.style.display = 'block';
+}
+
 function updateTimer(deadlineEpochMs) {
     // Clear existing timer
     if (timerInterval) {
@@ -138,7 +187,8 @@ function updateTimer(deadlineEpochMs) {
     
     // Start countdown timer
     timerInterval = setInterval(() => {
-        const now = Date.now();
+        // Count down against the server clock so every screen shows the same time
+        const now = serverNow();
         const remaining = Math.max(0, deadlineEpochMs - now);
         
         if (remaining <= 0) {
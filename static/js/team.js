@@ -5,9 +5,11 @@ let gameId;
 let teamCode;
 let teamId;
 let currentQuestionId;
+let lastState = null;                     // last full state, patched in place by state_patch
 
 let currentRoundId = null;                // Active round id from server
 const maskedOptions = new Set();          // 0..3 indices masked by 50-50
+let answeredQuestionId = null;            // All-play: question our answer was accepted for
 const lifelinesUsedByRound = new Map();   // Map<roundId, Set<"FIFTY_FIFTY"|"PHONE"|"DISCUSS">>
 
 function markLifelineUsed(key) {
@@ -35,12 +37,42 @@ function initializeTeam() {
 
   // Join flow
   socket.on("connect", () => {
+    syncClock(socket);
     if (gameId && teamCode) socket.emit("join", { gameId, teamCode, role: "team" });
   });
-  socket.on("joined", () => socket.emit("state_request", { gameId }));
+  // The server answers join with a state_update for this socket only
 
-  // State updates
+  // State updates: full snapshots, then sequenced patches
   socket.on("state_update", (data) => {
+    lastState = data;
+    applyState(data);
+  });
+  socket.on("state_patch", (patch) => {
+    if (!lastState || lastState.seq !== patch.baseSeq) {
+      // Missed a transition: ask for a full snapshot
+      socket.emit("state_request", { gameId });
+      return;
+    }
+    let next = Object.assign({}, lastState, patch.set);
+    (patch.unset || []).forEach((key) => delete next[key]);
+    next.seq = patch.seq;
+    next = resolveStagedQuestion(next);
+    if (!next) {
+      // Staged question we never received: ask for a full snapshot
+      socket.emit("state_request", { gameId });
+      return;
+    }
+    lastState = next;
+    applyState(next);
+  });
+
+  // Staged questions appear on every screen at the reveal's showAt
+  setupQuestionStaging(socket, () => lastState, applyState);
+
+  function applyState(data) {
+    // A staged question waits for its reveal time
+    if (revealPending(data)) return;
+
     // Track round
     const incomingRoundId = data.currentRoundId ?? currentRoundId;
     const roundChanged = currentRoundId !== incomingRoundId;
@@ -82,7 +114,7 @@ function initializeTeam() {
         discuss.disabled = true; discuss.classList.add("locked");
       }
     }
-  });
+  }
 
   // Server errors
   socket.on("error", (data) => {
@@ -131,6 +163,13 @@ function initializeTeam() {
     showToast("50-50 lifeline applied!", "success");
   });
 
+  // All-play answer accepted: one answer per question, so lock the options
+  socket.on("answer_ack", (data) => {
+    answeredQuestionId = data.questionId;
+    $all(".option-btn").forEach((btn) => { btn.disabled = true; });
+    showToast("Answer locked in", "success");
+  });
+
   // Toasts
   socket.on("toast", (data) => showToast(data.msg, "info"));
 
@@ -157,8 +196,13 @@ function setupTeamControls() {
     btn.addEventListener("click", () => {
       const i = Number(btn.dataset.option);
       if (Number.isNaN(i) || maskedOptions.has(i)) return;
+      if (answeredQuestionId && answeredQuestionId === currentQuestionId) return;
       $all(".option-btn").forEach((b) => b.classList.remove("selected"));
       btn.classList.add("selected");
+      // In all-play mode the selection is the team's answer
+      if (lastState?.answerMode === "ALL_PLAY" && lastState.state === "SHOW") {
+        socket.emit("answer", { gameId, teamCode, choice: i });
+      }
     });
   });
 
@@ -233,7 +277,7 @@ function updateTeamDisplay(state) {
 
   // Buzz enablement by phase
   const buzzBtn = $("#buzzBtn");
-  const inShow = state.state === "SHOW" && !!state.question;
+  const inShow = state.state === "SHOW" && !!state.question && state.answerMode !== "ALL_PLAY";
   if (buzzBtn) buzzBtn.disabled = !inShow || buzzBtn.classList.contains("buzz-locked");
 }
 
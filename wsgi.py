@@ -0,0 +1,22 @@
+"""WSGI entry point for production servers (one worker per process; see README).
+
+    gunicorn -w 1 --threads 100 wsgi:app             # threading
+    gunicorn -k eventlet -w 1 wsgi:app               # eventlet
+    gunicorn -k gevent -w 1 wsgi:app                 # gevent
+
+Set SOCKETIO_ASYNC_MODE to match the worker class.
+"""
+import os
+
+# Green runtimes must patch the standard library before anything else imports it
+ASYNC_MODE = os.environ.get('SOCKETIO_ASYNC_MODE', 'threading').lower()
+if ASYNC_MODE == 'eventlet':
+    import eventlet
+    eventlet.monkey_patch()
+elif ASYNC_MODE == 'gevent':
+    from gevent import monkey
+    monkey.patch_all()
+
+from app import create_app
+
+app = create_app()